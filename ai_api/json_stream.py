@@ -0,0 +1,53 @@
+import json
+import re
+from typing import Any, Callable, Dict
+
+# "key": value, value = string / angka / true / false / null.
+# Angka baru dianggap lengkap kalau sudah diikuti pemisah (, } spasi),
+# supaya "sl": 19 tidak terbaca sebelum token "90.5" datang.
+_FIELD = re.compile(
+    r'"(?P<key>[A-Za-z_][A-Za-z0-9_]*)"\s*:\s*'
+    r'(?P<value>"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?=\s*[,}\s])|true|false|null)'
+)
+
+
+class JSONFieldScanner:
+    """
+    PARSER JSON INKREMENTAL (UNTUK STREAMING LLM)
+
+    Terima potongan teks satu per satu; setiap field scalar level atas yang
+    nilainya sudah lengkap langsung tersedia di `fields`, tanpa menunggu
+    kurung tutup. Cukup untuk output council yang datar
+    ({"action": ..., "tp": ..., "sl": ..., "reason": ...}).
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self._pos = 0
+
+    def feed(self, chunk: str) -> bool:
+        """Tambah potongan teks. True kalau ada field baru yang lengkap."""
+        self.buffer += chunk
+        found = False
+        for match in _FIELD.finditer(self.buffer, self._pos):
+            key = match.group("key")
+            if key not in self.fields:
+                self.fields[key] = json.loads(match.group("value"))
+                found = True
+            self._pos = match.end()
+        return found
+
+
+def stop_on_actions(*actions: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Predicate early-stop: True begitu field `action` SAMA PERSIS dengan salah satu
+    `actions` (setelah strip & upper). Bukan substring: "BUY|SELL|HOLD" (model
+    menyalin template) atau "NO_BUY" tidak boleh menghentikan stream.
+    """
+    wanted = {a.strip().upper() for a in actions}
+
+    def _stop(fields: Dict[str, Any]) -> bool:
+        return str(fields.get("action", "")).strip().upper() in wanted
+
+    return _stop
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from loguru import logger
+from core.config import settings
+
+
+# Field level harga: bucket relatif (persen dari harga), bukan jarak absolut
+_PRICE_FIELDS = ("price", "tp", "sl")
+
+
+def _buckets() -> Dict[str, float]:
+    # Field numerik yang di-bucket (sisanya: string dinormalisasi, float dibulatkan)
+    return {
+        "rsi": settings.LLM_CACHE_RSI_BUCKET,
+        "adx": settings.LLM_CACHE_ADX_BUCKET,
+    }
+
+
+def _price_bucket(value: float) -> int:
+    """
+    Bucket log: lebar tiap bucket = LLM_CACHE_PRICE_BUCKET_PCT % dari harga,
+    jadi XAUUSD 2000 (~$0.5) dan BTC 60000 (~$15) sama-sama pas.
+    Harga <= 0 (mis. SL belum diisi) -> bucket 0.
+    """
+    if value <= 0:
+        return 0
+    return int(math.floor(math.log(value) / math.log1p(settings.LLM_CACHE_PRICE_BUCKET_PCT / 100.0)))
+
+
+def quantize_context(context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalisasi konteks market: RSI 51.24 & 51.31 jatuh ke bucket yang sama,
+    'Bullish ' == 'BULLISH'. Hasilnya stabil untuk dijadikan key cache.
+    """
+    buckets = _buckets()
+    out = {}
+    for name, value in context.items():
+        name = str(name).lower()
+        if isinstance(value, bool) or value is None:
+            out[name] = value
+        elif isinstance(value, (int, float)):
+            # "rsi_m15" ikut bucket "rsi", "price_open" ikut "price"
+            prefix = name.split("_")[0]
+            step = buckets.get(name) or buckets.get(prefix)
+            if name in _PRICE_FIELDS or prefix in _PRICE_FIELDS:
+                out[name] = _price_bucket(float(value))
+            elif step:
+                out[name] = int(math.floor(float(value) / step))
+            else:
+                out[name] = round(float(value), 4)
+        else:
+            out[name] = " ".join(str(value).split()).upper()
+    return out
+
+
+def make_key(role: str, context: Dict[str, Any]) -> str:
+    """Key cache = hash(role + konteks ter-quantize)."""
+    payload = json.dumps([role, quantize_context(context)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SEMANTIC LLM CACHE (TTL + LRU)
+
+    Jawaban LLM disimpan dengan key (role, konteks market ter-quantize), jadi
+    pertanyaan yang praktis sama dalam beberapa detik tidak perlu round-trip
+    ke provider. Entry kedaluwarsa setelah TTL; kalau penuh, yang paling lama
+    tidak dipakai dibuang. Opsional disimpan ke disk supaya selamat restart.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None, path: Optional[str] = None):
+        self.ttl = settings.LLM_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = settings.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.path = settings.LLM_CACHE_PATH if path is None else path
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # key -> (expires_at, role, value); urutan = LRU (akhir = terbaru)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._load()
+
+    def get(self, role: str, context: Dict[str, Any]) -> Optional[str]:
+        key = make_key(role, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, role: str, context: Dict[str, Any], value: str,
+            validate: Callable[[str], bool] = None):
+        # Jawaban kosong (error / timeout) atau tidak lolos validate (JSON rusak) tidak di-cache
+        if not value or (validate is not None and not validate(value)):
+            return
+        key = make_key(role, context)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, role, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            snapshot = list(self._entries.items()) if self.path else None
+        if snapshot is not None:
+            self._save(snapshot)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "persistent": bool(self.path),
+            }
+
+    # --- Disk backend (opsional) ---
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                rows = json.load(f)
+            now = time.time()
+            for key, expires_at, role, value in rows:
+                if expires_at > now:
+                    self._entries[key] = (expires_at, role, value)
+            logger.info(f"💾 LLM cache loaded: {len(self._entries)} entries")
+        except Exception as e:
+            logger.warning(f"LLM cache load failed: {e}")
+
+    def _save(self, snapshot):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp = f"{self.path}.tmp"
+        with self._save_lock:
+            try:
+                with open(temp, "w") as f:
+                    json.dump([[key, *entry] for key, entry in snapshot], f)
+                os.replace(temp, self.path)
+            except Exception as e:
+                logger.error(f"LLM cache save failed: {e}")
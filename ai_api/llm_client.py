@@ -0,0 +1,444 @@
+import asyncio
+import concurrent.futures
+import json
+import statistics
+import threading
+import time
+import warnings
+from collections import defaultdict, deque
+# --- SILENCE GOOGLE WARNINGS (MUTE BIAR BERSIH) ---
+warnings.filterwarnings("ignore", category=FutureWarning, module="google.generativeai")
+warnings.filterwarnings("ignore", category=UserWarning, module="google.generativeai")
+
+import httpx
+import google.generativeai as genai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from loguru import logger
+from core.config import settings
+from ai_api.model_router import ModelRouter, classify_error
+from ai_api.llm_cache import LLMCache
+from ai_api.json_stream import JSONFieldScanner
+from ai_api.token_accounting import TokenAccountant
+from ai_api.prompt_builder import estimate_tokens
+
+SYSTEM_PROMPT = "You are an elite scalper. JSON Output Only."
+
+
+def clean_json(text: str) -> str:
+    """Buang pembungkus markdown ```json dari jawaban LLM."""
+    if not text: return "{}"
+    cleaned = text.replace("```json", "").replace("```", "").strip()
+    return cleaned
+
+
+def is_valid_json(text: str) -> bool:
+    """Jawaban dianggap valid kalau bisa di-parse jadi dict JSON yang tidak kosong."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(data, dict) and bool(data)
+
+
+# Nama backup khusus: langsung ke Google Gemini SDK (bukan lewat MegaLLM)
+GEMINI_BACKUP = "gemini"
+
+
+class AsyncLLMClient:
+    """
+    SHARED ASYNC LLM CLIENT (SATU UNTUK SELURUH PROSES)
+
+    - Event loop asyncio jalan di background thread (daemon), jadi request LLM
+      tidak pernah jalan di thread main loop trading.
+    - Satu AsyncOpenAI + satu pool koneksi HTTP (keep-alive) dipakai bersama
+      oleh Sentiment, Orchestrator & Evaluation brain.
+    - Setiap call punya deadline; kalau lewat, task di-cancel dan balik "".
+    - Facade sync (ask) untuk kode lama, submit() untuk yang butuh Future.
+    - Hedged request: kalau primary belum balik JSON valid setelah ~p50 latency,
+      prompt yang sama dikirim ke model/provider backup. Jawaban valid pertama
+      menang, sisanya di-cancel.
+    - Model router: telemetry per model + circuit breaker; ask_role() memilih
+      model tercepat yang sehat untuk role (strategist/risk/evaluator/sentiment).
+    - Semantic cache: ask_role/submit_role dengan `context` dijawab dari cache
+      kalau konteks market ter-quantize-nya sama (tanpa network call).
+    - Streaming + early stop: dengan `early_stop`, jawaban di-stream & di-parse
+      per field; begitu predicate True (mis. action HOLD/REJECT) stream ditutup.
+    - Token accounting: token input/output (perkiraan lokal) per role & per
+      keputusan (tag dari TokenAccountant.open_decision).
+    """
+
+    def __init__(self):
+        self.timeout = settings.LLM_TIMEOUT_SECONDS
+
+        # Statistik latency (detik) per model & counter hedging
+        self._latency = defaultdict(lambda: deque(maxlen=50))
+        self.hedge_stats = defaultdict(lambda: {
+            "requests": 0, "hedged": 0, "primary_wins": 0, "backup_wins": 0, "failed": 0
+        })
+        self.router = ModelRouter()
+        self.cache = LLMCache() if settings.LLM_CACHE_ENABLED else None
+        self.tokens = TokenAccountant(SYSTEM_PROMPT)
+        self.hedge_backups = [b.strip() for b in settings.LLM_HEDGE_BACKUPS.split(",") if b.strip()]
+
+        # 1. EVENT LOOP KHUSUS LLM
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="llm-loop", daemon=True)
+        self._thread.start()
+
+        # 2. SETUP MegaLLM (Primary)
+        self.mega_client = None
+        self.mega_ready = False
+        if settings.DEEPSEEK_API_KEY:
+            try:
+                self.mega_client = self.run(self._build_mega_client(), timeout=10)
+                self.mega_ready = True
+                logger.info(f"✅ MegaLLM Client Ready (Shared Pool, max {settings.LLM_MAX_CONNECTIONS} conn)")
+            except Exception as e:
+                logger.error(f"❌ MegaLLM Init Failed: {e}")
+
+        # 3. SETUP Gemini (Backup)
+        self.gemini_model = settings.GEMINI_MODEL
+        self.gemini_ai = None
+        self.gemini_ready = False
+        if settings.GEMINI_API_KEY:
+            try:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                self.gemini_ai = genai.GenerativeModel(self.gemini_model)
+                self.gemini_ready = True
+                logger.info(f"✅ Backup Brain Ready: {self.gemini_model}")
+            except Exception as e:
+                logger.error(f"❌ Gemini Init Failed: {e}")
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _build_mega_client(self):
+        # Dibuat di dalam loop LLM supaya pool koneksi terikat ke loop yang benar
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_SECONDS,
+            )
+        )
+        return AsyncOpenAI(
+            api_key=settings.DEEPSEEK_API_KEY,
+            base_url=settings.DEEPSEEK_BASE_URL,
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    # === ASYNC API ===
+
+    async def complete(self, model_name: str, prompt: str, max_tokens: int = 500) -> str:
+        """Satu chat completion ke MegaLLM (raise kalau gagal)."""
+        response = await self.mega_client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            stream=False
+        )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.router.record_tokens(model_name, usage.prompt_tokens, usage.completion_tokens)
+        return clean_json(response.choices[0].message.content)
+
+    async def complete_stream(self, model_name: str, prompt: str, early_stop,
+                              max_tokens: int = 500):
+        """
+        Chat completion mode stream. Setiap field JSON yang sudah lengkap
+        dikirim ke early_stop(fields); kalau return True, stream langsung
+        ditutup dan field yang sudah ada dikembalikan sebagai JSON.
+        Return (text, stopped_early).
+        Token dicatat dari chunk `usage` kalau provider mengirimnya; stream yang
+        ditutup lebih awal tidak pernah dapat usage -> pakai perkiraan lokal
+        (prompt + teks yang sudah ter-generate).
+        """
+        scanner = JSONFieldScanner()
+        usage = None
+        stream = await self.mega_client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta and scanner.feed(delta) and early_stop(dict(scanner.fields)):
+                    fields = dict(scanner.fields)
+                    fields.setdefault("reason", f"Early stop on {fields.get('action')}")
+                    logger.debug(f"✂️ {model_name} stream closed early: {fields.get('action')}")
+                    return json.dumps(fields), True
+        finally:
+            await stream.close()
+            if usage is not None:
+                self.router.record_tokens(model_name, usage.prompt_tokens, usage.completion_tokens)
+            else:
+                self.router.record_tokens(model_name, estimate_tokens(f"{SYSTEM_PROMPT}\n{prompt}"),
+                                          estimate_tokens(scanner.buffer))
+        return clean_json(scanner.buffer), False
+
+    async def ask_async(self, model_name: str, prompt: str, timeout: float = None,
+                        early_stop=None) -> str:
+        """complete() + deadline. Gagal/timeout -> "" (sama seperti perilaku lama)."""
+        if not self._provider_ready(model_name):
+            return ""
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(self._attempt(model_name, prompt, early_stop), timeout)
+        except asyncio.TimeoutError:
+            self.router.record_failure(model_name, "timeout", f"{timeout:.1f}s")
+            logger.warning(f"⏱️ Model {model_name} Timeout ({timeout:.1f}s)")
+            return ""
+
+    # === HEDGED REQUEST ===
+
+    def _provider_ready(self, name: str) -> bool:
+        """Provider terkonfigurasi & circuit model tidak sedang OPEN."""
+        ready = self.gemini_ready if name == GEMINI_BACKUP else self.mega_ready
+        return ready and self.router.available(name)
+
+    def hedge_delay(self, model_name: str) -> float:
+        """Delay sebelum kirim hedge = p50 latency model x multiplier."""
+        samples = self._latency.get(model_name)
+        if not samples:
+            return settings.LLM_HEDGE_DEFAULT_DELAY
+        p50 = statistics.median(samples)
+        return max(settings.LLM_HEDGE_MIN_DELAY, p50 * settings.LLM_HEDGE_P50_MULTIPLIER)
+
+    async def _attempt(self, name: str, prompt: str, early_stop=None) -> str:
+        """Satu percobaan ke satu model/provider. Error -> "" (task lain tetap jalan)."""
+        if not self.router.claim(name):
+            # Circuit half-open & percobaannya sedang dipakai caller lain
+            logger.debug(f"🔌 Model {name} skip (half-open probe in flight)")
+            return ""
+        started = time.perf_counter()
+        stopped_early = False
+        try:
+            if name == GEMINI_BACKUP:
+                response = await self.gemini_ai.generate_content_async(f"{SYSTEM_PROMPT}\n\n{prompt}")
+                usage = getattr(response, "usage_metadata", None)
+                if usage is not None:
+                    self.router.record_tokens(name, getattr(usage, "prompt_token_count", 0),
+                                              getattr(usage, "candidates_token_count", 0))
+                text = clean_json(response.text)
+            elif early_stop is not None and settings.LLM_STREAMING:
+                text, stopped_early = await self.complete_stream(name, prompt, early_stop)
+            else:
+                text = await self.complete(name, prompt)
+        except asyncio.CancelledError:
+            self.router.release(name)
+            raise
+        except Exception as e:
+            self.router.record_failure(name, classify_error(e), str(e))
+            logger.warning(f"⚠️ Model {name} Failed: {e}")
+            return ""
+        latency = time.perf_counter() - started
+        # Jawaban yang dipotong early-stop tidak dipakai untuk delay hedging,
+        # supaya jawaban lengkap (BUY/SELL + reason) tidak langsung di-hedge
+        if not stopped_early:
+            self._latency[name].append(latency)
+        self.router.record_success(name, latency)
+        return text
+
+    async def ask_hedged(self, model_name: str, prompt: str, timeout: float = None,
+                         validate=is_valid_json, early_stop=None) -> str:
+        """
+        Kirim ke primary; kalau belum ada jawaban valid setelah hedge_delay(),
+        kirim juga ke backup berikutnya. Jawaban valid pertama menang.
+        """
+        if not self._provider_ready(model_name):
+            return ""
+        timeout = timeout or self.timeout
+        stats = self.hedge_stats[model_name]
+        stats["requests"] += 1
+
+        backups = [b for b in self.hedge_backups if b != model_name and self._provider_ready(b)]
+        tasks = {asyncio.ensure_future(self._attempt(model_name, prompt, early_stop)): model_name}
+        start = self.loop.time()
+        hedge_at = start + self.hedge_delay(model_name)
+
+        try:
+            while tasks:
+                now = self.loop.time()
+                if now - start >= timeout:
+                    break
+                wait = timeout - (now - start)
+                if backups:
+                    wait = max(0.0, min(wait, hedge_at - now))
+
+                done, _ = await asyncio.wait(list(tasks), timeout=wait,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    text = task.result()
+                    if text and not validate(text):
+                        self.router.record_parse_failure(name)
+                    if validate(text):
+                        if name == model_name:
+                            stats["primary_wins"] += 1
+                        else:
+                            stats["backup_wins"] += 1
+                            logger.info(f"🏁 Hedge won by {name} (primary {model_name})")
+                        return text
+
+                # Waktunya hedge, atau semua yang jalan sudah gagal -> backup berikutnya
+                if backups and (self.loop.time() >= hedge_at or not tasks):
+                    backup = backups.pop(0)
+                    stats["hedged"] += 1
+                    logger.debug(f"🪝 Hedging {model_name} -> {backup}")
+                    tasks[asyncio.ensure_future(self._attempt(backup, prompt, early_stop))] = backup
+                    hedge_at = self.loop.time() + self.hedge_delay(backup)
+                elif not tasks:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Yang masih jalan saat deadline dihitung timeout
+        for name in tasks.values():
+            self.router.record_failure(name, "timeout", f"{timeout:.1f}s")
+        stats["failed"] += 1
+        logger.warning(f"⏱️ Model {model_name} (hedged) tidak ada jawaban valid dalam {timeout:.1f}s")
+        return ""
+
+    # === SYNC FACADE ===
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Jadwalkan coroutine di loop LLM. Future.cancel() ikut membatalkan task-nya."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def submit_ask(self, model_name: str, prompt: str, timeout: float = None,
+                   hedge: bool = False, early_stop=None) -> concurrent.futures.Future:
+        """submit() untuk satu pertanyaan LLM (dengan / tanpa hedging)."""
+        if hedge and settings.LLM_HEDGE_ENABLED:
+            return self.submit(self.ask_hedged(model_name, prompt, timeout, early_stop=early_stop))
+        return self.submit(self.ask_async(model_name, prompt, timeout, early_stop))
+
+    def submit_role(self, role: str, prompt: str, timeout: float = None,
+                    hedge: bool = False, context: dict = None,
+                    early_stop=None, tag: int = None,
+                    validate=is_valid_json) -> concurrent.futures.Future:
+        """
+        submit_ask() ke model yang dipilih router untuk role ini (+ semantic cache).
+        Hanya jawaban yang lolos `validate` yang disimpan di cache.
+        """
+        cached = self._cache_get(role, context)
+        model_name = None if cached is not None else self.router.pick(role, self._provider_ready)
+        if model_name is None:
+            if cached is not None:
+                self.tokens.record(role, prompt, cached, cached=True, tag=tag)
+            future = concurrent.futures.Future()
+            future.set_result(cached or "")
+            return future
+        future = self.submit_ask(model_name, prompt, timeout, hedge, early_stop)
+        if context is not None and self.cache is not None:
+            future.add_done_callback(lambda f: self._cache_put(role, context, f, validate))
+        future.add_done_callback(lambda f: self.tokens.record(role, prompt, self._result_or_empty(f), tag=tag))
+        return future
+
+    @staticmethod
+    def _result_or_empty(future: concurrent.futures.Future) -> str:
+        if future.cancelled() or future.exception() is not None:
+            return ""
+        return future.result()
+
+    def _cache_get(self, role: str, context: dict):
+        if context is None or self.cache is None:
+            return None
+        cached = self.cache.get(role, context)
+        if cached is not None:
+            logger.debug(f"⚡ LLM cache hit: {role}")
+        return cached
+
+    def _cache_put(self, role: str, context: dict, future: concurrent.futures.Future, validate=None):
+        self.cache.put(role, context, self._result_or_empty(future), validate)
+
+    def run(self, coro, timeout: float = None):
+        """Jalankan coroutine & tunggu hasilnya (cancel kalau lewat timeout)."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def ask(self, model_name: str, prompt: str, timeout: float = None, hedge: bool = False,
+            early_stop=None) -> str:
+        """
+        Versi blocking untuk caller lama (Orchestrator, Sentiment, Evaluation).
+        hedge=True & early_stop hanya untuk prompt yang jawabannya JSON.
+        """
+        timeout = timeout or self.timeout
+        if not self._provider_ready(model_name):
+            logger.debug(f"🔌 Model {model_name} skip (provider off / circuit open)")
+            return ""
+        if hedge and settings.LLM_HEDGE_ENABLED:
+            coro = self.ask_hedged(model_name, prompt, timeout, early_stop=early_stop)
+        else:
+            coro = self.ask_async(model_name, prompt, timeout, early_stop)
+        future = self.submit(coro)
+        try:
+            # Grace 1 detik: deadline utama dijaga wait_for di dalam loop
+            return future.result(timeout + 1.0)
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+            future.cancel()
+            logger.warning(f"⏱️ Model {model_name} dibatalkan (deadline {timeout:.1f}s)")
+            return ""
+
+    def ask_role(self, role: str, prompt: str, timeout: float = None, hedge: bool = False,
+                 context: dict = None, early_stop=None, tag: int = None,
+                 validate=is_valid_json) -> str:
+        """
+        ask() ke model tercepat & sehat untuk role (lihat ModelRouter).
+        context: field market yang menentukan isi prompt (trend, rsi, price, ...);
+        kalau diisi, jawaban diambil / disimpan di semantic cache (hanya yang
+        lolos `validate`, default: dict JSON tidak kosong).
+        """
+        cached = self._cache_get(role, context)
+        if cached is not None:
+            self.tokens.record(role, prompt, cached, cached=True, tag=tag)
+            return cached
+        model_name = self.router.pick(role, self._provider_ready)
+        if model_name is None:
+            logger.warning(f"🔌 Role {role}: semua model kandidat sedang OPEN / tidak siap")
+            return ""
+        text = self.ask(model_name, prompt, timeout, hedge=hedge, early_stop=early_stop)
+        self.tokens.record(role, prompt, text, tag=tag)
+        if context is not None and self.cache is not None:
+            self.cache.put(role, context, text, validate)
+        return text
+
+    def telemetry(self) -> dict:
+        """Snapshot telemetry router + counter hedging (untuk dashboard)."""
+        data = self.router.snapshot()
+        data["hedge"] = {name: dict(s) for name, s in list(self.hedge_stats.items())}
+        data["cache"] = self.cache.stats() if self.cache is not None else {}
+        data["tokens"] = self.tokens.report()
+        return data
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_client() -> AsyncLLMClient:
+    """Singleton AsyncLLMClient untuk seluruh proses."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = AsyncLLMClient()
+        return _shared_client
@@ -0,0 +1,251 @@
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from loguru import logger
+from core.config import settings
+
+# Batas atas bucket histogram latency (detik); bucket terakhir = sisanya
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+# Role council -> setting daftar kandidat model (dipisah koma)
+ROLES = ("strategist", "risk", "evaluator", "sentiment")
+
+
+def classify_error(error) -> str:
+    """Kelompokkan error provider supaya gampang dibaca di dashboard."""
+    status = getattr(error, "status_code", None)
+    text = str(error).lower()
+    if status in (401, 403) or "401" in text or "unauthorized" in text or "api key" in text:
+        return "auth"
+    if status == 429 or "429" in text or "rate limit" in text:
+        return "rate_limit"
+    if "timeout" in text or "timed out" in text:
+        return "timeout"
+    if status is not None and status >= 500:
+        return "server"
+    return "other"
+
+
+class ModelStats:
+    """Telemetry satu model: latency, error, token & parse failure."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.successes = 0
+        self.parse_failures = 0
+        self.errors: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latencies = deque(maxlen=50)   # Sampel terbaru untuk p50/p95
+        self.outcomes = deque(maxlen=50)    # True = sukses, False = gagal
+
+        # Circuit breaker
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = settings.LLM_BREAKER_COOLDOWN
+        self.trips = 0
+        self.last_error = ""
+        self.probe_until = 0.0  # Half-open: slot percobaan sedang dipakai sampai waktu ini
+
+    # --- Metrics ---
+
+    def p50(self) -> Optional[float]:
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def snapshot(self, now: float) -> dict:
+        p50, p95 = self.p50(), self.p95()
+        return {
+            "state": self.state(now),
+            "requests": self.requests,
+            "successes": self.successes,
+            "error_rate": round(self.error_rate(), 3),
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+            "parse_failures": self.parse_failures,
+            "parse_failure_rate": round(self.parse_failures / self.successes, 3) if self.successes else 0.0,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "histogram": dict(zip([f"<{b}s" for b in LATENCY_BUCKETS] + [f">={LATENCY_BUCKETS[-1]}s"],
+                                  self.histogram)),
+            "tokens": {"prompt": self.prompt_tokens, "completion": self.completion_tokens},
+            "trips": self.trips,
+            "open_for": round(max(0.0, self.open_until - now), 1),
+        }
+
+
+class ModelRouter:
+    """
+    ADAPTIVE MODEL ROUTER + CIRCUIT BREAKER
+
+    - Catat latency (histogram + p50/p95), error per jenis, token & parse failure
+      untuk setiap model.
+    - Circuit breaker: model yang gagal LLM_BREAKER_FAILURES kali berturut-turut
+      (atau langsung kalau 401/403) di-skip selama cooldown. Setelah cooldown
+      satu request percobaan boleh lewat (half-open, slot di-claim lewat claim());
+      gagal lagi -> cooldown x2.
+    - pick(role): pilih model tercepat yang sehat dari daftar kandidat role.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelStats] = {}
+        self.routes: Dict[str, List[str]] = {role: self._candidates(role) for role in ROLES}
+        self.last_pick: Dict[str, str] = {}
+
+    @staticmethod
+    def _candidates(role: str) -> List[str]:
+        defaults = {
+            "strategist": settings.MODEL_QWEN,
+            "risk": settings.MODEL_DEEPSEEK,
+            "evaluator": settings.MODEL_EVALUATOR,
+            "sentiment": settings.DEEPSEEK_MODEL,
+        }
+        raw = getattr(settings, f"LLM_ROUTE_{role.upper()}", "") or defaults[role]
+        return [m.strip() for m in raw.split(",") if m.strip()]
+
+    def _get(self, name: str) -> ModelStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ModelStats(name)
+        return stats
+
+    # --- Recording (dipanggil dari loop LLM) ---
+
+    def record_success(self, name: str, latency: float):
+        with self._lock:
+            stats = self._get(name)
+            stats.requests += 1
+            stats.successes += 1
+            stats.latencies.append(latency)
+            stats.outcomes.append(True)
+            bucket = next((i for i, b in enumerate(LATENCY_BUCKETS) if latency < b), len(LATENCY_BUCKETS))
+            stats.histogram[bucket] += 1
+            if stats.open_until:
+                logger.info(f"🔌 Circuit CLOSED: {name} pulih")
+            stats.consecutive_failures = 0
+            stats.open_until = 0.0
+            stats.probe_until = 0.0
+            stats.cooldown = settings.LLM_BREAKER_COOLDOWN
+
+    def record_failure(self, name: str, kind: str, detail: str = ""):
+        with self._lock:
+            stats = self._get(name)
+            now = time.monotonic()
+            half_open = stats.state(now) == "half_open"
+            stats.probe_until = 0.0
+            stats.requests += 1
+            stats.outcomes.append(False)
+            stats.errors[kind] = stats.errors.get(kind, 0) + 1
+            stats.last_error = f"{kind}: {detail}"[:200] if detail else kind
+            stats.consecutive_failures += 1
+
+            if half_open:
+                # Percobaan setelah cooldown gagal -> buka lagi, cooldown dobel
+                stats.cooldown = min(stats.cooldown * 2, settings.LLM_BREAKER_MAX_COOLDOWN)
+            if half_open or kind == "auth" or stats.consecutive_failures >= settings.LLM_BREAKER_FAILURES:
+                if stats.state(now) != "open":
+                    stats.trips += 1
+                    logger.warning(f"🔌 Circuit OPEN: {name} ({stats.last_error}) | skip {stats.cooldown:.0f}s")
+                stats.open_until = now + stats.cooldown
+
+    def record_tokens(self, name: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            stats = self._get(name)
+            stats.prompt_tokens += int(prompt_tokens or 0)
+            stats.completion_tokens += int(completion_tokens or 0)
+
+    def record_parse_failure(self, name: str):
+        with self._lock:
+            self._get(name).parse_failures += 1
+
+    # --- Routing ---
+
+    def available(self, name: str) -> bool:
+        """False selama circuit OPEN, atau HALF_OPEN dengan percobaan yang masih jalan."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                return True
+            now = time.monotonic()
+            state = stats.state(now)
+            return state == "closed" or (state == "half_open" and now >= stats.probe_until)
+
+    def claim(self, name: str) -> bool:
+        """
+        Dipanggil tepat sebelum request dikirim. Closed -> selalu boleh.
+        Half-open -> hanya SATU caller yang dapat slot percobaan; sisanya ditolak
+        sampai percobaan itu selesai (record_success / record_failure / release)
+        atau slotnya kedaluwarsa (LLM_TIMEOUT_SECONDS + 1).
+        """
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                return True
+            now = time.monotonic()
+            state = stats.state(now)
+            if state == "closed":
+                return True
+            if state == "open" or now < stats.probe_until:
+                return False
+            stats.probe_until = now + settings.LLM_TIMEOUT_SECONDS + 1.0
+            return True
+
+    def release(self, name: str):
+        """Percobaan half-open batal (cancel) tanpa hasil: slot dibuka lagi."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is not None:
+                stats.probe_until = 0.0
+
+    def _score(self, stats: Optional[ModelStats]) -> float:
+        # Model yang belum punya sampel latency dicoba dulu (skor 0) supaya
+        # semua kandidat sempat diukur; setelah itu yang tercepat menang.
+        if stats is None or stats.p50() is None:
+            return 0.0
+        return stats.p50() / max(1.0 - stats.error_rate(), 0.1)
+
+    def pick(self, role: str, ready=None) -> Optional[str]:
+        """
+        Model tercepat & sehat untuk role ini (None kalau semua circuit OPEN).
+        ready: callable opsional untuk cek provider (mis. API key ada).
+        """
+        candidates = [m for m in self.routes.get(role, []) if self.available(m) and (ready is None or ready(m))]
+        if not candidates:
+            return None
+        with self._lock:
+            # sorted() stabil -> kalau skor sama, urutan config yang menang
+            best = sorted(candidates, key=lambda m: self._score(self._stats.get(m)))[0]
+        if self.last_pick.get(role) != best:
+            logger.info(f"🧭 Route {role} -> {best}")
+            self.last_pick[role] = best
+        return best
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "models": {name: stats.snapshot(now) for name, stats in self._stats.items()},
+                "routes": {role: {"candidates": list(c), "active": self.last_pick.get(role)}
+                           for role, c in self.routes.items()},
+                "timestamp": time.time(),
+            }
@@ -0,0 +1,102 @@
+import math
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from loguru import logger
+from core.config import settings
+
+# Pecahan kasar ala tokenizer BPE: kata, angka, tanda baca
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Perkiraan jumlah token tanpa tokenizer asli (tanpa network / download).
+    Kata ~4 huruf per token, angka ~3 digit per token, tanda baca 1 token.
+    """
+    if not text:
+        return 0
+    total = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group()
+        if piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        elif piece[0].isalpha():
+            total += math.ceil(len(piece) / 4)
+        else:
+            total += 1
+    return total
+
+
+# Prefix tetap per role (persona + aturan + format output). Data dinamis
+# selalu di BELAKANG, jadi prefix identik di setiap call & bisa di-cache provider.
+PREFIXES = {
+    "strategist": (
+        "ROLE: RUTHLESS SCALPER (XAUUSD specialist).\n"
+        "RULES: 1) Follow H1 trend strictly (BULLISH->BUY only, BEARISH->SELL only). "
+        "2) Confirm the signal with M15 momentum. 3) Ignore weak counter-trend signals. "
+        "4) Tight SL (max 30-50 pips). 5) Risk-Reward > 1:1.5.\n"
+        'OUTPUT JSON ONLY: {"action":"BUY|SELL|HOLD","tp":price,"sl":price,"reason":"brief tactical reason"}\n'
+        "DATA:"
+    ),
+    "risk": (
+        "ROLE: SENIOR RISK MANAGER. Verify the trade proposal.\n"
+        "CHECK: 1) Aligned with H1 trend? (crucial) 2) SL logical, not too wide/narrow? "
+        "3) RSI extreme (>70 for BUY, <30 for SELL)? If yes REJECT.\n"
+        'OUTPUT JSON ONLY: {"action":"APPROVE|REJECT","reason":"critique or approval"}\n'
+        "DATA:"
+    ),
+    "sentiment": (
+        "Analyze financial sentiment of each headline (1=bullish, 0=neutral, -1=bearish).\n"
+        'OUTPUT JSON ONLY: {"scores":[one score per headline, same order]}\n'
+        "HEADLINES:"
+    ),
+}
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+class PromptBuilder:
+    """
+    COMPACT PROMPT BUILDER
+
+    Prompt = prefix tetap per role + data ringkas "key=value" satu baris.
+    Bagian dinamis dibatasi PROMPT_CONTEXT_TOKEN_BUDGET: kalau lewat,
+    item (mis. headline) dibuang dari belakang dulu, lalu field dengan
+    prioritas paling rendah (urutan dict = prioritas, paling belakang = terendah).
+    """
+
+    def __init__(self, budget: int = None):
+        self.budget = settings.PROMPT_CONTEXT_TOKEN_BUDGET if budget is None else budget
+
+    @staticmethod
+    def render(fields: Dict[str, Any]) -> str:
+        return " ".join(f"{key}={_format(value)}" for key, value in fields.items() if value is not None)
+
+    def build(self, role: str, fields: Dict[str, Any] = None, items: Optional[List[str]] = None) -> str:
+        return self.build_items(role, fields, items)[0]
+
+    def build_items(self, role: str, fields: Dict[str, Any] = None,
+                    items: Optional[List[str]] = None) -> Tuple[str, List[str]]:
+        """build() + item yang benar-benar masuk prompt (sisanya dipangkas budget)."""
+        fields = dict(fields or {})
+        items = list(items or [])
+
+        def body():
+            lines = [self.render(fields)] if fields else []
+            return "\n".join(lines + [f"- {item}" for item in items])
+
+        dropped = []
+        while estimate_tokens(body()) > self.budget and (items or len(fields) > 1):
+            if items:
+                items.pop()
+                dropped.append("item")
+            else:
+                dropped.append(fields.popitem()[0])
+        if dropped:
+            logger.debug(f"✂️ Prompt {role} over budget {self.budget} tok, dropped: {dropped}")
+
+        return f"{PREFIXES[role]}\n{body()}", items
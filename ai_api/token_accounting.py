@@ -0,0 +1,78 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from ai_api.prompt_builder import estimate_tokens
+
+
+class TokenAccountant:
+    """
+    TOKEN ACCOUNTING (PERKIRAAN LOKAL)
+
+    Hitung token input/output setiap call LLM per role, plus total per
+    keputusan entry (open_decision -> close_decision). Jawaban yang datang
+    dari semantic cache dicatat terpisah sebagai token yang dihemat.
+    """
+
+    def __init__(self, system_prompt: str = "", history: int = 200):
+        self.system_tokens = estimate_tokens(system_prompt)
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.roles = defaultdict(lambda: {"calls": 0, "cached": 0, "input": 0, "output": 0, "saved": 0})
+        # Keputusan yang masih bisa menerima token (call telat tetap dihitung)
+        self._open: "OrderedDict[int, dict]" = OrderedDict()
+        self.decisions = deque(maxlen=history)
+
+    def open_decision(self) -> int:
+        tag = next(self._seq)
+        entry = {"id": tag, "time": time.time(), "decided_by": None,
+                 "calls": 0, "cached": 0, "input": 0, "output": 0}
+        with self._lock:
+            self._open[tag] = entry
+            while len(self._open) > 50:
+                self._open.popitem(last=False)
+        return tag
+
+    def close_decision(self, tag: int, decided_by: str):
+        with self._lock:
+            entry = self._open.get(tag)
+            if entry is not None:
+                entry["decided_by"] = decided_by
+                self.decisions.append(entry)
+
+    def record(self, role: str, prompt: str, response: str, cached: bool = False, tag: int = None):
+        tokens_in = self.system_tokens + estimate_tokens(prompt)
+        tokens_out = estimate_tokens(response)
+        with self._lock:
+            stats = self.roles[role]
+            stats["calls"] += 1
+            entry = self._open.get(tag)
+            if entry is not None:
+                entry["calls"] += 1
+            if cached:
+                stats["cached"] += 1
+                stats["saved"] += tokens_in + tokens_out
+                if entry is not None:
+                    entry["cached"] += 1
+                return
+            stats["input"] += tokens_in
+            stats["output"] += tokens_out
+            if entry is not None:
+                entry["input"] += tokens_in
+                entry["output"] += tokens_out
+
+    def report(self, last: int = 50) -> dict:
+        with self._lock:
+            roles = {}
+            for role, s in self.roles.items():
+                sent = s["calls"] - s["cached"]
+                roles[role] = {**s,
+                               "avg_input": round(s["input"] / sent, 1) if sent else 0.0,
+                               "avg_output": round(s["output"] / sent, 1) if sent else 0.0}
+            decisions = [dict(d) for d in list(self.decisions)[-last:]]
+        per_decision = [d["input"] + d["output"] for d in decisions]
+        return {
+            "roles": roles,
+            "decisions": decisions,
+            "avg_per_decision": round(sum(per_decision) / len(per_decision), 1) if per_decision else 0.0,
+        }
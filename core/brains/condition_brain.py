@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 from datetime import datetime
 import pytz
 from loguru import logger
@@ -53,9 +53,10 @@ class ConditionBrain:
             # Kita pilih True biar gak macet, tapi log error
             return True, "Time Check Error (Bypassed)"
 
-    def analyze(self, df: pd.DataFrame) -> dict:
+    def analyze(self, df) -> dict:
         """
         Analisa Komprehensif: Waktu + Volatilitas Dataframe.
+        `df` boleh DataFrame atau OHLCVRingBuffer (cukup punya kolom high/low).
         """
         
         # --- 1. CEK WAKTU DULU (PRIORITAS UTAMA) ---
@@ -68,7 +69,7 @@ class ConditionBrain:
             }
 
         # --- 2. CEK KELENGKAPAN DATA ---
-        if df is None or df.empty:
+        if df is None or len(df) == 0:
             return {
                 "allowed": False, 
                 "reason": "Waiting for Data..."
@@ -76,14 +77,12 @@ class ConditionBrain:
 
         # --- 3. CEK VOLATILITAS (JANGAN TRADE DI MARKET MATI) ---
         try:
-            # Hitung Range (High - Low)
-            # Kita gunakan copy biar gak ngerusak df asli
-            df_calc = df.copy()
-            df_calc['range'] = df_calc['high'] - df_calc['low']
+            # Hitung Range (High - Low) langsung dari array (tanpa copy DataFrame)
+            ranges = np.asarray(df['high'], dtype=float) - np.asarray(df['low'], dtype=float)
             
-            # Rata-rata range 20 candle terakhir
-            avg_range = df_calc['range'].rolling(20).mean().iloc[-1]
-            current_range = df_calc['range'].iloc[-1]
+            # Rata-rata range 20 candle terakhir (NaN kalau data < 20, sama seperti rolling)
+            avg_range = ranges[-20:].mean() if len(ranges) >= 20 else float('nan')
+            current_range = ranges[-1]
             
             # Ambang Batas Volatilitas
             # Jika range sekarang < 20% dari rata-rata -> Market Mati Suri
@@ -2,7 +2,6 @@ import json
 import os
 from datetime import datetime
 from loguru import logger
-from core.config import settings
 from ai_api.gemini_client import GeminiClient
 
 class EvaluationBrain:
@@ -56,7 +55,8 @@ class EvaluationBrain:
             
             # 3. Minta Pendapat AI (Prioritas: Model Evaluator di .env)
             # Biasanya pakai Llama-3.3-70b atau Gemini Flash yang cepat
-            lesson = self.brain.ask_specific_model(settings.MODEL_EVALUATOR, prompt)
+            # Router pilih kandidat role 'evaluator' yang paling cepat & sehat
+            lesson = self.brain.ask_role("evaluator", prompt)
             
             # 4. Fallback Logic (Jika AI Bisu/Error)
             if not lesson or len(lesson) < 3 or "error" in lesson.lower():
@@ -0,0 +1,312 @@
+import numpy as np
+from loguru import logger
+
+NAN = float('nan')
+
+
+class _State:
+    """
+    Base state rekursif (pakai __slots__). state()/restore() menyalin nilai
+    slot saja (float / tuple / list seed kecil) -> jauh lebih murah dari deepcopy.
+    """
+    __slots__ = ()
+
+    def state(self) -> tuple:
+        out = []
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _State):
+                value = value.state()
+            elif isinstance(value, list):
+                value = list(value)
+            out.append(value)
+        return tuple(out)
+
+    def restore(self, state: tuple):
+        for name, value in zip(self.__slots__, state):
+            current = getattr(self, name)
+            if isinstance(current, _State):
+                current.restore(value)
+            else:
+                setattr(self, name, list(value) if isinstance(value, list) else value)
+
+
+class _EWM(_State):
+    """
+    Satu langkah EWM persis seperti pandas `Series.ewm(...).mean()`
+    (ignore_na=False), termasuk urutan operasi float-nya.
+    Dipakai untuk EMA (adjust=False) dan RMA/Wilder (adjust=True).
+    """
+    __slots__ = ('old_wt_factor', 'new_wt', 'adjust', 'min_periods',
+                 'weighted', 'old_wt', 'nobs', 'started')
+
+    def __init__(self, alpha: float, adjust: bool, min_periods: int = 0):
+        # pandas menyimpan alpha lewat center of mass, jadi kita ikuti jalurnya
+        com = 1.0 / alpha - 1
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(int(min_periods), 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def update(self, cur: float) -> float:
+        is_obs = cur == cur
+        self.nobs += is_obs
+        if not self.started:
+            # Nilai pertama (termasuk NaN di depan) cuma jadi titik awal
+            if is_obs:
+                self.weighted = cur
+                self.started = True
+        else:
+            self.old_wt *= self.old_wt_factor
+            if is_obs:
+                if self.weighted != cur:
+                    self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                    self.weighted /= (self.old_wt + self.new_wt)
+                if self.adjust:
+                    self.old_wt += self.new_wt
+                else:
+                    self.old_wt = 1.0
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class EMAState(_State):
+    """EMA ala pandas_ta: seed SMA `length` bar pertama, lalu ewm(span, adjust=False)."""
+    __slots__ = ('length', '_seed', '_ewm', 'value')
+
+    def __init__(self, length: int):
+        self.length = length
+        self._seed = []
+        self._ewm = _EWM(2.0 / (length + 1.0), adjust=False)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if self._seed is not None:
+            self._seed.append(x)
+            if len(self._seed) < self.length:
+                return NAN
+            x = float(np.mean(self._seed))
+            self._seed = None
+        self.value = self._ewm.update(x)
+        return self.value
+
+
+class RMAState(_State):
+    """Wilder MA ala pandas_ta: ewm(alpha=1/length, min_periods=length), adjust=True."""
+    __slots__ = ('_ewm', 'value')
+
+    def __init__(self, length: int):
+        self._ewm = _EWM(1.0 / length, adjust=True, min_periods=length)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.value = self._ewm.update(x)
+        return self.value
+
+
+class RSIState(_State):
+    """RSI Wilder (pandas_ta rsi, drift=1)."""
+    __slots__ = ('_prev', '_up', '_dn', 'value')
+
+    def __init__(self, length: int = 14):
+        self._prev = None
+        self._up = RMAState(length)
+        self._dn = RMAState(length)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        diff = close - self._prev if self._prev is not None else NAN
+        self._prev = close
+        pos = diff if not diff < 0 else 0.0
+        neg = diff if not diff > 0 else 0.0
+        up = self._up.update(pos)
+        dn = self._dn.update(neg)
+        total = up + abs(dn)
+        self.value = 100 * up / total if total else NAN
+        return self.value
+
+
+class ADXState(_State):
+    """
+    ADX / +DI / -DI (pandas_ta adx, mamode rma, scalar 100).
+
+    True range: pandas_ta (non_zero_range) menambah epsilon ke SELURUH seri
+    range kalau ada satu nilai 0, jadi hasilnya tergantung isi window. Itu tidak
+    bisa direplikasi per bar; di sini TR = 0 (bar flat) diganti epsilon, sama
+    dengan pandas_ta untuk kasus yang berpengaruh (ATR 0 -> DI NaN vs 0).
+    Selisih sisanya <= 1 epsilon per TR, di bawah noise float.
+    """
+    __slots__ = ('_prev', '_atr', '_pos', '_neg', '_adx', 'dmp', 'dmn', 'value')
+
+    EPS = 2.220446049250313e-16
+
+    def __init__(self, length: int = 14):
+        self._prev = None
+        self._atr = RMAState(length)
+        self._pos = RMAState(length)
+        self._neg = RMAState(length)
+        self._adx = RMAState(length)
+        self.dmp = NAN
+        self.dmn = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self._prev is None:
+            tr = up = dn = NAN
+        else:
+            p_high, p_low, p_close = self._prev
+            tr = max(abs(high - low), abs(high - p_close), abs(p_close - low)) or self.EPS
+            up = high - p_high
+            dn = p_low - low
+        self._prev = (high, low, close)
+
+        if up == up:
+            pos = up if (up > dn and up > 0) else 0.0
+            neg = dn if (dn > up and dn > 0) else 0.0
+            pos = 0.0 if abs(pos) < self.EPS else pos
+            neg = 0.0 if abs(neg) < self.EPS else neg
+        else:
+            pos = neg = NAN
+
+        atr = self._atr.update(tr)
+        k = 100.0 / atr if atr else NAN
+        self.dmp = k * self._pos.update(pos)
+        self.dmn = k * self._neg.update(neg)
+        total = self.dmp + self.dmn
+        dx = 100.0 * abs(self.dmp - self.dmn) / total if total else NAN
+        self.value = self._adx.update(dx)
+        return self.value
+
+
+class MACDState(_State):
+    """MACD / Signal / Histogram (pandas_ta macd)."""
+    __slots__ = ('_fast', '_slow', '_signal', 'macd', 'signal', 'value')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMAState(fast)
+        self._slow = EMAState(slow)
+        self._signal = EMAState(signal)
+        self.macd = NAN
+        self.signal = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        # Signal line baru mulai dihitung dari MACD valid pertama
+        if self.macd == self.macd:
+            self.signal = self._signal.update(self.macd)
+        self.value = self.macd - self.signal
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    INDICATOR ENGINE V1: INCREMENTAL (O(1) PER BAR)
+
+    Menyimpan state rekursif EMA, RSI Wilder, ADX/DI dan MACD untuk satu
+    (symbol, timeframe). Bar yang sudah close di-commit sekali; bar yang
+    masih jalan (forming) dihitung provisional, lalu state scalar-nya
+    dipulihkan (state()/restore(), tanpa deepcopy).
+
+    Hasil identik (sampai presisi float) dengan pandas_ta yang dijalankan
+    di seri bar yang sama sejak bar pertama seed.
+    """
+
+    def __init__(self, ema_lengths=(50,), rsi_length=14, adx_length=14, macd=(12, 26, 9)):
+        self.ema_lengths = tuple(ema_lengths)
+        self.rsi_length = rsi_length
+        self.adx_length = adx_length
+        self.macd_params = tuple(macd)
+        self.reset()
+
+    def reset(self):
+        self.emas = {n: EMAState(n) for n in self.ema_lengths}
+        self.rsi = RSIState(self.rsi_length)
+        self.adx = ADXState(self.adx_length)
+        self.macd = MACDState(*self.macd_params)
+        self.last_closed_time = 0
+        self.bars_committed = 0
+
+    def _commit(self, high: float, low: float, close: float):
+        for ema in self.emas.values():
+            ema.update(close)
+        self.rsi.update(close)
+        self.adx.update(high, low, close)
+        self.macd.update(close)
+        self.bars_committed += 1
+
+    def _state(self) -> tuple:
+        return (tuple(ema.state() for ema in self.emas.values()), self.rsi.state(),
+                self.adx.state(), self.macd.state(), self.bars_committed)
+
+    def _restore(self, state: tuple):
+        emas, rsi, adx, macd, self.bars_committed = state
+        for ema, saved in zip(self.emas.values(), emas):
+            ema.restore(saved)
+        self.rsi.restore(rsi)
+        self.adx.restore(adx)
+        self.macd.restore(macd)
+
+    def _snapshot(self, close: float) -> dict:
+        snap = {
+            "close": close,
+            "rsi": self.rsi.value,
+            "adx": self.adx.value,
+            "dmp": self.adx.dmp,
+            "dmn": self.adx.dmn,
+            "macd": self.macd.macd,
+            "macd_signal": self.macd.signal,
+            "macd_hist": self.macd.value,
+        }
+        for n, ema in self.emas.items():
+            snap[f"ema_{n}"] = ema.value
+        return snap
+
+    def sync(self, bars) -> dict:
+        """
+        Sinkronkan engine dengan window bar (OHLCVRingBuffer / DataFrame).
+        Bar terakhir dianggap forming. Return {"last": provisional, "prev": closed}.
+        """
+        n = len(bars)
+        if n < 2:
+            return {}
+
+        times = np.asarray(bars['time'])
+        if np.issubdtype(times.dtype, np.datetime64):
+            # DataFrame lama: kolom time berupa datetime
+            times = times.astype('datetime64[s]').astype('int64')
+        highs = np.asarray(bars['high'])
+        lows = np.asarray(bars['low'])
+        closes = np.asarray(bars['close'])
+        closed = n - 1
+
+        # Cari posisi bar closed terakhir yang sudah di-commit
+        start = 0
+        if self.bars_committed:
+            idx = int(np.searchsorted(times[:closed], self.last_closed_time))
+            if idx < closed and times[idx] == self.last_closed_time:
+                start = idx + 1
+            else:
+                # Cache di-seed ulang / gap: replay dari awal window
+                logger.debug("IndicatorEngine: state tidak nyambung dengan window, replay ulang")
+                self.reset()
+
+        for i in range(start, closed):
+            self._commit(float(highs[i]), float(lows[i]), float(closes[i]))
+        if closed > start:
+            self.last_closed_time = int(times[closed - 1])
+
+        prev = self._snapshot(float(closes[closed - 1]))
+
+        # Provisional untuk forming bar: commit sementara, lalu pulihkan state
+        saved = self._state()
+        self._commit(float(highs[-1]), float(lows[-1]), float(closes[-1]))
+        last = self._snapshot(float(closes[-1]))
+        self._restore(saved)
+
+        return {"last": last, "prev": prev}
+
@@ -0,0 +1,138 @@
+import re
+from typing import List, Tuple
+import numpy as np
+
+# Bobot kata / frasa (unigram & bigram). Positif = bullish untuk aset.
+COMMON_LEXICON = {
+    "rally": 1.0, "rallies": 1.0, "surge": 1.0, "surges": 1.0, "soar": 1.0, "soars": 1.0,
+    "jump": 0.8, "jumps": 0.8, "gain": 0.6, "gains": 0.6, "rise": 0.6, "rises": 0.6,
+    "climb": 0.6, "climbs": 0.6, "rebound": 0.7, "rebounds": 0.7, "record high": 1.0,
+    "all-time high": 1.0, "bullish": 1.0, "breakout": 0.7, "upbeat": 0.5,
+    "fall": -0.6, "falls": -0.6, "drop": -0.7, "drops": -0.7, "slide": -0.7, "slides": -0.7,
+    "plunge": -1.0, "plunges": -1.0, "tumble": -1.0, "tumbles": -1.0, "sink": -0.8, "sinks": -0.8,
+    "slump": -0.9, "slumps": -0.9, "crash": -1.0, "selloff": -0.9, "sell-off": -0.9,
+    "bearish": -1.0, "lower": -0.4, "higher": 0.4, "losses": -0.6, "weak": -0.5,
+}
+
+# Spesifik emas: safe haven, dolar & suku bunga bergerak berlawanan
+GOLD_LEXICON = {
+    "gold": 0.0, "safe haven": 0.8, "safe-haven": 0.8, "haven demand": 0.8,
+    "rate cut": 0.8, "rate cuts": 0.8, "dovish": 0.7, "rate hike": -0.8, "rate hikes": -0.8,
+    "hawkish": -0.7, "dollar slips": 0.8, "dollar falls": 0.8, "dollar weakens": 0.8,
+    "weaker dollar": 0.8, "dollar rises": -0.8, "dollar gains": -0.8, "dollar strengthens": -0.8,
+    "stronger dollar": -0.8, "yields rise": -0.6, "yields fall": 0.6, "inflation": 0.3,
+    "geopolitical": 0.5, "tensions": 0.4, "war": 0.5, "central bank buying": 0.9,
+    "risk-on": -0.4, "risk appetite": -0.4,
+}
+
+# Spesifik crypto / BTC
+BTC_LEXICON = {
+    "etf inflows": 1.0, "etf approval": 1.0, "inflows": 0.7, "outflows": -0.7,
+    "adoption": 0.6, "halving": 0.5, "institutional": 0.4, "hack": -1.0, "hacked": -1.0,
+    "exploit": -0.9, "ban": -1.0, "bans": -1.0, "crackdown": -0.9, "lawsuit": -0.7,
+    "sec sues": -0.9, "liquidations": -0.6, "bankruptcy": -1.0, "risk-on": 0.4,
+}
+
+# Kata negasi membalik tanda frasa setelahnya (jarak maks 3 token)
+NEGATORS = {"not", "no", "never", "without", "fails", "fail"}
+
+_TOKEN = re.compile(r"[a-z0-9$%][a-z0-9$%\-']*")
+
+
+class LexiconScorer:
+    """
+    LOCAL SENTIMENT SCORER (LEXICON + RULE)
+
+    Skor headline tanpa network: cocokkan unigram & bigram dengan lexicon
+    (umum + khusus emas / BTC sesuai symbol), negasi membalik tanda.
+    Satu batch: tokenisasi regex per headline, lalu lookup term (dict hanya
+    per token unik), bigram, negasi & agregasi skor semuanya operasi numpy.
+    Output per headline: skor [-1, 1] & confidence [0, 1].
+    """
+
+    def __init__(self, symbol: str = "XAUUSD"):
+        lexicon = dict(COMMON_LEXICON)
+        sym = symbol.upper()
+        if "BTC" in sym:
+            lexicon.update(BTC_LEXICON)
+        else:
+            lexicon.update(GOLD_LEXICON)
+        self.terms = {term: i for i, term in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=float)
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Term id per key (-1 = tidak ada di lexicon). Dict lookup hanya per key unik."""
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        ids = np.array([self.terms.get(key, -1) for key in unique.tolist()], dtype=np.int64)
+        return ids[inverse.reshape(-1)]
+
+    def _matches(self, headlines: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (row, term_idx, sign) untuk semua term yang cocok di batch.
+        Batch di-tokenize sekali jadi satu array token; unigram, bigram, negasi
+        & konsumsi bigram dihitung dengan operasi array, tanpa loop per token.
+        """
+        token_lists = [_TOKEN.findall(text.lower()) for text in headlines]
+        lengths = np.array([len(t) for t in token_lists], dtype=np.int64)
+        total = int(lengths.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        tokens = np.array([tok for toks in token_lists for tok in toks])
+        rows = np.repeat(np.arange(len(headlines)), lengths)
+        pos = np.arange(total)
+        row_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        is_neg = np.isin(tokens, list(NEGATORS))
+        uni = self._lookup(tokens)
+
+        # Bigram di posisi i = token i + token i+1 (harus satu headline)
+        bi = np.full(total, -1, dtype=np.int64)
+        if total > 1:
+            same_row = rows[:-1] == rows[1:]
+            pairs = np.char.add(np.char.add(tokens[:-1], " "), tokens[1:])
+            bi[:-1] = np.where(same_row, self._lookup(pairs), -1)
+        has_bi = (bi >= 0) & ~is_neg
+        has_bi[:-1] &= ~is_neg[1:]
+
+        # Bigram berurutan (overlap) diambil greedy kiri-ke-kanan: posisi genap
+        # dalam satu run; token kedua bigram yang diambil tidak dipakai lagi
+        run_start = has_bi & ~np.concatenate(([False], has_bi[:-1]))
+        run_origin = np.maximum.accumulate(np.where(run_start, pos, 0))
+        take_bi = has_bi & ((pos - run_origin) % 2 == 0)
+        consumed = np.concatenate(([False], take_bi[:-1]))
+        take_uni = (uni >= 0) & ~is_neg & ~take_bi & ~consumed
+
+        # Negasi: term dalam 3 token setelah negator terakhir di headline yang sama
+        last_neg = np.maximum.accumulate(np.where(is_neg, pos, -1))
+        negated = (last_neg >= row_start) & (pos - last_neg <= 3)
+        sign = np.where(negated, -1.0, 1.0)
+
+        cols = np.where(take_bi, bi, uni)
+        hit = take_bi | take_uni
+        return rows[hit], cols[hit], sign[hit]
+
+    def score(self, headlines: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (scores, confidence) per headline.
+        confidence tinggi kalau banyak bobot yang cocok & arahnya sepakat;
+        headline tanpa term yang dikenal -> confidence 0.
+        """
+        n = len(headlines)
+        raw = np.zeros(n)
+        mag = np.zeros(n)
+        if n == 0:
+            return raw, mag
+        rows, cols, signs = self._matches(headlines)
+        if len(rows):
+            w = self.weights[cols] * signs
+            np.add.at(raw, rows, w)
+            np.add.at(mag, rows, np.abs(w))
+
+        scores = np.tanh(raw)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            agreement = np.where(mag > 0, np.abs(raw) / mag, 0.0)
+        confidence = agreement * np.minimum(1.0, mag / 1.5)
+        return scores, confidence
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class OrderBlockScan:
+    """Semua kandidat Order Block (index candle OB & harga zonanya)."""
+    bull_idx: np.ndarray   # Candle merah terakhir sebelum impuls naik (Demand)
+    bull_zone: np.ndarray  # Low candle tsb (support)
+    bear_idx: np.ndarray   # Candle hijau terakhir sebelum impuls turun (Supply)
+    bear_zone: np.ndarray  # High candle tsb (resistance)
+
+    def zones(self, times=None) -> dict:
+        """Format ringan (list of dict) untuk log / dashboard."""
+        def pack(idx, zone):
+            items = []
+            for i, z in zip(idx.tolist(), zone.tolist()):
+                item = {"index": i, "price": z}
+                if times is not None:
+                    item["time"] = int(times[i])
+                items.append(item)
+            return items
+        return {"bull": pack(self.bull_idx, self.bull_zone),
+                "bear": pack(self.bear_idx, self.bear_zone)}
+
+
+def _masks(open_, high, low, close):
+    """
+    Mask kandidat OB untuk setiap candle i (konfirmasi dari candle i+1).
+    Panjang mask = n - 1 (candle terakhir tidak punya konfirmasi).
+    """
+    o, h, l, c = (np.asarray(x, dtype=float) for x in (open_, high, low, close))
+    bull = (c[:-1] < o[:-1]) & (c[1:] > h[:-1])
+    bear = (c[:-1] > o[:-1]) & (c[1:] < l[:-1])
+    return bull, bear, h, l
+
+
+def scan_order_blocks(open_, high, low, close, lookback: int = 50) -> OrderBlockScan:
+    """
+    Scan OB di window yang sama dengan loop lama: candle n-lookback+1 .. n-3
+    (2 candle terakhir di-skip karena mungkin belum close sempurna).
+    Satu pass numpy, tanpa loop Python.
+    """
+    n = len(close)
+    empty = np.array([], dtype=np.int64)
+    if n < 5:
+        return OrderBlockScan(empty, np.array([]), empty, np.array([]))
+
+    bull, bear, h, l = _masks(open_, high, low, close)
+    lo = max(n - lookback + 1, 0)
+    hi = n - 2  # exclusive -> index terakhir yang dicek = n-3
+
+    bull_idx = lo + np.flatnonzero(bull[lo:hi])
+    bear_idx = lo + np.flatnonzero(bear[lo:hi])
+    return OrderBlockScan(bull_idx, l[bull_idx], bear_idx, h[bear_idx])
+
+
+def pick_legacy(scan: OrderBlockScan):
+    """
+    Zona yang dikembalikan loop lama. Loop lama berjalan mundur & menimpa nilai
+    tiap ketemu OB, jadi yang tersisa adalah kandidat dengan index TERKECIL.
+    """
+    bull_ob = float(scan.bull_zone[0]) if len(scan.bull_idx) else 0.0
+    bear_ob = float(scan.bear_zone[0]) if len(scan.bear_idx) else 0.0
+    return bull_ob, bear_ob
+
+
+def order_blocks_series(open_, high, low, close, lookback: int = 50):
+    """
+    Versi backtest: zona OB (bull_ob, bear_ob) untuk SETIAP bar t, seolah-olah
+    scan_order_blocks + pick_legacy dijalankan di data[:t+1]. 0.0 = tidak ada OB.
+    """
+    n = len(close)
+    bull_out = np.zeros(n)
+    bear_out = np.zeros(n)
+    if n < 5:
+        return bull_out, bear_out
+
+    bull, bear, h, l = _masks(open_, high, low, close)
+    t = np.arange(n)
+    lo = np.maximum(t - lookback + 2, 0)
+    last_ok = t - 2  # index terakhir yang boleh dipakai
+
+    for mask, zone, out in ((bull, l, bull_out), (bear, h, bear_out)):
+        # next_hit[j] = index kandidat pertama >= j (n kalau tidak ada)
+        idx = np.where(mask, np.arange(n - 1), n)
+        next_hit = np.append(np.minimum.accumulate(idx[::-1])[::-1], n)
+        first = next_hit[lo]
+        valid = (first <= last_ok) & (t >= 4)
+        out[valid] = zone[first[valid]]
+
+    return bull_out, bear_out
@@ -1,19 +1,41 @@
-import os
+import json
 from loguru import logger
 from ai_api.gemini_client import GeminiClient
+from ai_api.prompt_builder import PromptBuilder
 from core.feeder.news_feeder import NewsFeeder
+from core.feeder.headline_store import HeadlineStore
+from core.brains.lexicon_scorer import LexiconScorer
+from core.brains.sentiment_series import get_sentiment_series
 from core.config import settings
 
 
 class SentimentBrain:
     """
     Ambil news → analisa sentiment → return dict
+    UPGRADE: Incremental. Headline disimpan di HeadlineStore (dedup + TTL);
+    hanya headline yang belum dinilai yang dikirim ke LLM. Setiap skor masuk
+    SentimentSeries (decay per waktu); sentiment = nilai series saat ini.
+    Kalau tidak ada headline baru -> tidak ada LLM call.
+    FAST PATH: LexiconScorer menilai headline secara lokal; hanya headline
+    dengan confidence < SENTIMENT_LOCAL_MIN_CONFIDENCE yang dikirim ke LLM.
     """
 
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY", None)
         self.gemini = GeminiClient()
         self.news = NewsFeeder()
+        self.store = HeadlineStore()
+        self.series = get_sentiment_series(settings.SYMBOL)
+        if not len(self.series):
+            # Restart: isi ulang series dari headline yang sudah dinilai
+            for entry in sorted(self.store.scored(), key=lambda e: e["first_seen"]):
+                # Store lama belum mencatat source: dulu semua skor dari LLM
+                self.series.add(entry["first_seen"], entry["score"], entry.get("source") or "llm")
+        self.lexicon = LexiconScorer(settings.SYMBOL) if settings.SENTIMENT_LOCAL_ENABLED else None
+        self.min_confidence = settings.SENTIMENT_LOCAL_MIN_CONFIDENCE
+        # Kesepakatan skor lokal vs LLM (headline yang dinilai keduanya)
+        self.agreement = {"compared": 0, "agreed": 0}
+        # Headline dipangkas kalau lewat PROMPT_CONTEXT_TOKEN_BUDGET
+        self.prompts = PromptBuilder()
         logger.info("SentimentBrain v2 initialized")
 
     def analyze(self):
@@ -23,55 +45,134 @@ class SentimentBrain:
         symbol = settings.SYMBOL  # === FIX DI SINI ===
 
         # --- Ambil berita ---
-        headlines = self.news.get_recent_headlines(symbol=symbol, limit=6)
+        items = self.news.get_recent_items(symbol=symbol, limit=6)
+        new = self.store.add(items)
+        pending = self.store.unscored()
 
-        if not headlines:
-            return {
-                "sentiment": "neutral",
-                "confidence": 0.1,
-                "reason": "no_news"
-            }
+        local_scores = {}
+        if pending and self.lexicon is not None:
+            pending, local_scores = self._score_local(pending)
+
+        llm_call = False
+        if pending:
+            llm_call = True
+            try:
+                self._score(symbol, pending, local_scores)
+            except Exception as e:
+                # Headline tetap pending, dicoba lagi refresh berikutnya
+                logger.error(f"SentimentBrain Error: {e}")
+
+        result = self._aggregate()
+        compared = self.agreement["compared"]
+        result.update({
+            "new_headlines": len(new), "llm_call": llm_call, "escalated": len(pending),
+            "local_llm_agreement": round(self.agreement["agreed"] / compared, 3) if compared else None
+        })
+        return result
+
+    def _score_local(self, pending):
+        """
+        Nilai headline pakai lexicon lokal. Yang confident langsung disimpan,
+        sisanya (ambigu) dikembalikan untuk di-escalate ke LLM.
+        """
+        scores, confidence = self.lexicon.score([e["title"] for e in pending])
+        confident = {}
+        escalate = []
+        local_scores = {}
+        for entry, score, conf in zip(pending, scores, confidence):
+            local_scores[entry["key"]] = float(score)
+            if conf >= self.min_confidence:
+                confident[entry["key"]] = float(score)
+            else:
+                escalate.append(entry)
+        self._record(pending, confident, source="local")
+        logger.debug(f"SentimentBrain: {len(confident)} local, {len(escalate)} escalated to LLM")
+        return escalate, local_scores
 
-        text = "\n".join(headlines)
+    def _score(self, symbol: str, pending, local_scores=None):
+        """Satu LLM call untuk semua headline yang belum dinilai."""
+        # Prompt bisa memangkas headline (budget token): yang terpotong tetap
+        # pending & ikut di call berikutnya
+        prompt, titles = self.prompts.build_items("sentiment", items=[e["title"] for e in pending])
+        pending = pending[:len(titles)]
+        logger.debug(f"SentimentBrain: scoring {len(titles)} new headlines...")
 
-        logger.debug("SentimentBrain: analyzing sentiment via Gemini...")
+        def complete(text):
+            scores = self._parse_scores(text)
+            return scores is not None and len(scores) == len(titles)
 
-        # --- Analisa menggunakan AI ---
+        # Headline sama (beda spasi / kapital) -> jawaban dari semantic cache;
+        # yang di-cache hanya jawaban dengan satu skor per headline
+        result = self.gemini.analyze_text(
+            prompt,
+            context={"symbol": symbol, "headlines": "\n".join(titles)},
+            validate=complete
+        )
+        if not result:
+            return  # LLM gagal / timeout: headline tetap pending
+        if not complete(result):
+            # Bukan JSON / jumlah skor tidak cocok: urutan tidak bisa dipercaya,
+            # semua tetap pending (dicoba lagi refresh berikutnya)
+            logger.warning(f"SentimentBrain: LLM scores invalid for {len(titles)} headlines, retry later")
+            return
+
+        llm_scores = {e["key"]: s for e, s in zip(pending, self._parse_scores(result))}
+        self._record(pending, llm_scores, source="llm")
+
+        # Catat kesepakatan arah (bullish / bearish / netral) lokal vs LLM
+        for key, llm_score in llm_scores.items():
+            if local_scores and key in local_scores:
+                local = local_scores[key]
+                same = (abs(local) < 0.2 and abs(llm_score) < 0.2) or local * llm_score > 0
+                self.agreement["compared"] += 1
+                self.agreement["agreed"] += int(same)
+
+    def _record(self, entries, scores, source: str):
+        """Simpan skor ke HeadlineStore & SentimentSeries (timestamp = pertama terlihat)."""
+        self.store.set_scores(scores, source=source)
+        for entry in entries:
+            if entry["key"] in scores:
+                self.series.add(entry["first_seen"], scores[entry["key"]], source)
+
+    @staticmethod
+    def _parse_scores(text: str):
         try:
-            result = self.gemini.analyze_text(
-                f"Analyze financial sentiment from these headlines:\n{text}"
-            )
-
-            res = result.lower()
-
-            if any(w in res for w in ["bull", "up", "buy", "rally"]):
-                return {
-                    "sentiment": "bullish",
-                    "confidence": 0.7,
-                    "reason": "ai_bullish",
-                    "headlines": len(headlines)
-                }
-
-            elif any(w in res for w in ["bear", "down", "sell", "drop"]):
-                return {
-                    "sentiment": "bearish",
-                    "confidence": 0.7,
-                    "reason": "ai_bearish",
-                    "headlines": len(headlines)
-                }
+            data = json.loads(text)
+            scores = data.get("scores") if isinstance(data, dict) else data
+            return [max(-1.0, min(1.0, float(s))) for s in scores]
+        except (TypeError, ValueError, AttributeError):
+            return None
 
-            else:
-                return {
-                    "sentiment": "neutral",
-                    "confidence": 0.4,
-                    "reason": "ai_neutral",
-                    "headlines": len(headlines)
-                }
-
-        except Exception as e:
-            logger.error(f"SentimentBrain Error: {e}")
+    def _aggregate(self):
+        return self.sentiment_at()
+
+    def sentiment_at(self, timestamp: float = None):
+        """
+        Sentiment dari SentimentSeries pada timestamp (default: sekarang).
+        Murah (O(log n)) -> aman dibaca tiap loop / per bar saat backtest.
+        `source` = penilai skor: "local" (lexicon), "llm", atau "mixed".
+        """
+        score, weight = self.series.value_at(timestamp)
+        if weight < 0.05:
             return {
                 "sentiment": "neutral",
                 "confidence": 0.1,
-                "reason": "exception"
+                "reason": "no_news"
             }
+
+        source = self._source(self.series.llm_share_at(timestamp))
+        info = {"score": round(score, 3), "weight": round(weight, 2), "source": source}
+        if score > 0.2:
+            return {"sentiment": "bullish", "confidence": 0.7, "reason": f"{source}_bullish", **info}
+        if score < -0.2:
+            return {"sentiment": "bearish", "confidence": 0.7, "reason": f"{source}_bearish", **info}
+        return {"sentiment": "neutral", "confidence": 0.4, "reason": f"{source}_neutral", **info}
+
+    @staticmethod
+    def _source(llm_share: float) -> str:
+        # Sisa < 5% bobot dari sumber lain (sudah meluruh) tidak dihitung "mixed"
+        if llm_share >= 0.95:
+            return "llm"
+        if llm_share <= 0.05:
+            return "local"
+        return "mixed"
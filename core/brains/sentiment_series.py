@@ -0,0 +1,141 @@
+import math
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, Tuple
+from core.config import settings
+
+
+class SentimentSeries:
+    """
+    DECAYING SENTIMENT SERIES (PER SYMBOL)
+
+    Setiap headline yang sudah dinilai disimpan dengan timestamp-nya. Agregat
+    = jumlah skor ter-decay eksponensial (half-life SENTIMENT_HALF_LIFE_SECONDS)
+    dibagi (jumlah bobot + prior). State sesudah setiap item disimpan sebagai
+    checkpoint, jadi nilai di timestamp mana pun (point-in-time, untuk backtest)
+    = bisect + satu decay, O(log n).
+
+    Biaya add(): O(1) hanya untuk item yang datang berurutan (append). Item
+    telat (timestamp lebih lama dari item terakhir) = O(k), k checkpoint
+    sesudahnya dihitung ulang. Checkpoint tertua dibuang per blok (max_points);
+    state sesudah item terakhir yang dibuang disimpan sebagai base, jadi
+    agregat tetap memuat history yang di-trim. Item telat yang lebih tua dari
+    base dilipat ke base (bukan jadi checkpoint); nilai point-in-time sebelum
+    base sudah tidak tersedia.
+
+    Bobot headline yang dinilai LLM dilacak terpisah (decay sama), jadi
+    sumber skor (local / llm / mixed) juga bisa dibaca point-in-time.
+
+    Tanpa headline baru nilainya meluruh halus ke 0 (netral), tidak lompat.
+    """
+
+    def __init__(self, symbol: str, half_life: float = None, prior_weight: float = None,
+                 max_points: int = None):
+        self.symbol = symbol
+        half_life = settings.SENTIMENT_HALF_LIFE_SECONDS if half_life is None else half_life
+        self.decay_rate = math.log(2) / half_life
+        self.prior_weight = settings.SENTIMENT_PRIOR_WEIGHT if prior_weight is None else prior_weight
+        self.max_points = settings.SENTIMENT_SERIES_MAX_POINTS if max_points is None else max_points
+        self._lock = threading.Lock()
+        # Checkpoint sejajar: waktu item, skor item, item dari LLM?,
+        # state (S, W, W_llm) sesudah item
+        self._times = []
+        self._scores = []
+        self._llm = []
+        self._sums = []
+        self._weights = []
+        self._llm_weights = []
+        # State (waktu, S, W, W_llm) sesudah item terakhir yang sudah di-trim
+        self._base_time = None
+        self._base_sum = 0.0
+        self._base_weight = 0.0
+        self._base_llm_weight = 0.0
+
+    def __len__(self):
+        return len(self._times)
+
+    def add(self, timestamp: float, score: float, source: str = "llm"):
+        """Tambah skor headline; `source` = penilai skor ("llm" / "local")."""
+        llm = source == "llm"
+        with self._lock:
+            if self._base_time is not None and timestamp < self._base_time:
+                # Lebih tua dari prefix yang sudah di-trim: masuk ke base, checkpoint dihitung ulang
+                decay = math.exp(-self.decay_rate * (self._base_time - timestamp))
+                self._base_sum += float(score) * decay
+                self._base_weight += decay
+                self._base_llm_weight += decay if llm else 0.0
+                for i in range(len(self._times)):
+                    self._update(i)
+                return
+            pos = bisect_right(self._times, timestamp)
+            self._times.insert(pos, timestamp)
+            self._scores.insert(pos, float(score))
+            self._llm.insert(pos, llm)
+            self._sums.insert(pos, 0.0)
+            self._weights.insert(pos, 0.0)
+            self._llm_weights.insert(pos, 0.0)
+            # Append (pos = item terakhir) -> O(1). Item telat -> hitung ulang sesudahnya, O(k).
+            for i in range(pos, len(self._times)):
+                self._update(i)
+            self._trim()
+
+    def _update(self, i: int):
+        if i == 0:
+            if self._base_time is None:
+                s, w, lw = 0.0, 0.0, 0.0
+            else:
+                decay = math.exp(-self.decay_rate * (self._times[0] - self._base_time))
+                s, w, lw = self._base_sum * decay, self._base_weight * decay, self._base_llm_weight * decay
+        else:
+            decay = math.exp(-self.decay_rate * (self._times[i] - self._times[i - 1]))
+            s, w, lw = self._sums[i - 1] * decay, self._weights[i - 1] * decay, self._llm_weights[i - 1] * decay
+        self._sums[i] = s + self._scores[i]
+        self._weights[i] = w + 1.0
+        self._llm_weights[i] = lw + (1.0 if self._llm[i] else 0.0)
+
+    def _trim(self):
+        # Buang item tertua per blok; state-nya pindah ke base
+        excess = len(self._times) - self.max_points
+        if excess > self.max_points // 10:
+            last = excess - 1
+            self._base_time, self._base_sum, self._base_weight, self._base_llm_weight = (
+                self._times[last], self._sums[last], self._weights[last], self._llm_weights[last])
+            for column in (self._times, self._scores, self._llm, self._sums, self._weights, self._llm_weights):
+                del column[:excess]
+
+    def _state_at(self, timestamp: float = None) -> Tuple[float, float, float]:
+        """State ter-decay (S, W, W_llm) pada timestamp (default: sekarang)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            i = bisect_right(self._times, timestamp) - 1
+            if i >= 0:
+                t, s, w, lw = self._times[i], self._sums[i], self._weights[i], self._llm_weights[i]
+            elif self._base_time is not None and timestamp >= self._base_time:
+                t, s, w, lw = self._base_time, self._base_sum, self._base_weight, self._base_llm_weight
+            else:
+                return 0.0, 0.0, 0.0
+        decay = math.exp(-self.decay_rate * (timestamp - t))
+        return s * decay, w * decay, lw * decay
+
+    def value_at(self, timestamp: float = None) -> Tuple[float, float]:
+        """(skor ter-decay [-1, 1], bobot efektif) pada timestamp (default: sekarang)."""
+        s, w, _ = self._state_at(timestamp)
+        return s / (w + self.prior_weight), w
+
+    def llm_share_at(self, timestamp: float = None) -> float:
+        """Porsi bobot efektif dari skor LLM (0 = semua lexicon lokal), 0 kalau kosong."""
+        _, w, lw = self._state_at(timestamp)
+        return lw / w if w > 0 else 0.0
+
+
+_series: Dict[str, SentimentSeries] = {}
+_series_lock = threading.Lock()
+
+
+def get_sentiment_series(symbol: str) -> SentimentSeries:
+    """Satu SentimentSeries per symbol untuk seluruh proses."""
+    with _series_lock:
+        if symbol not in _series:
+            _series[symbol] = SentimentSeries(symbol)
+        return _series[symbol]
@@ -0,0 +1,91 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any
+from loguru import logger
+from core.config import settings
+
+NEUTRAL_SENTIMENT = {"sentiment": "Neutral", "score": 0}
+
+
+@dataclass(frozen=True)
+class SentimentSnapshot:
+    """Hasil sentiment yang dipublish worker (immutable, aman dibaca lintas thread)."""
+    value: Dict[str, Any] = field(default_factory=lambda: dict(NEUTRAL_SENTIMENT))
+    version: int = 0
+    updated_at: float = 0.0  # time.time() saat publish, 0 = belum pernah
+
+    def age(self, now: float = None) -> float:
+        if not self.updated_at:
+            return float("inf")
+        return (now or time.time()) - self.updated_at
+
+    def is_stale(self, max_age: float = None) -> bool:
+        max_age = settings.SENTIMENT_STALE_SECONDS if max_age is None else max_age
+        return self.age() > max_age
+
+    def current(self, max_age: float = None) -> Dict[str, Any]:
+        """Nilai sentiment, atau Neutral kalau snapshot sudah basi."""
+        if self.is_stale(max_age):
+            return {**NEUTRAL_SENTIMENT, "stale": True}
+        return self.value
+
+
+class SentimentWorker:
+    """
+    BACKGROUND SENTIMENT REFRESHER
+
+    SentimentBrain.analyze() (fetch RSS + call LLM, bisa 20-30 detik) jalan di
+    thread sendiri setiap SENTIMENT_REFRESH_SECONDS. Main loop cuma baca
+    snapshot terakhir lewat snapshot() -> tidak pernah menunggu I/O berita.
+    """
+
+    def __init__(self, brain, interval: float = None):
+        self.brain = brain
+        self.interval = settings.SENTIMENT_REFRESH_SECONDS if interval is None else interval
+        self._snapshot = SentimentSnapshot()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sentiment-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"📰 SentimentWorker started (refresh {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def refresh_now(self):
+        """Minta refresh secepatnya (tanpa menunggu interval)."""
+        self._wake.set()
+
+    def snapshot(self) -> SentimentSnapshot:
+        with self._lock:
+            return self._snapshot
+
+    def _publish(self, value: Dict[str, Any]):
+        with self._lock:
+            self._snapshot = SentimentSnapshot(
+                value=dict(value), version=self._snapshot.version + 1, updated_at=time.time()
+            )
+        logger.info(f"📰 Sentiment Update: {value.get('sentiment')} (v{self._snapshot.version})")
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._publish(self.brain.analyze())
+            except Exception as e:
+                # Snapshot lama tetap dipakai sampai basi
+                logger.error(f"SentimentWorker Error: {e}")
+            elapsed = time.monotonic() - started
+            logger.debug(f"📰 Sentiment refresh took {elapsed:.1f}s")
+
+            self._wake.wait(max(0.0, self.interval - elapsed))
+            self._wake.clear()
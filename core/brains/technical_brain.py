@@ -1,6 +1,7 @@
-import pandas as pd
-import pandas_ta as ta
 from loguru import logger
+from core.config import settings
+from core.brains.indicator_engine import IndicatorEngine
+from core.brains.order_blocks import scan_order_blocks, pick_legacy
 
 class TechnicalBrain:
     """
@@ -11,48 +12,74 @@ class TechnicalBrain:
     2. Multi-Timeframe (MTF): Menggabungkan Tren H1 dan Eksekusi M15.
     3. Momentum Booster: Logika khusus untuk market sesi Asia yang low-volatility.
     4. Diagnostic Logging: Memberi alasan detail kenapa NO TRADE.
+    5. Incremental Indicators: EMA/RSI/ADX/MACD di-update O(1) per bar close
+       (IndicatorEngine), bukan hitung ulang pandas_ta 500 bar tiap loop.
+    6. Memoized Analysis: Hasil disimpan per (symbol, bar closed terakhir, params).
+       Analisa ulang hanya kalau ada bar close baru atau harga forming bar
+       bergeser > ANALYSIS_REPRICE_PCT. Selain itu hasil lama dipakai (fresh=False).
     """
     
+    # Parameter analisa (ikut jadi bagian key memo)
+    EMA_LENGTHS = (50,)
+    OB_LOOKBACK = 50
+    
     def __init__(self):
+        # Satu engine indikator per (symbol, timeframe)
+        self._engines = {}
+        # Memo hasil analisa: key -> {"price": harga saat analisa, "result": dict}
+        self._memo = {}
+        self.reprice_pct = settings.ANALYSIS_REPRICE_PCT
+        self.params = (self.EMA_LENGTHS, 14, 14, (12, 26, 9), self.OB_LOOKBACK)
         logger.info("🧠 TechnicalBrain: Diagnostic Mode Active (Full Analysis)")
 
-    def _detect_order_blocks(self, df: pd.DataFrame):
+    def _detect_order_blocks(self, bars, lookback: int = 50):
         """
         Logika Deteksi Smart Money Concepts (SMC) Order Blocks.
         Mencari candle terakhir sebelum pergerakan impulsif.
+        
+        - Bullish OB (Demand): Candle merah, candle depannya close > high candle merah.
+        - Bearish OB (Supply): Candle hijau, candle depannya close < low candle hijau.
+        
+        Scan di-vectorize (numpy, satu pass) lewat core.brains.order_blocks.
+        Return (bull_ob, bear_ob, scan) -> bull/bear sama persis dengan loop lama.
         """
         try:
-            if df is None or len(df) < 5: 
-                return 0.0, 0.0
-            
-            bull_ob = 0.0
-            bear_ob = 0.0
+            if bars is None or len(bars) < 5: 
+                return 0.0, 0.0, None
             
-            # Loop mundur dari candle terbaru (index -3) sampai 50 candle ke belakang
-            # Kita skip 2 candle terakhir karena mungkin belum close sempurna
-            for i in range(len(df)-3, len(df)-50, -1):
-                curr = df.iloc[i]     # Candle yang dicek
-                next_c = df.iloc[i+1] # Candle setelahnya (konfirmasi)
-                
-                # --- DETEKSI BULLISH OB (Demand Zone) ---
-                # Definisi: Candle Merah (Bearish) terakhir sebelum kenaikan kuat
-                if curr['close'] < curr['open']: # Candle Merah
-                    # Konfirmasi: Candle depannya Hijau & Close-nya menembus High candle merah
-                    if next_c['close'] > curr['high']: 
-                        bull_ob = curr['low'] # Low candle merah jadi support kuat
-                             
-                # --- DETEKSI BEARISH OB (Supply Zone) ---
-                # Definisi: Candle Hijau (Bullish) terakhir sebelum penurunan kuat
-                if curr['close'] > curr['open']: # Candle Hijau
-                    # Konfirmasi: Candle depannya Merah & Close-nya menembus Low candle hijau
-                    if next_c['close'] < curr['low']: 
-                        bear_ob = curr['high'] # High candle hijau jadi resistance kuat
-                            
-            return bull_ob, bear_ob
+            scan = scan_order_blocks(bars['open'], bars['high'], bars['low'], bars['close'], lookback)
+            bull_ob, bear_ob = pick_legacy(scan)
+            return bull_ob, bear_ob, scan
             
         except Exception as e:
             logger.error(f"Error detecting Order Blocks: {e}")
-            return 0.0, 0.0
+            return 0.0, 0.0, None
+
+    def _memo_key(self, mtf_data: dict):
+        """Key memo: (symbol, (timeframe, waktu bar closed terakhir)..., params)."""
+        parts = []
+        for tf_name in ('M15', 'H1'):
+            bars = mtf_data.get(tf_name)
+            if bars is None or len(bars) < 2:
+                return None
+            parts.append((tf_name, int(bars['time'][-2])))
+        return (settings.SYMBOL, *parts, self.params)
+
+    def _get_memo(self, key, price: float):
+        """Ambil hasil memo kalau harga forming bar belum bergeser melewati threshold."""
+        cached = self._memo.get(key)
+        if not cached or not cached["price"]:
+            return None
+        move_pct = abs(price - cached["price"]) / cached["price"] * 100
+        if move_pct > self.reprice_pct:
+            return None
+        return cached["result"]
+
+    def _put_memo(self, key, price: float, result: dict):
+        # Bar lama tidak akan dipakai lagi, cukup simpan beberapa key terakhir
+        if len(self._memo) >= 8:
+            self._memo.pop(next(iter(self._memo)))
+        self._memo[key] = {"price": price, "result": result}
 
     def analyze_mtf(self, mtf_data: dict):
         """
@@ -61,27 +88,36 @@ class TechnicalBrain:
         try:
             if not mtf_data: return {}
             
-            # --- FUNGSI HELPER: ANALISA SATU DATAFRAME ---
-            def analyze(df):
-                if df is None or df.empty: return {}
-                
-                # 1. Normalisasi Header
-                df.columns = [x.lower() for x in df.columns]
-                
-                # 2. Hitung Indikator (Pandas TA)
-                # Trend
-                df.ta.ema(length=20, append=True)
-                df.ta.ema(length=50, append=True)
-                df.ta.ema(length=200, append=True)
+            # --- MEMO: SKIP ANALISA BERAT KALAU BAR BELUM BERUBAH ---
+            memo_key = self._memo_key(mtf_data)
+            live_price = float(mtf_data['M15']['close'][-1]) if memo_key else 0.0
+            if memo_key:
+                cached = self._get_memo(memo_key, live_price)
+                if cached is not None:
+                    return {**cached, "fresh": False}
+            
+            # --- FUNGSI HELPER: ANALISA SATU TIMEFRAME ---
+            def analyze(tf_name, bars):
+                if bars is None or len(bars) < 2: return {}
                 
-                # Momentum & Volatilitas
-                df.ta.rsi(length=14, append=True)
-                df.ta.adx(length=14, append=True)
-                df.ta.macd(fast=12, slow=26, signal=9, append=True)
+                # 1. Sinkronkan engine indikator dengan window bar
+                #    (cuma bar yang baru close yang di-commit)
+                key = (settings.SYMBOL, tf_name)
+                if key not in self._engines:
+                    self._engines[key] = IndicatorEngine(ema_lengths=(50,))
+                snap = self._engines[key].sync(bars)
                 
-                # Ambil data candle terakhir dan sebelumnya
-                last = df.iloc[-1]
-                prev = df.iloc[-2]
+                # 2. Ambil data candle terakhir (provisional) dan sebelumnya (closed)
+                last = {
+                    'close': snap['last']['close'],
+                    'EMA_50': snap['last']['ema_50'],
+                    'RSI_14': snap['last']['rsi'],
+                    'ADX_14': snap['last']['adx'],
+                    'MACDh_12_26_9': snap['last']['macd_hist'],
+                }
+                prev = {
+                    'MACDh_12_26_9': snap['prev']['macd_hist'],
+                }
                 
                 # 3. Logika Trend (EMA Structure)
                 trend_status = "SIDEWAYS"
@@ -108,12 +144,14 @@ class TechnicalBrain:
                 }
 
             # --- EKSEKUSI ANALISA ---
-            h1 = analyze(mtf_data.get('H1'))
-            m15 = analyze(mtf_data.get('M15'))
+            h1 = analyze('H1', mtf_data.get('H1'))
+            m15 = analyze('M15', mtf_data.get('M15'))
             
             # Data Harga saat ini & SMC Zones dari M15
             current_price = m15.get('close', 0.0)
-            bull_ob, bear_ob = self._detect_order_blocks(mtf_data.get('M15'))
+            m15_bars = mtf_data.get('M15')
+            bull_ob, bear_ob, ob_scan = self._detect_order_blocks(m15_bars)
+            ob_zones = ob_scan.zones(m15_bars['time']) if ob_scan is not None else {"bull": [], "bear": []}
             
             # --- LOGIKA KEPUTUSAN (SNIPER + MOMENTUM BOOSTER) ---
             pattern = "None"
@@ -189,14 +227,20 @@ class TechnicalBrain:
                 logger.info(log_msg)
 
             # Return Hasil Lengkap
-            return {
+            result = {
                 "H1": h1, 
                 "M15": m15, 
                 "patterns": pattern, 
                 "bullish_ob": float(bull_ob), 
                 "bearish_ob": float(bear_ob),
-                "current_price": current_price
+                "ob_zones": ob_zones,
+                "current_price": current_price,
+                # Waktu bar M15 closed terakhir (dipakai untuk dedup keputusan per bar)
+                "bar_time": memo_key[1][1] if memo_key else 0
             }
+            if memo_key:
+                self._put_memo(memo_key, live_price, result)
+            return {**result, "fresh": True}
             
         except Exception as e:
             logger.error(f"Analysis Failed: {e}")
@@ -31,11 +31,72 @@ class Settings(BaseSettings):
     MODEL_QWEN: str = Field(default="qwen/qwen3-next-80b-a3b-instruct")
     MODEL_EVALUATOR: str = Field(default="gemini-2.0-flash")
 
+    # LLM CLIENT (Shared Async Pool)
+    LLM_TIMEOUT_SECONDS: float = Field(default=20.0)  # Deadline per request
+    LLM_MAX_CONNECTIONS: int = Field(default=10)
+    LLM_KEEPALIVE_SECONDS: float = Field(default=60.0)
+    # Hedged request: backup dikirim kalau primary lebih lambat dari p50 x multiplier
+    # LLM_HEDGE_BACKUPS = daftar model MegaLLM dipisah koma, "gemini" = Google SDK langsung
+    LLM_HEDGE_ENABLED: bool = Field(default=True)
+    LLM_HEDGE_BACKUPS: str = Field(default="gemini")
+    LLM_HEDGE_P50_MULTIPLIER: float = Field(default=1.5)
+    LLM_HEDGE_DEFAULT_DELAY: float = Field(default=3.0)
+    LLM_HEDGE_MIN_DELAY: float = Field(default=0.5)
+    # Model router: kandidat per role (dipisah koma, kosong = model default role)
+    LLM_ROUTE_STRATEGIST: str = Field(default="")
+    LLM_ROUTE_RISK: str = Field(default="")
+    LLM_ROUTE_EVALUATOR: str = Field(default="")
+    LLM_ROUTE_SENTIMENT: str = Field(default="")
+    # Circuit breaker: buka setelah N gagal beruntun (401/403 langsung buka)
+    LLM_BREAKER_FAILURES: int = Field(default=3)
+    LLM_BREAKER_COOLDOWN: float = Field(default=60.0)
+    LLM_BREAKER_MAX_COOLDOWN: float = Field(default=900.0)
+    # Semantic cache jawaban LLM (key = role + konteks market ter-quantize)
+    LLM_CACHE_ENABLED: bool = Field(default=True)
+    LLM_CACHE_TTL_SECONDS: float = Field(default=300.0)
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=256)
+    LLM_CACHE_RSI_BUCKET: float = Field(default=2.0)
+    LLM_CACHE_ADX_BUCKET: float = Field(default=5.0)
+    LLM_CACHE_PRICE_BUCKET_PCT: float = Field(default=0.025)  # Persen harga (XAUUSD 2000: ~$0.5)
+    LLM_CACHE_PATH: str = Field(default="")  # Kosong = memory saja, mis. "data/llm_cache.json"
+    # Streaming jawaban council: stop begitu action HOLD/REJECT sudah terbaca
+    LLM_STREAMING: bool = Field(default=True)
+    # Deadline keputusan entry (detik, 0 = tanpa batas). Lewat deadline -> fallback.
+    # Satu call council ~2s+, Strategist -> Risk berurutan ~4-5s: budget harus di atas itu
+    DECISION_BUDGET_SECONDS: float = Field(default=8.0)
+    # HOLD (default) = tidak entry tanpa AI. RULES = opt-in: entry rule-based, lot dikecilkan
+    DECISION_FALLBACK: str = Field(default="HOLD")
+    FALLBACK_RSI_BUY_MAX: float = Field(default=65.0)
+    FALLBACK_RSI_SELL_MIN: float = Field(default=35.0)
+    FALLBACK_OB_MAX_DIST_PCT: float = Field(default=0.15)  # Persen dari harga
+    FALLBACK_SL_DIST: float = Field(default=4.0)  # Jarak absolut satuan harga (XAUUSD: 4.0 = $4)
+    FALLBACK_RR: float = Field(default=1.5)
+    FALLBACK_LOT_FACTOR: float = Field(default=0.5)  # Lot dikecilkan tanpa konfirmasi AI
+    # Batas token bagian data dinamis di prompt (perkiraan lokal)
+    PROMPT_CONTEXT_TOKEN_BUDGET: int = Field(default=200)
+    # Council spekulatif: Strategist & Risk Governor ditanya paralel
+    COUNCIL_SPECULATIVE: bool = Field(default=True)
+
     GEMINI_API_KEY: Optional[str] = Field(default=None)
     GEMINI_MODEL: str = Field(default="gemini-2.0-flash")
     OPENAI_API_KEY: Optional[str] = Field(default=None)
     OPENAI_MODEL: str = Field(default="gpt-4-turbo-preview")
 
+    # SENTIMENT (background worker)
+    SENTIMENT_REFRESH_SECONDS: int = Field(default=300)
+    SENTIMENT_STALE_SECONDS: int = Field(default=900)  # Lebih tua dari ini -> dianggap Neutral
+    NEWS_FETCH_TIMEOUT: float = Field(default=5.0)  # Per feed (semua feed diambil paralel)
+    NEWS_MIN_RELEVANCE: float = Field(default=0.4)  # Headline di bawah ini tidak relevan untuk SYMBOL
+    HEADLINE_STORE_PATH: str = Field(default="data/headlines.json")
+    HEADLINE_TTL_SECONDS: int = Field(default=7200)  # Headline lebih tua tidak ikut agregat
+    # Scorer lexicon lokal; headline dengan confidence di bawah ini baru dikirim ke LLM
+    SENTIMENT_LOCAL_ENABLED: bool = Field(default=True)
+    SENTIMENT_LOCAL_MIN_CONFIDENCE: float = Field(default=0.6)
+    # Series sentiment ter-decay: half-life skor headline & bobot prior netral
+    SENTIMENT_HALF_LIFE_SECONDS: float = Field(default=3600)
+    SENTIMENT_PRIOR_WEIGHT: float = Field(default=1.0)
+    SENTIMENT_SERIES_MAX_POINTS: int = Field(default=5000)
+
     # RISK
     RISK_PER_TRADE_PCT: float = 1.0
     MAX_DAILY_DRAWDOWN_PCT: float = 3.0
@@ -43,9 +104,52 @@ class Settings(BaseSettings):
     TECH_CONF_THRESHOLD: float = 0.20
     
     # Ganti Default jadi 20 detik (Swing gak perlu 1 detik)
+    # Sekarang = cadence task "signal" di luar bar close (jalur reprice)
     LOOP_SLEEP_SECONDS: int = Field(default=20) 
     MIN_BARS_REQUIRED: int = 200
 
+    # FEED (Incremental Bar Cache)
+    # Jumlah bar terakhir yang diminta tiap loop setelah cache ter-seed
+    FEED_TAIL_BARS: int = Field(default=3)
+
+    # SCHEDULER (cadence & budget per task, detik)
+    SCHED_RESOLUTION_SECONDS: float = Field(default=0.1)  # Granularitas cek bar close
+    SCHED_TICK_SECONDS: float = Field(default=1.0)  # Trailing stop + status dashboard
+    SCHED_TICK_BUDGET_SECONDS: float = Field(default=0.5)
+    SIGNAL_BAR_CLOSE_DELAY: float = Field(default=1.0)  # Tunggu bar final di broker
+    SIGNAL_BUDGET_SECONDS: float = Field(default=5.0)  # Council jalan di thread sendiri, tidak dihitung
+    SIGNAL_STALE_SECONDS: float = Field(default=60.0)  # Bar close yang telat > ini di-skip
+    HISTORY_SYNC_SECONDS: float = Field(default=30.0)
+    HISTORY_BUDGET_SECONDS: float = Field(default=2.0)
+    TELEMETRY_SECONDS: float = Field(default=10.0)
+
+    # TRAILING STOP ENGINE (jarak dalam satuan harga, contoh XAUUSD: 1.00 = $1)
+    TRAIL_ENGINE_ENABLED: bool = Field(default=True)  # True = task scheduler sendiri, False = di task tick
+    TRAIL_POLL_SECONDS: float = Field(default=0.1)  # Target; delay nyata = lateness task "trailing"
+    TRAIL_POSITIONS_REFRESH_SECONDS: float = Field(default=1.0)
+    TRAIL_ACTIVATION_DIST: float = Field(default=1.00)  # Aktif jika profit sudah > ini
+    TRAIL_DIST: float = Field(default=0.50)  # Jarak buntut SL dari harga running
+    TRAIL_SECURE_LOCK: float = Field(default=0.20)  # Minimum profit yang dikunci
+    TRAIL_MIN_STEP: float = Field(default=0.05)  # SL baru harus membaik minimal segini
+
+    # BROKER REGISTRY (cache symbol_info / account_info / tick / posisi)
+    BROKER_SPEC_TTL_SECONDS: float = Field(default=3600.0)  # Spec kontrak jarang berubah
+    BROKER_STATE_TTL_SECONDS: float = Field(default=0.5)  # Akun / tick / posisi: ~satu cycle
+
+    # MARGIN MODEL: kalibrasi ulang order_calc_margin kalau harga bergeser > X%
+    MARGIN_REPRICE_PCT: float = Field(default=0.5)
+
+    # MODIFY QUEUE (SL/TP) di MT5Executor
+    MODIFY_MIN_INTERVAL_SECONDS: float = Field(default=1.0)  # Rate limit per ticket
+    # Geser SL < ini (points) dibuang. XAUUSD 2 digit: 5 points = 0.05 = TRAIL_MIN_STEP;
+    # TrailingEngine selalu pakai step >= delta ini supaya target tidak dibuang
+    MODIFY_MIN_DELTA_POINTS: int = Field(default=5)
+    MODIFY_REJECT_COOLDOWN_SECONDS: float = Field(default=5.0)  # Jeda setelah broker menolak
+
+    # ANALYSIS (Bar-Close Driven)
+    # Analisa ulang di tengah bar hanya kalau harga bergeser > X% dari saat analisa terakhir
+    ANALYSIS_REPRICE_PCT: float = Field(default=0.05)
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,7 +1,11 @@
 import MetaTrader5 as mt5
 from loguru import logger
+import threading
 import time
 import math
+from core.config import settings
+from core.feeder.broker_registry import get_broker_registry
+from core.risk.margin_model import get_margin_model
 
 class MT5Executor:
     """
@@ -11,18 +15,36 @@ class MT5Executor:
     - Menangani anomali dimana kalkulasi margin lokal > lot yang ditolak.
     - Menggunakan logika 'Force Cut 50%' jika matematika tidak sinkron dengan broker.
     - Memastikan order TETAP MASUK berapapun lot-nya (selama > min_lot).
+    - Spec symbol, akun & tick dibaca dari BrokerRegistry (snapshot bersama).
+    - Modifikasi SL/TP lewat antrian: update per ticket digabung ke target
+      terakhir, no-op & perubahan < MODIFY_MIN_DELTA_POINTS dibuang, tiap
+      ticket maksimal satu modify per MODIFY_MIN_INTERVAL_SECONDS.
     """
     
     def __init__(self, symbol):
         self.symbol = symbol
         self.magic_number = 998877 
         self.deviation = 20
+        self.broker = get_broker_registry()
+        self.margin_model = get_margin_model()
+
+        # Antrian modify SL/TP: ticket -> (sl, tp) target terakhir
+        self._modify_lock = threading.Lock()
+        self._pending = {}
+        self._known = {}        # ticket -> (sl, tp) terakhir yang diketahui ada di server
+        self._last_sent = {}    # ticket -> time.monotonic() modify terakhir
+        self._cooldown = {}     # ticket -> time.monotonic() boleh coba lagi setelah reject
+        self.min_interval = settings.MODIFY_MIN_INTERVAL_SECONDS
+        self.min_delta_points = settings.MODIFY_MIN_DELTA_POINTS
+        self.reject_cooldown = settings.MODIFY_REJECT_COOLDOWN_SECONDS
+        self.modify_stats = {"requested": 0, "coalesced": 0, "dropped": 0,
+                             "sent": 0, "done": 0, "no_change": 0, "rejected": 0}
         logger.info(f"🔫 MT5Executor V5.2 Ready for {symbol}")
 
     def _get_fill_policy(self):
         """Menentukan Filling Mode yang aman"""
         try:
-            symbol_info = mt5.symbol_info(self.symbol)
+            symbol_info = self.broker.spec(self.symbol)
             if not symbol_info: return mt5.ORDER_FILLING_IOC
             
             filling_modes = symbol_info.filling_mode
@@ -40,6 +62,7 @@ class MT5Executor:
         Fungsi eksekusi dengan logika survival (bertahan hidup).
         """
         current_retry = 0
+        margin_recalibrated = False  # Kalibrasi margin ke server cukup sekali per order
         
         while current_retry < max_retries:
             # 1. Kirim Order
@@ -48,6 +71,8 @@ class MT5Executor:
             # --- SKENARIO SUKSES ---
             if result.retcode == mt5.TRADE_RETCODE_DONE:
                 logger.success(f"✅ Order Executed: Ticket {result.order} | Vol: {result.volume}")
+                # Posisi & margin berubah: snapshot dinamis diambil ulang
+                self.broker.invalidate()
                 return result
             
             # --- SKENARIO MARGIN KURANG (10019 / 10014) ---
@@ -55,9 +80,10 @@ class MT5Executor:
                 rejected_vol = request['volume']
                 logger.warning(f"⚠️ Margin Reject for {rejected_vol} Lot. Attempting Recovery...")
                 
-                acc = mt5.account_info()
-                tick = mt5.symbol_info_tick(self.symbol)
-                sym = mt5.symbol_info(self.symbol)
+                # Akun & harga wajib segar setelah reject; spec boleh dari cache
+                acc = self.broker.account(max_age=0)
+                tick = self.broker.tick(self.symbol, max_age=0)
+                sym = self.broker.spec(self.symbol)
                 
                 if acc and tick and sym:
                     # Ambil spesifikasi lot broker
@@ -65,19 +91,19 @@ class MT5Executor:
                     step_lot = sym.volume_step
                     price = tick.ask if request['type'] == mt5.ORDER_TYPE_BUY else tick.bid
                     
-                    # Hitung margin untuk lot terkecil
-                    margin_min = mt5.order_calc_margin(request['type'], self.symbol, min_lot, price)
-                    
-                    new_vol = 0.0
+                    # Margin dari MarginModel: margin reject pertama kalibrasi ulang ke
+                    # server (walau sudah ada requote sebelumnya), retry berikutnya
+                    # cukup ekstrapolasi (tanpa round-trip)
+                    leverage = getattr(acc, "leverage", None)
+                    fresh = not margin_recalibrated
+                    margin_recalibrated = True
+                    margin_min = self.margin_model.margin(self.symbol, request['type'], min_lot, price,
+                                                          leverage, fresh=fresh)
                     
-                    if margin_min and margin_min > 0:
-                        # Hitung kapasitas maksimal berdasarkan 95% free margin
-                        max_capacity = (acc.margin_free * 0.95 / margin_min) * min_lot
-                        
-                        # Rounding ke step terdekat
-                        # Rumus: round(value / step) * step
-                        new_vol = round(max_capacity / step_lot) * step_lot
-                        new_vol = round(new_vol, 2)
+                    # Kapasitas maksimal berdasarkan 95% free margin (kelipatan step)
+                    new_vol = self.margin_model.max_lot(self.symbol, request['type'], acc.margin_free, price,
+                                                        step_lot, leverage)
+                    new_vol = round(new_vol, 2)
                     
                     # --- LOGIKA PENYELAMAT (THE FIX) ---
                     # Jika hitungan baru (new_vol) LEBIH BESAR atau SAMA dengan lot yang ditolak,
@@ -118,7 +144,7 @@ class MT5Executor:
             # --- SKENARIO REQUOTE (10004) ---
             elif result.retcode == 10004:
                 logger.warning("⚠️ Requote detected. Refreshing price...")
-                tick = mt5.symbol_info_tick(self.symbol)
+                tick = self.broker.tick(self.symbol, max_age=0)
                 if tick:
                     request['price'] = tick.ask if request['type'] == mt5.ORDER_TYPE_BUY else tick.bid
                 time.sleep(0.5)
@@ -134,7 +160,7 @@ class MT5Executor:
 
     def buy_market(self, volume, sl=0.0, tp=0.0, comment="AI Buy"):
         """Wrapper Buy"""
-        tick = mt5.symbol_info_tick(self.symbol)
+        tick = self.broker.tick(self.symbol, max_age=0)
         if not tick: return
 
         request = {
@@ -157,7 +183,7 @@ class MT5Executor:
 
     def sell_market(self, volume, sl=0.0, tp=0.0, comment="AI Sell"):
         """Wrapper Sell"""
-        tick = mt5.symbol_info_tick(self.symbol)
+        tick = self.broker.tick(self.symbol, max_age=0)
         if not tick: return
 
         request = {
@@ -180,7 +206,7 @@ class MT5Executor:
 
     def close_position(self, ticket, volume, order_type, comment="AI Close"):
         """Wrapper Close"""
-        tick = mt5.symbol_info_tick(self.symbol)
+        tick = self.broker.tick(self.symbol, max_age=0)
         if not tick: return
         
         close_type = mt5.ORDER_TYPE_SELL if order_type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
@@ -203,6 +229,7 @@ class MT5Executor:
         result = mt5.order_send(request)
         if result.retcode == mt5.TRADE_RETCODE_DONE:
             logger.success(f"🏁 Closed Position {ticket} | Vol: {volume}")
+            self.broker.invalidate()
         else:
             logger.error(f"Failed to Close {ticket}: {result.retcode}")
 
@@ -215,6 +242,92 @@ class MT5Executor:
             "tp": float(tp)
         }
         result = mt5.order_send(request)
+        if result is None:
+            logger.error(f"Modify Failed Ticket {ticket}: {mt5.last_error()}")
+            return None
         if result.retcode != mt5.TRADE_RETCODE_DONE:
             if result.retcode != 10025:
-                logger.error(f"Modify Failed Ticket {ticket}: {result.retcode}")
\ No newline at end of file
+                logger.error(f"Modify Failed Ticket {ticket}: {result.retcode}")
+        return result
+
+    # --- Antrian Modify SL/TP ---
+
+    def _price_format(self):
+        """(point, digits) symbol dari spec kontrak."""
+        spec = self.broker.spec(self.symbol)
+        if not spec:
+            return 0.0, None
+        return spec.point, spec.digits
+
+    def min_delta_price(self) -> float:
+        """Delta SL minimum antrian dalam satuan harga (MODIFY_MIN_DELTA_POINTS x point)."""
+        point, _ = self._price_format()
+        return self.min_delta_points * point
+
+    def request_modify(self, ticket, sl, tp, current_sl=None, current_tp=None):
+        """
+        Masukkan target SL/TP ke antrian (tidak langsung dikirim).
+        Request berikutnya untuk ticket yang sama menimpa target sebelumnya.
+        Pembanding no-op = SL/TP yang SUDAH dikonfirmasi server (`_known`);
+        `current_sl/current_tp` (nilai server dari positions_get) hanya dipakai
+        kalau ticket belum pernah kita modify.
+        Return False kalau request dibuang (no-op / di bawah delta minimum);
+        target pending yang sudah ada tidak ikut dibuang.
+        """
+        point, digits = self._price_format()
+        if digits is not None:
+            sl, tp = round(float(sl), digits), round(float(tp), digits)
+        # Setengah point toleransi: geser tepat MODIFY_MIN_DELTA_POINTS jangan kalah oleh error float
+        min_delta = max(self.min_delta_points * point - point / 2, 1e-9)
+
+        with self._modify_lock:
+            self.modify_stats["requested"] += 1
+            known = self._known.get(ticket)
+            if known is None and current_sl is not None:
+                known = (current_sl, current_tp if current_tp is not None else tp)
+            if known is not None and abs(sl - known[0]) < min_delta and abs(tp - known[1]) < 1e-9:
+                # SL bergeser kurang dari delta minimum & TP sama: tidak perlu ke broker
+                self.modify_stats["dropped"] += 1
+                return False
+            if ticket in self._pending:
+                self.modify_stats["coalesced"] += 1
+            self._pending[ticket] = (sl, tp)
+            return True
+
+    def flush_modifications(self) -> int:
+        """Kirim target yang sudah boleh dikirim (rate limit per ticket). Return jumlah yang dikirim."""
+        now = time.monotonic()
+        with self._modify_lock:
+            ready = []
+            for ticket, target in list(self._pending.items()):
+                if now < self._cooldown.get(ticket, 0.0) or now - self._last_sent.get(ticket, -1e9) < self.min_interval:
+                    continue
+                ready.append((ticket, target))
+                del self._pending[ticket]
+                self._last_sent[ticket] = now
+
+        for ticket, (sl, tp) in ready:
+            result = self.modify_position(ticket, sl, tp)
+            with self._modify_lock:
+                self.modify_stats["sent"] += 1
+                if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+                    self.modify_stats["done"] += 1
+                    self._known[ticket] = (sl, tp)
+                elif result is not None and result.retcode == 10025:
+                    # No changes: server sudah punya SL/TP ini
+                    self.modify_stats["no_change"] += 1
+                    self._known[ticket] = (sl, tp)
+                else:
+                    self.modify_stats["rejected"] += 1
+                    self._cooldown[ticket] = time.monotonic() + self.reject_cooldown
+        return len(ready)
+
+    def modify_report(self):
+        with self._modify_lock:
+            return {**self.modify_stats, "pending": len(self._pending)}
+
+    def forget_ticket(self, ticket):
+        """Posisi sudah tutup: bersihkan state antrian ticket."""
+        with self._modify_lock:
+            for table in (self._pending, self._known, self._last_sent, self._cooldown):
+                table.pop(ticket, None)
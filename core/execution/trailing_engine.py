@@ -0,0 +1,134 @@
+import threading
+import time
+import MetaTrader5 as mt5
+import numpy as np
+from loguru import logger
+from core.config import settings
+from core.feeder.broker_registry import get_broker_registry
+
+
+class TrailingEngine:
+    """
+    TRAILING STOP ENGINE (TICK DRIVEN)
+
+    Logika sama dengan trailing "Aggressive Secure": begitu profit > ACTIVATION,
+    SL digeser ke harga - TRAIL (BUY) / harga + TRAIL (SELL), minimal
+    Break Even + SECURE_LOCK. Bedanya:
+    - run_once() dipanggil task Scheduler tiap TRAIL_POLL_SECONDS (~100ms), di
+      thread yang sama dengan order lain (API MT5 tidak thread-safe). Reaksi
+      terburuk = poll + durasi task lain terlama di thread itu; cek
+      max_lateness / p95_lateness task "trailing" di laporan scheduler
+    - semua posisi dievaluasi sekaligus (numpy array), bukan satu-satu
+    - cache posisi di-refresh sendiri tiap TRAIL_POSITIONS_REFRESH_SECONDS
+      (dari BrokerRegistry; tick tetap langsung ke terminal demi latency)
+    - target SL baru hanya kalau membaik >= TRAIL_MIN_STEP, lalu masuk antrian
+      modify executor (coalesce + rate limit per ticket), di-flush tiap poll
+    """
+
+    def __init__(self, executor, symbol: str, poll_interval: float = None, refresh_interval: float = None):
+        self.executor = executor
+        self.broker = get_broker_registry()
+        self.symbol = symbol
+        self.poll_interval = settings.TRAIL_POLL_SECONDS if poll_interval is None else poll_interval
+        self.refresh_interval = settings.TRAIL_POSITIONS_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        self.activation = settings.TRAIL_ACTIVATION_DIST
+        self.trail = settings.TRAIL_DIST
+        self.lock_dist = settings.TRAIL_SECURE_LOCK
+        # Step trailing tidak boleh lebih kecil dari delta minimum antrian modify,
+        # kalau tidak request akan dibuang executor berulang-ulang
+        self.min_step = max(settings.TRAIL_MIN_STEP, executor.min_delta_price())
+
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._last_tick_msc = None
+        self._empty()
+        self.stats = {"evaluations": 0, "requested": 0, "last_eval_ms": None}
+
+    def _empty(self):
+        self.tickets = np.zeros(0, dtype=np.int64)
+        self.is_buy = np.zeros(0, dtype=bool)
+        self.open = np.zeros(0)
+        self.sl = np.zeros(0)          # SL target terakhir (optimistis)
+        self.server_sl = np.zeros(0)   # SL menurut server saat refresh terakhir
+        self.tp = np.zeros(0)
+
+    def invalidate(self):
+        """Posisi berubah (entry / close): refresh cache di putaran berikutnya."""
+        self._refreshed_at = 0.0
+
+    # --- Core ---
+
+    def refresh_positions(self):
+        positions = self.broker.positions(self.symbol)
+        with self._lock:
+            # Ticket yang sudah tutup: bersihkan state antrian modify di executor
+            for ticket in set(self.tickets.tolist()) - {p.ticket for p in positions}:
+                self.executor.forget_ticket(ticket)
+            if not positions:
+                self._empty()
+            else:
+                self.tickets = np.array([p.ticket for p in positions], dtype=np.int64)
+                self.is_buy = np.array([p.type == mt5.ORDER_TYPE_BUY for p in positions], dtype=bool)
+                self.open = np.array([p.price_open for p in positions], dtype=float)
+                self.sl = np.array([p.sl for p in positions], dtype=float)
+                self.server_sl = self.sl.copy()
+                self.tp = np.array([p.tp for p in positions], dtype=float)
+            self._refreshed_at = time.monotonic()
+
+    def run_once(self) -> int:
+        """Satu putaran: evaluasi tick terbaru, lalu kirim antrian modify. Return jumlah target baru."""
+        if not self.enabled:
+            return 0
+        requested = self._poll()
+        # Target yang tertahan rate limit dikirim di putaran berikutnya
+        self.executor.flush_modifications()
+        return requested
+
+    def _poll(self) -> int:
+        refreshed = False
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh_positions()
+            refreshed = True
+        if not len(self.tickets):
+            return 0
+
+        tick = mt5.symbol_info_tick(self.symbol)
+        if not tick:
+            return 0
+        # Tidak ada tick baru & posisi tidak berubah -> tidak ada yang perlu dihitung
+        tick_msc = getattr(tick, "time_msc", None)
+        if tick_msc is not None and tick_msc == self._last_tick_msc and not refreshed:
+            return 0
+        self._last_tick_msc = tick_msc
+        return self.evaluate(tick.bid, tick.ask)
+
+    def evaluate(self, bid: float, ask: float) -> int:
+        started = time.perf_counter()
+        with self._lock:
+            self.stats["evaluations"] += 1
+            buy = self.is_buy
+            # Harga tutup posisi: BUY ditutup di bid, SELL di ask
+            price = np.where(buy, bid, ask)
+            profit = np.where(buy, price - self.open, self.open - price)
+
+            proposed = np.where(buy,
+                                np.maximum(price - self.trail, self.open + self.lock_dist),
+                                np.minimum(price + self.trail, self.open - self.lock_dist))
+            # SELL tanpa SL (0.0) selalu dianggap membaik
+            improve = np.where(buy, proposed - self.sl,
+                               np.where(self.sl == 0.0, np.inf, self.sl - proposed))
+            send = (profit > self.activation) & (improve >= self.min_step)
+            targets = [(int(self.tickets[i]), "BUY" if buy[i] else "SELL", float(proposed[i]),
+                        float(self.tp[i]), float(self.server_sl[i])) for i in np.flatnonzero(send)]
+            # Target dianggap terpasang; refresh posisi akan koreksi kalau ditolak broker
+            self.sl = np.where(send, proposed, self.sl)
+            self.stats["last_eval_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        requested = 0
+        for ticket, side, new_sl, tp, current_sl in targets:
+            if self.executor.request_modify(ticket, new_sl, tp, current_sl=current_sl, current_tp=tp):
+                logger.info(f"🏃 TRAILING {side}: Ticket {ticket} | Locked Profit: {new_sl}")
+                requested += 1
+        self.stats["requested"] += requested
+        return requested
@@ -0,0 +1,52 @@
+from loguru import logger
+from core.feeder.ring_buffer import OHLCVRingBuffer
+
+
+class BarCache:
+    """
+    BAR CACHE V2: INCREMENTAL HISTORY (RING BUFFER)
+
+    Menyimpan window bar per (symbol, timeframe) di OHLCVRingBuffer.
+    - Seed sekali pakai download penuh (copy_rates_from_pos 500 bar).
+    - Loop berikutnya cukup merge beberapa bar terakhir dari broker:
+      bar yang masih jalan (forming) di-update, bar baru ditambahkan.
+    - Kalau ada gap (bar hilang di antara cache & data baru), merge ditolak
+      supaya feeder melakukan seed ulang.
+    """
+
+    def __init__(self):
+        self._store = {}
+
+    def get(self, symbol: str, timeframe: int):
+        """Ring buffer yang sedang di-cache, atau None."""
+        return self._store.get((symbol, timeframe))
+
+    def last_time(self, symbol: str, timeframe: int) -> int:
+        """Timestamp (epoch detik) bar terakhir di cache, 0 kalau kosong."""
+        buf = self.get(symbol, timeframe)
+        return buf.last_time() if buf is not None else 0
+
+    def seed(self, symbol: str, timeframe: int, rates, capacity: int):
+        """Isi ulang cache dengan hasil download penuh."""
+        buf = self.get(symbol, timeframe)
+        if buf is None or buf.capacity != capacity:
+            buf = OHLCVRingBuffer(capacity)
+            self._store[(symbol, timeframe)] = buf
+        buf.seed(rates)
+        logger.debug(f"BarCache: Seed {symbol} TF {timeframe} ({len(buf)} bars)")
+
+    def merge(self, symbol: str, timeframe: int, rates) -> bool:
+        """
+        Gabungkan bar terbaru ke cache.
+        Return False kalau cache kosong atau ada gap (perlu seed ulang).
+        """
+        buf = self.get(symbol, timeframe)
+        if buf is None:
+            return False
+        return buf.merge(rates)
+
+    def invalidate(self, symbol: str = None):
+        """Kosongkan cache (semua atau hanya satu symbol)."""
+        for key, buf in self._store.items():
+            if symbol is None or key[0] == symbol:
+                buf.clear()
@@ -0,0 +1,103 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import MetaTrader5 as mt5
+from core.config import settings
+
+
+@dataclass(frozen=True)
+class ContractSpec:
+    """Spesifikasi kontrak symbol (nama field sama dengan mt5.symbol_info)."""
+    name: str
+    digits: int
+    point: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+    trade_tick_value: float
+    trade_tick_size: float
+    trade_contract_size: float
+    trade_stops_level: int
+    filling_mode: int
+
+    @classmethod
+    def from_info(cls, info) -> "ContractSpec":
+        return cls(**{name: getattr(info, name) for name in cls.__dataclass_fields__})
+
+
+class BrokerRegistry:
+    """
+    BROKER SNAPSHOT REGISTRY (TTL)
+
+    Satu sumber data broker untuk feeder, risk & executor:
+    - spec kontrak (digits, volume min/max/step, tick value, filling mode)
+      jarang berubah -> di-cache BROKER_SPEC_TTL_SECONDS
+    - state dinamis (account, tick, posisi) -> di-cache BROKER_STATE_TTL_SECONDS
+      (kira-kira satu cycle), jadi semua modul dalam satu cycle lihat view yang sama
+    Hasil gagal (None) tidak di-cache. `max_age=0` = paksa ambil baru.
+    """
+
+    def __init__(self, spec_ttl: float = None, state_ttl: float = None):
+        self.spec_ttl = settings.BROKER_SPEC_TTL_SECONDS if spec_ttl is None else spec_ttl
+        self.state_ttl = settings.BROKER_STATE_TTL_SECONDS if state_ttl is None else state_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _get(self, key: Tuple, ttl: float, fetch: Callable[[], Any], max_age: float = None):
+        limit = ttl if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= limit:
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+        # IPC ke terminal di luar lock
+        value = fetch()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def spec(self, symbol: str, max_age: float = None) -> Optional[ContractSpec]:
+        def fetch():
+            info = mt5.symbol_info(symbol)
+            return ContractSpec.from_info(info) if info else None
+        return self._get(("spec", symbol), self.spec_ttl, fetch, max_age)
+
+    def account(self, max_age: float = None):
+        return self._get(("account",), self.state_ttl, mt5.account_info, max_age)
+
+    def tick(self, symbol: str, max_age: float = None):
+        return self._get(("tick", symbol), self.state_ttl, lambda: mt5.symbol_info_tick(symbol), max_age)
+
+    def positions(self, symbol: str, max_age: float = None) -> Tuple:
+        positions = self._get(("positions", symbol), self.state_ttl,
+                              lambda: mt5.positions_get(symbol=symbol), max_age)
+        return positions or ()
+
+    def invalidate(self):
+        """Order masuk / posisi tutup: state dinamis diambil ulang di akses berikutnya."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] != "spec"]:
+                del self._entries[key]
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_broker_registry() -> BrokerRegistry:
+    """Singleton BrokerRegistry untuk seluruh proses."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BrokerRegistry()
+        return _registry
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+from core.config import settings
+
+
+def normalize_title(title: str) -> str:
+    return " ".join((title or "").lower().split())
+
+
+def headline_key(title: str, link: str = "") -> str:
+    """Hash (judul ternormalisasi + link) -> id headline yang stabil."""
+    raw = f"{normalize_title(title)}|{(link or '').strip().lower()}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class HeadlineStore:
+    """
+    HEADLINE DEDUP STORE (PERSISTENT)
+
+    Setiap headline disimpan sekali dengan key hash(judul + link), waktu
+    pertama terlihat dan skor sentiment-nya (-1 / 0 / 1, None = belum dinilai).
+    Headline yang sudah pernah dinilai tidak dikirim lagi ke LLM; entry lebih
+    tua dari HEADLINE_TTL_SECONDS dibuang.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = None):
+        self.path = settings.HEADLINE_STORE_PATH if path is None else path
+        self.ttl = settings.HEADLINE_TTL_SECONDS if ttl is None else ttl
+        self._entries: Dict[str, Dict] = {}
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, items: List[Dict]) -> List[Dict]:
+        """Masukkan item berita (title, link). Return entry yang BARU saja terlihat."""
+        now = time.time()
+        new = []
+        for item in items:
+            title = (item.get("title") or "").strip()
+            if not title:
+                continue
+            key = headline_key(title, item.get("link", ""))
+            if key in self._entries:
+                continue
+            entry = {"key": key, "title": title, "link": item.get("link", ""),
+                     "first_seen": now, "score": None, "source": None}
+            self._entries[key] = entry
+            new.append(entry)
+        self.evict(now)
+        if new:
+            self._save()
+        return new
+
+    def unscored(self) -> List[Dict]:
+        """Headline aktif yang belum punya skor (baru, atau scoring sebelumnya gagal)."""
+        return [e for e in self._entries.values() if e["score"] is None]
+
+    def set_scores(self, scores: Dict[str, float], source: str = "llm"):
+        for key, score in scores.items():
+            if key in self._entries:
+                self._entries[key]["score"] = float(score)
+                self._entries[key]["source"] = source
+        if scores:
+            self._save()
+
+    def scored(self) -> List[Dict]:
+        return [e for e in self._entries.values() if e["score"] is not None]
+
+    def evict(self, now: float = None) -> int:
+        now = now or time.time()
+        expired = [k for k, e in self._entries.items() if now - e["first_seen"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                for entry in json.load(f):
+                    self._entries[entry["key"]] = entry
+            dropped = self.evict()
+            logger.info(f"🗞️ Headline store loaded: {len(self._entries)} headlines ({dropped} expired)")
+        except Exception as e:
+            logger.warning(f"Headline store load failed: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp = f"{self.path}.tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump(list(self._entries.values()), f, indent=1)
+            os.replace(temp, self.path)
+        except Exception as e:
+            logger.error(f"Headline store save failed: {e}")
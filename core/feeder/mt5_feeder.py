@@ -4,12 +4,18 @@ import time
 from datetime import datetime
 from loguru import logger
 from core.config import settings
+from core.feeder.bar_cache import BarCache
+from core.feeder.broker_registry import get_broker_registry
 
 class MT5Feeder:
     def __init__(self):
         self.symbol = settings.SYMBOL
         self.timeframe = settings.TIMEFRAME_MINUTES
         self.connected = False
+        # Cache bar per timeframe (seed sekali, lalu update incremental)
+        self.bar_cache = BarCache()
+        self.tail_bars = settings.FEED_TAIL_BARS
+        self.broker = get_broker_registry()
 
     def initialize(self) -> bool:
         path = settings.MT5_PATH
@@ -41,45 +47,77 @@ class MT5Feeder:
         logger.info(f"✅ MT5 Connected. Symbol: {self.symbol}")
         return True
 
-    def get_history(self, timeframe_code, bars=500) -> pd.DataFrame:
-        """
-        Mengambil data history. 
-        UPGRADE: Default bars dinaikkan ke 500 agar EMA200 bisa dihitung.
-        """
+    def _fetch_rates(self, timeframe_code, bars):
+        """Download penuh dari terminal (dipakai saat seed / reseed)."""
         rates = mt5.copy_rates_from_pos(self.symbol, timeframe_code, 0, bars)
         
         # Retry Logic sederhana kalau data kosong (kadang MT5 belum sync)
         if rates is None or len(rates) == 0:
             time.sleep(0.5)
             rates = mt5.copy_rates_from_pos(self.symbol, timeframe_code, 0, bars)
-            
+        return rates
+
+    def get_window(self, timeframe_code, bars=500):
+        """
+        Ambil window bar dari cache (OHLCVRingBuffer).
+        Seed penuh hanya sekali; loop berikutnya cuma minta `tail_bars` bar
+        terakhir (forming bar + bar yang baru close) lalu di-merge ke buffer.
+        """
+        cached = self.bar_cache.get(self.symbol, timeframe_code)
+        
+        # Sudah di-seed untuk window ini (capacity = bars yang diminta saat seed).
+        # Jangan bandingkan len(cached) dengan bars: broker bisa punya history
+        # lebih pendek dari `bars`, dan itu bukan alasan download penuh tiap loop.
+        if cached is not None and not cached.empty and cached.capacity >= bars:
+            tail = mt5.copy_rates_from_pos(self.symbol, timeframe_code, 0, self.tail_bars)
+            if tail is None or len(tail) == 0:
+                # Broker lagi lambat: pakai cache lama dulu
+                return cached
+            if self.bar_cache.merge(self.symbol, timeframe_code, tail):
+                return cached
+            logger.info(f"🔄 Gap di cache TF {timeframe_code}, seed ulang...")
+        
+        rates = self._fetch_rates(timeframe_code, bars)
         if rates is None or len(rates) == 0:
             logger.warning(f"⚠️ Data kosong untuk {self.symbol}")
+            return None
+        
+        self.bar_cache.seed(self.symbol, timeframe_code, rates, bars)
+        return self.bar_cache.get(self.symbol, timeframe_code)
+
+    def get_history(self, timeframe_code, bars=500) -> pd.DataFrame:
+        """
+        Mengambil data history. 
+        UPGRADE: Default bars dinaikkan ke 500 agar EMA200 bisa dihitung.
+        UPGRADE 2: Data diambil dari ring buffer (DataFrame dibangun lazy).
+        """
+        buf = self.get_window(timeframe_code, bars)
+        if buf is None or buf.empty:
             return pd.DataFrame()
-            
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        return df
+        return buf.frame()
 
     def get_tick_info(self):
-        tick = mt5.symbol_info_tick(self.symbol)
+        tick = self.broker.tick(self.symbol)
         if tick:
-            return {'bid': tick.bid, 'ask': tick.ask, 'time': tick.time}
+            return {'bid': tick.bid, 'ask': tick.ask, 'time': tick.time,
+                    'time_msc': getattr(tick, 'time_msc', None)}
         return None
         
     def get_mtf_data(self):
         """
         Ambil data Multi-Timeframe untuk analisis SNIPER.
+        Return dict berisi OHLCVRingBuffer per timeframe (view read-only,
+        pakai .frame() kalau butuh DataFrame).
         """
         data = {}
         # M1: Untuk eksekusi presisi (opsional, tapi bagus ada)
-        data['M1'] = self.get_history(mt5.TIMEFRAME_M1, bars=200)
+        data['M1'] = self.get_window(mt5.TIMEFRAME_M1, bars=200)
         
         # M15: Timeframe Utama (Signal & Momentum)
         # Butuh 500 bar untuk EMA 200 yang akurat
-        data['M15'] = self.get_history(mt5.TIMEFRAME_M15, bars=500)
+        data['M15'] = self.get_window(mt5.TIMEFRAME_M15, bars=500)
         
         # H1: Timeframe Tren (Big Picture)
-        data['H1'] = self.get_history(mt5.TIMEFRAME_H1, bars=500)
+        data['H1'] = self.get_window(mt5.TIMEFRAME_H1, bars=500)
         
-        return data
\ No newline at end of file
+        return data
@@ -1,16 +1,26 @@
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict
 import feedparser
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 from loguru import logger
+from core.config import settings
+from core.feeder.symbol_relevance import SymbolRelevanceIndex
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class NewsFeeder:
     """
     Feeder berita v2: Sumber lebih stabil & Anti-Blokir.
+    UPGRADE: Semua feed diambil paralel lewat satu Session (keep-alive),
+    pakai conditional GET (ETag / Last-Modified). Kalau server balas 304,
+    hasil parse sebelumnya dipakai ulang tanpa download & parse lagi.
+    Headline disaring per symbol (SymbolRelevanceIndex) sebelum dipakai.
     """
     def __init__(self) -> None:
         self.feeds = [
@@ -27,12 +37,56 @@ class NewsFeeder:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
+        self.timeout = settings.NEWS_FETCH_TIMEOUT
+
+        # Session bersama: pool koneksi per host, dipakai ulang antar refresh
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=len(self.feeds), pool_maxsize=len(self.feeds))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=len(self.feeds), thread_name_prefix="news")
+
+        # Per feed: validator HTTP + hasil parse terakhir + statistik
+        self._state = {url: {"etag": None, "modified": None, "items": []} for url in self.feeds}
+        self.last_fetched = 0
+        self.relevance = SymbolRelevanceIndex()
+        self.min_relevance = settings.NEWS_MIN_RELEVANCE
+        # Ditulis worker pool, dibaca feed_stats() dari thread lain -> lewat lock
+        self._stats_lock = threading.Lock()
+        self._stats = {url: {"requests": 0, "ok": 0, "not_modified": 0, "failures": 0,
+                             "last_error": "", "latency": deque(maxlen=20)} for url in self.feeds}
+
+    def _count(self, url: str, counter: str, error: str = None, latency: float = None):
+        with self._stats_lock:
+            stats = self._stats[url]
+            stats[counter] += 1
+            if error is not None:
+                stats["last_error"] = error
+            if latency is not None:
+                stats["latency"].append(latency)
 
     def _fetch_feed(self, url: str) -> List[Dict]:
+        state = self._state[url]
+        self._count(url, "requests")
+        started = time.perf_counter()
         try:
+            conditional = {}
+            if state["etag"]: conditional["If-None-Match"] = state["etag"]
+            if state["modified"]: conditional["If-Modified-Since"] = state["modified"]
+
             # Timeout dipercepat biar gak nunggu lama
-            resp = requests.get(url, headers=self.headers, timeout=5, verify=False)
-            if resp.status_code != 200: return []
+            resp = self.session.get(url, headers=conditional, timeout=self.timeout, verify=False)
+            latency = time.perf_counter() - started
+
+            if resp.status_code == 304:
+                # Feed tidak berubah: pakai hasil parse terakhir
+                self._count(url, "not_modified", latency=latency)
+                return state["items"]
+            if resp.status_code != 200:
+                self._count(url, "failures", error=f"HTTP {resp.status_code}", latency=latency)
+                return []
+            self._count(url, "ok", latency=latency)
             
             parsed = feedparser.parse(resp.content)
             if not parsed.entries: return []
@@ -46,27 +100,49 @@ class NewsFeeder:
                         "link": getattr(entry, "link", ""),
                         "published_parsed": getattr(entry, "published_parsed", None)
                     })
+
+            # Simpan validator untuk conditional GET berikutnya
+            state["etag"] = resp.headers.get("ETag")
+            state["modified"] = resp.headers.get("Last-Modified")
+            state["items"] = items
             return items
         except Exception as e:
             # Silent error biar log gak penuh spam
+            self._count(url, "failures", error=type(e).__name__)
             return []
 
-    def get_recent_headlines(self, symbol: str, limit: int = 5, max_age_minutes: int = 60) -> List[str]:
+    def feed_stats(self) -> Dict[str, Dict]:
+        """Statistik per feed: jumlah request, 304, gagal, latency (detik)."""
+        with self._stats_lock:
+            snapshot = {url: {**s, "latency": list(s["latency"])} for url, s in self._stats.items()}
+        report = {}
+        for url, s in snapshot.items():
+            samples = s["latency"]
+            report[url] = {
+                "requests": s["requests"], "ok": s["ok"], "not_modified": s["not_modified"],
+                "failures": s["failures"], "last_error": s["last_error"],
+                "last_latency": round(samples[-1], 3) if samples else None,
+                "avg_latency": round(sum(samples) / len(samples), 3) if samples else None,
+            }
+        return report
+
+    def get_recent_items(self, symbol: str, limit: int = 5, max_age_minutes: int = 60) -> List[Dict]:
+        """Item berita terbaru (title, link, published_parsed, relevance) yang relevan untuk symbol."""
+        # Semua feed paralel: total waktu = feed paling lambat, bukan jumlahnya
         all_items = []
-        for url in self.feeds:
-            items = self._fetch_feed(url)
+        for items in self._pool.map(self._fetch_feed, self.feeds):
             all_items.extend(items)
+        self.last_fetched = len(all_items)
 
-        if not all_items:
-            # Fallback text kalau semua offline, biar AI gak bingung
-            return ["Market is quiet.", "No significant news detected."]
+        # Hanya headline yang relevan untuk symbol (satu pass)
+        relevant = self.relevance.filter(symbol, all_items, self.min_relevance)
 
         # Filter Berita Lama
         filtered = []
         now = datetime.utcnow()
         limit_time = now - timedelta(minutes=max_age_minutes)
 
-        for item in all_items:
+        for item in relevant:
             pub = item.get("published_parsed")
             if pub:
                 try:
@@ -78,9 +154,15 @@ class NewsFeeder:
                 # Kalau gak ada tanggal, anggap baru
                 filtered.append(item)
 
-        # Sort dari yang paling baru (kalau ada tanggalnya)
+        logger.info(f"NewsFeeder: Fetched {len(filtered[:limit])} headlines "
+                    f"({len(all_items) - len(relevant)} irrelevant to {symbol} dropped).")
+        return filtered[:limit]
+
+    def get_recent_headlines(self, symbol: str, limit: int = 5, max_age_minutes: int = 60) -> List[str]:
+        items = self.get_recent_items(symbol, limit, max_age_minutes)
+        if not self.last_fetched:
+            # Fallback text kalau semua offline, biar AI gak bingung
+            return ["Market is quiet.", "No significant news detected."]
+
         # Ambil title-nya aja
-        headlines = [x['title'] for x in filtered[:limit]]
-        
-        logger.info(f"NewsFeeder: Fetched {len(headlines)} headlines.")
-        return headlines
\ No newline at end of file
+        return [x['title'] for x in items]
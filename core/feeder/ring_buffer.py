@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Kolom standar hasil copy_rates_* MT5 beserta tipe penyimpanannya
+OHLCV_FIELDS = {
+    'time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'tick_volume': np.int64,
+    'spread': np.int64,
+    'real_volume': np.int64,
+}
+
+
+class OHLCVRingBuffer:
+    """
+    RING BUFFER OHLCV (COLUMNAR, PREALLOCATED)
+
+    Satu array per kolom dengan ukuran 2x capacity. Setiap slot ditulis dua kali
+    (slot & slot + capacity), jadi window bar terbaru SELALU contiguous dan bisa
+    dibagikan sebagai numpy view read-only tanpa copy.
+
+    Memori tetap (flat) seumur hidup bot: tidak ada DataFrame baru per loop,
+    DataFrame hanya dibangun kalau diminta (frame()) dan di-cache per versi.
+
+    PENTING: view() menunjuk ke memori buffer. seed() / merge() berikutnya
+    menimpa slot yang sama in-place, jadi isi view yang disimpan lintas cycle
+    ikut berubah (atau bergeser ke bar lain). Pakai view hanya di dalam satu
+    cycle; kalau perlu disimpan, ambil copy() / snapshot() / frame().
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._cols = {
+            name: np.zeros(self.capacity * 2, dtype=dtype)
+            for name, dtype in OHLCV_FIELDS.items()
+        }
+        self._pos = 0      # Slot tulis berikutnya (0..capacity-1)
+        self._len = 0      # Jumlah bar valid di window
+        self.version = 0   # Naik setiap kali isi buffer berubah
+        self._frame = None
+        self._frame_version = -1
+
+    # === AKSES (READ-ONLY VIEW) ===
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def empty(self) -> bool:
+        return self._len == 0
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.view(field)
+
+    def view(self, field: str) -> np.ndarray:
+        """
+        View zero-copy (read-only) dari window bar, urut dari terlama ke terbaru.
+        Hanya valid sampai merge() / seed() berikutnya (lihat docstring kelas).
+        """
+        start = (self._pos - self._len) % self.capacity
+        v = self._cols[field][start:start + self._len]
+        v.flags.writeable = False
+        return v
+
+    def snapshot(self, field: str) -> np.ndarray:
+        """Copy kolom yang aman disimpan lintas cycle (tidak ikut berubah saat merge)."""
+        return self.view(field).copy()
+
+    def last_time(self) -> int:
+        if self._len == 0:
+            return 0
+        return int(self._cols['time'][(self._pos - 1) % self.capacity])
+
+    def frame(self) -> pd.DataFrame:
+        """
+        DataFrame versi lama (kolom sama seperti pd.DataFrame(rates)).
+        Dibangun lazy & di-cache sampai buffer berubah lagi.
+        """
+        if self._frame is None or self._frame_version != self.version:
+            data = {name: self.view(name).copy() for name in OHLCV_FIELDS}
+            data['time'] = pd.to_datetime(data['time'], unit='s')
+            self._frame = pd.DataFrame(data)
+            self._frame_version = self.version
+        return self._frame
+
+    # === TULIS ===
+
+    def _write(self, rates):
+        n = len(rates)
+        if n == 0:
+            return
+        if n > self.capacity:
+            rates = rates[-self.capacity:]
+            n = self.capacity
+
+        slots = (self._pos + np.arange(n)) % self.capacity
+        for name, col in self._cols.items():
+            values = rates[name] if name in rates.dtype.names else 0
+            col[slots] = values
+            col[slots + self.capacity] = values
+
+        self._pos = (self._pos + n) % self.capacity
+        self._len = min(self._len + n, self.capacity)
+
+    def clear(self):
+        self._pos = 0
+        self._len = 0
+        self.version += 1
+
+    def seed(self, rates):
+        """Isi ulang buffer dari structured array MT5 (download penuh)."""
+        self._pos = 0
+        self._len = 0
+        self._write(np.sort(rates, order='time'))
+        self.version += 1
+
+    def merge(self, rates) -> bool:
+        """
+        Gabungkan bar terbaru (forming bar + bar baru).
+        Return False kalau buffer kosong atau ada gap (perlu seed ulang).
+        """
+        if self._len == 0 or rates is None or len(rates) == 0:
+            return False
+
+        rates = np.sort(rates, order='time')
+        first_new = rates['time'][0]
+        times = self.view('time')
+
+        if first_new > times[-1]:
+            return False
+
+        # Tarik mundur bar yang akan ditimpa (biasanya cuma forming bar)
+        rollback = self._len - int(np.searchsorted(times, first_new, side='left'))
+        self._pos = (self._pos - rollback) % self.capacity
+        self._len -= rollback
+
+        self._write(rates)
+        self.version += 1
+        return True
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Alias / keyword per aset dasar dengan bobot relevansi (1.0 = pasti relevan).
+# Symbol broker (XAUUSDm, BTCUSDT, ...) dipetakan lewat prefix aset dasar.
+SYMBOL_ALIASES = {
+    "XAU": {
+        "gold": 1.0, "xau": 1.0, "xauusd": 1.0, "bullion": 1.0, "precious metal": 0.8,
+        "precious metals": 0.8, "safe haven": 0.6, "safe-haven": 0.6,
+        "fed": 0.5, "fomc": 0.5, "powell": 0.5, "federal reserve": 0.5, "rate cut": 0.5,
+        "rate hike": 0.5, "interest rates": 0.4, "treasury yields": 0.5, "yields": 0.4,
+        "dxy": 0.5, "dollar": 0.4, "greenback": 0.4, "inflation": 0.3, "cpi": 0.3,
+        "nonfarm": 0.3, "payrolls": 0.3, "central bank": 0.3, "geopolitical": 0.3,
+    },
+    "XAG": {
+        "silver": 1.0, "xag": 1.0, "precious metal": 0.8, "precious metals": 0.8,
+        "gold": 0.4, "fed": 0.4, "dollar": 0.3, "yields": 0.3,
+    },
+    "BTC": {
+        "bitcoin": 1.0, "btc": 1.0, "crypto": 0.8, "cryptocurrency": 0.8,
+        "cryptocurrencies": 0.8, "spot etf": 0.7, "etf": 0.4, "blockchain": 0.5,
+        "coinbase": 0.6, "binance": 0.6, "microstrategy": 0.6, "halving": 0.7,
+        "stablecoin": 0.5, "sec": 0.3, "fed": 0.3, "risk assets": 0.3,
+    },
+    "ETH": {
+        "ethereum": 1.0, "eth": 1.0, "ether": 1.0, "crypto": 0.8, "cryptocurrency": 0.8,
+        "bitcoin": 0.4, "etf": 0.4, "defi": 0.6, "staking": 0.5, "sec": 0.3,
+    },
+}
+
+
+class SymbolRelevanceIndex:
+    """
+    SYMBOL RELEVANCE INDEX
+
+    Satu regex (alternation semua alias, word boundary) per aset dikompilasi
+    sekali. Relevansi headline = jumlah bobot alias unik yang cocok (maks 1.0),
+    dihitung dalam satu pass atas item hasil fetch. Symbol yang tidak dikenal
+    -> tidak difilter (semua headline dianggap relevan).
+    """
+
+    def __init__(self, aliases: Dict[str, Dict[str, float]] = None):
+        self._index: Dict[str, Tuple[re.Pattern, Dict[str, float]]] = {}
+        for base, terms in (aliases or SYMBOL_ALIASES).items():
+            # Alias panjang dulu biar "federal reserve" menang atas "fed"
+            ordered = sorted(terms, key=len, reverse=True)
+            pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in ordered) + r")\b", re.IGNORECASE)
+            self._index[base] = (pattern, {t.lower(): w for t, w in terms.items()})
+
+    def base_of(self, symbol: str) -> Optional[str]:
+        sym = (symbol or "").upper()
+        for base in self._index:
+            if sym.startswith(base):
+                return base
+        return None
+
+    def score(self, symbol: str, text: str) -> Optional[float]:
+        """Relevansi [0, 1], atau None kalau symbol tidak ada di index."""
+        base = self.base_of(symbol)
+        return None if base is None else self._relevance(base, text)
+
+    def _relevance(self, base: str, text: str) -> float:
+        pattern, weights = self._index[base]
+        matched = {m.lower() for m in pattern.findall(text or "")}
+        return min(1.0, sum(weights[m] for m in matched))
+
+    def filter(self, symbol: str, items: List[Dict], min_score: float) -> List[Dict]:
+        """Item dengan relevansi >= min_score (field 'relevance' ditambahkan), urutan dipertahankan."""
+        base = self.base_of(symbol)
+        if base is None:
+            return items
+        relevant = []
+        for item in items:
+            relevance = self._relevance(base, item.get("title", ""))
+            if relevance >= min_score:
+                relevant.append({**item, "relevance": round(relevance, 2)})
+        return relevant
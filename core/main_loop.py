@@ -1,76 +1,47 @@
 import time
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import MetaTrader5 as mt5
 from loguru import logger
 from core.config import settings
 from core.utils.control_loader import load_control
 from core.feeder.mt5_feeder import MT5Feeder
-from core.feeder.news_feeder import NewsFeeder
+from core.feeder.broker_registry import get_broker_registry
 from core.brains.technical_brain import TechnicalBrain
 from core.brains.sentiment_brain import SentimentBrain
+from core.brains.sentiment_worker import SentimentWorker
 from core.brains.condition_brain import ConditionBrain
 from core.orchestrator.orchestrator import Orchestrator
 from core.execution.mt5_executor import MT5Executor
+from core.execution.trailing_engine import TrailingEngine
 from core.risk.risk_governor import RiskGovernor
-from dashboard.status_loader import save_status, log_trade_history
+from core.utils.scheduler import Scheduler, ScheduledTask
+from dashboard.status_loader import save_status, save_llm_telemetry, log_trade_history
 
 # Global variable buat tracking waktu terakhir cek history
 last_history_check = datetime.now()
 
-def manage_trailing_stop_aggressive(executor, position, current_price):
+def start_bot():
     """
-    TRAILING STOP V2: AGGRESSIVE SECURE (POINTS BASED)
-    Sangat efektif untuk XAUUSD (Gold) yang volatile.
-    Logika: Begitu profit > X points, geser SL ke Break Even + Profit Kuncian.
-    Lalu buntuti harga dengan jarak Y points.
+    Fungsi Utama Bot.
+    UPGRADE: Bukan lagi satu loop + sleep. Tiap pekerjaan jadi task Scheduler
+    dengan cadence sendiri:
+    - tick     : kontrol, posisi, status dashboard (tiap ~1 detik)
+    - signal   : download bar, analisa teknikal, kirim signal ke council (bar
+                 close jam server, plus tiap LOOP_SLEEP_SECONDS untuk jalur reprice)
+    - entry    : ambil verdict council yang sudah selesai & eksekusi order
+    - history  : sinkron deal history (tiap HISTORY_SYNC_SECONDS); evaluator AI
+                 untuk trade yang tutup jalan di thread "evaluator"
+    - telemetry: telemetry LLM untuk dashboard
+    - trailing : TrailingEngine, poll tick ~100ms (TRAIL_POLL_SECONDS)
+    Semua call MT5 di thread scheduler (API MT5 tidak thread-safe). Council LLM
+    (blocking, beberapa detik) jalan di thread "council" supaya tick & posisi
+    tidak ikut tertahan; order tetap dikirim dari thread scheduler. Task
+    scheduler tidak boleh memanggil I/O blocking selain MT5.
+    Berita / sentiment tetap di SentimentWorker (thread sendiri).
     """
-    try:
-        # Hitung jarak profit dalam bentuk harga
-        profit_dist = 0.0
-        if position.type == mt5.ORDER_TYPE_BUY:
-            profit_dist = current_price - position.price_open
-        elif position.type == mt5.ORDER_TYPE_SELL:
-            profit_dist = position.price_open - current_price
-
-        # === KONFIGURASI TRAILING (Dalam Satuan Harga) ===
-        # Contoh XAUUSD: 1.00 = 100 pips (tergantung digit broker)
-        ACTIVATION_DIST = 1.00  # Aktif jika profit sudah > 1.00 (misal $1 di gold)
-        TRAIL_DIST = 0.50       # Jarak buntut SL dari harga running
-        SECURE_LOCK = 0.20      # Minimum profit yang dikunci (Break Even + dikit)
-
-        if profit_dist > ACTIVATION_DIST:
-            if position.type == mt5.ORDER_TYPE_BUY:
-                # Target SL baru: Harga sekarang dikurang jarak trail
-                proposed_sl = current_price - TRAIL_DIST
-                # Tapi SL gak boleh kurang dari (Open + Secure Lock)
-                # Ini menjamin trade sudah 'Risk Free'
-                min_lock = position.price_open + SECURE_LOCK
-                final_sl = max(proposed_sl, min_lock)
-                
-                # Eksekusi cuma kalau SL baru lebih tinggi dari SL lama
-                if final_sl > position.sl:
-                    logger.info(f"🏃 TRAILING BUY: Ticket {position.ticket} | Locked Profit: {final_sl}")
-                    executor.modify_position(position.ticket, sl=final_sl, tp=position.tp)
-
-            elif position.type == mt5.ORDER_TYPE_SELL:
-                # Target SL baru: Harga sekarang ditambah jarak trail
-                proposed_sl = current_price + TRAIL_DIST
-                # Tapi SL gak boleh lebih dari (Open - Secure Lock)
-                max_lock = position.price_open - SECURE_LOCK
-                final_sl = min(proposed_sl, max_lock)
-                
-                # Eksekusi cuma kalau SL baru lebih rendah dari SL lama
-                if position.sl == 0.0 or final_sl < position.sl:
-                    logger.info(f"🏃 TRAILING SELL: Ticket {position.ticket} | Locked Profit: {final_sl}")
-                    executor.modify_position(position.ticket, sl=final_sl, tp=position.tp)
-
-    except Exception as e:
-        logger.error(f"Trailing Error: {e}")
-
-def start_bot():
-    """Fungsi Utama Loop Bot."""
     global last_history_check
     logger.info(f"=== NEON SNIPER V3.2 (AGGRESSIVE MODE) ===")
     logger.info(f"Symbol: {settings.SYMBOL} | Mode: {settings.TRADING_MODE}")
@@ -82,189 +53,328 @@ def start_bot():
         return
 
     # Initialize All Brains & Controllers
-    news_feeder = NewsFeeder() 
     tech_brain = TechnicalBrain()
     sent_brain = SentimentBrain()
     cond_brain = ConditionBrain()
     orchestrator = Orchestrator()
     risk_governor = RiskGovernor()
     executor = MT5Executor(symbol=settings.SYMBOL)
+    # Snapshot akun / posisi / spec bersama (TTL), dipakai semua modul
+    broker = get_broker_registry()
 
-    last_news_time = 0
-    cached_sentiment = {"sentiment": "Neutral", "score": 0}
+    # Sentiment (news + LLM) jalan di background thread, task cuma baca snapshot
+    sentiment_worker = SentimentWorker(sent_brain)
+    if settings.USE_GEMINI_FOR_SENTIMENT:
+        sentiment_worker.start()
+
+    # Trailing stop: task scheduler sendiri di thread MT5 (lihat bawah)
+    trailing = TrailingEngine(executor, settings.SYMBOL)
+
+    # Satu keputusan council sekaligus, di luar thread scheduler
+    council_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="council")
+    # Evaluator AI (jurnal trade tutup) juga LLM blocking: antri di thread sendiri
+    evaluator_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evaluator")
+
+    # State bersama antar task (semua task jalan di thread yang sama)
+    state = {
+        "paused": False,
+        "tick": None,
+        "server_offset": 0.0,  # Jam server broker - jam lokal
+        "last_tick_msc": None,
+        "council": None,  # Keputusan council yang sedang jalan (future + konteks signal)
+        "sentiment": {"sentiment": "Neutral", "score": 0},
+        "tech_res": {},
+        "cond_res": {"allowed": False, "reason": "Waiting for Data..."},
+        "market": {},
+        "feed": {},
+    }
 
     # Set history check mundur 1 menit biar gak kelewatan deal terakhir
     last_history_check = datetime.now() - timedelta(minutes=1)
 
-    # === INFINITE LOOP ===
-    while True:
-        try:
-            # A. CEK KONTROL DASHBOARD
-            control = load_control()
-            if not control["trading_enabled"]:
-                save_status({"status": "PAUSED", "mode": "PAUSED", "account": {}, "positions": [], "market": {}})
-                # Sleep sebentar biar gak makan CPU pas idle
-                time.sleep(2)
-                continue
-
-            # B. AMBIL DATA MARKET
-            mtf_data = mt5_feeder.get_mtf_data()
-            tick = mt5_feeder.get_tick_info()
-            
-            if not mtf_data or not tick:
-                logger.warning("Waiting for data feed...")
-                time.sleep(2)
-                continue
-
-            # C. UPDATE SENTIMENT (Setiap 5 Menit)
-            if time.time() - last_news_time > 300:
-                if settings.USE_GEMINI_FOR_SENTIMENT: 
-                    cached_sentiment = sent_brain.analyze()
-                    logger.info(f"📰 Sentiment Update: {cached_sentiment.get('sentiment')}")
-                last_news_time = time.time()
-
-            # D. ANALISA TEKNIKAL
-            tech_res = tech_brain.analyze_mtf(mtf_data)
-            cond_res = cond_brain.analyze(df=None) 
-            acc_info = mt5.account_info()
-            
-            # E. UPDATE DASHBOARD REAL-TIME
-            if acc_info:
-                account_data = {
-                    "balance": acc_info.balance,
-                    "equity": acc_info.equity,
-                    "margin_free": acc_info.margin_free,
-                    "profit": acc_info.profit
+    def read_sentiment():
+        # Snapshot terakhir dari SentimentWorker (tanpa I/O); basi -> Neutral
+        sentiment_snap = sentiment_worker.snapshot()
+        if settings.USE_GEMINI_FOR_SENTIMENT:
+            cached_sentiment = sentiment_snap.current()
+            if not cached_sentiment.get("stale"):
+                # Nilai series ter-decay saat ini: halus antar refresh, tanpa I/O
+                cached_sentiment = {**cached_sentiment, **sent_brain.sentiment_at()}
+            state["sentiment"] = cached_sentiment
+        return sentiment_snap
+
+    # === TASK: TICK (kontrol, posisi, trailing, status) ===
+    def tick_task():
+        # A. CEK KONTROL DASHBOARD
+        control = load_control()
+        state["paused"] = not control["trading_enabled"]
+        trailing.enabled = not state["paused"]
+        if state["paused"]:
+            save_status({"status": "PAUSED", "mode": "PAUSED", "account": {}, "positions": [], "market": {}})
+            return
+
+        tick = mt5_feeder.get_tick_info()
+        if not tick:
+            logger.warning("Waiting for data feed...")
+            return
+        state["tick"] = tick
+        # Offset jam server hanya dari tick yang baru datang (time_msc maju); tick
+        # lama (market sepi / tutup) bisa basi berjam-jam. Dibulatkan ke menit.
+        tick_msc = tick.get('time_msc')
+        if tick_msc and state["last_tick_msc"] and tick_msc > state["last_tick_msc"]:
+            state["server_offset"] = round((tick_msc / 1000.0 - time.time()) / 60.0) * 60.0
+        state["last_tick_msc"] = tick_msc
+
+        sentiment_snap = read_sentiment()
+        cached_sentiment = state["sentiment"]
+        tech_res = state["tech_res"]
+
+        acc_info = broker.account()
+        if acc_info:
+            account_data = {
+                "balance": acc_info.balance,
+                "equity": acc_info.equity,
+                "margin_free": acc_info.margin_free,
+                "profit": acc_info.profit
+            }
+        else:
+            account_data = {}
+
+        if not settings.TRAIL_ENGINE_ENABLED:
+            # Tanpa task sendiri: Aggressive Trailing Stop (Mechanical) di cadence tick
+            trailing.run_once()
+
+        # Ambil Posisi Terbuka
+        raw_positions = broker.positions(settings.SYMBOL)
+        pos_list = []
+        if raw_positions:
+            for pos in raw_positions:
+                pos_list.append({
+                    "ticket": pos.ticket,
+                    "type": "BUY" if pos.type == 0 else "SELL",
+                    "volume": pos.volume,
+                    "open_price": pos.price_open,
+                    "profit": pos.profit,
+                    "sl": pos.sl,
+                    "tp": pos.tp
+                })
+
+                # Management Posisi: AI Smart Exit (Decision)
+                pos_dict = {
+                    "ticket": pos.ticket, 
+                    "type": "BUY" if pos.type==0 else "SELL", 
+                    "open_price": pos.price_open, 
+                    "profit": pos.profit, 
+                    "volume": pos.volume
                 }
-            else:
-                account_data = {}
-
-            # Ambil Posisi Terbuka
-            raw_positions = mt5.positions_get(symbol=settings.SYMBOL)
-            pos_list = []
-            if raw_positions:
-                for p in raw_positions:
-                    pos_list.append({
-                        "ticket": p.ticket,
-                        "type": "BUY" if p.type == 0 else "SELL",
-                        "volume": p.volume,
-                        "open_price": p.price_open,
-                        "profit": p.profit,
-                        "sl": p.sl,
-                        "tp": p.tp
-                    })
-
-            # Data Market untuk Dashboard
-            signal_status = tech_res.get('patterns', 'None')
-            market_data = {
-                "symbol": settings.SYMBOL,
-                "price": tick['bid'],
-                "trend_h1": tech_res.get('H1', {}).get('trend', 'N/A'),
-                "momentum": tech_res.get('M15', {}).get('momentum', 'N/A'),
-                "adx": f"{tech_res.get('M15', {}).get('adx', 0):.2f}",
-                "pattern": signal_status
+                decision = orchestrator.analyze_open_position(pos_dict, tech_res, cached_sentiment)
+                
+                if decision == "CLOSE_NOW": 
+                    executor.close_position(pos.ticket, pos.volume, pos.type, "AI Smart Exit")
+                    trailing.invalidate()
+
+        # UPDATE DASHBOARD REAL-TIME (data market dari analisa terakhir, harga dari tick)
+        save_status({
+            "account": account_data,
+            "positions": pos_list,
+            "market": {**state["market"], "price": tick['bid']},
+            "feed": state["feed"],
+            "sentiment": {
+                "value": cached_sentiment.get("sentiment"),
+                "score": cached_sentiment.get("score"),
+                "version": sentiment_snap.version,
+                "age": round(sentiment_snap.age(), 1) if sentiment_snap.updated_at else None,
+                "stale": sentiment_snap.is_stale(),
+                "feeds": sent_brain.news.feed_stats()
+            },
+            "scheduler": scheduler.report(),
+            "trailing": {**trailing.stats, "modify_queue": executor.modify_report(),
+                         "schedule": scheduler.report().get("trailing")},
+            "broker_cache": broker.report(),
+            "risk_profile": {"mode": settings.TRADING_MODE},
+            "mode": "ACTIVE",
+            "timestamp": time.time()
+        })
+
+    # === TASK: SIGNAL (bar, analisa teknikal, entry) ===
+    def signal_task():
+        if state["paused"] or not state["tick"]:
+            return
+
+        # B. AMBIL DATA MARKET
+        mtf_data = mt5_feeder.get_mtf_data()
+        if not mtf_data:
+            logger.warning("Waiting for data feed...")
+            return
+
+        # D. ANALISA TEKNIKAL
+        # Analisa berat cuma jalan saat bar close / harga bergeser jauh.
+        # Selain itu hasil memo dipakai (fresh=False) & task selesai cepat.
+        tech_res = tech_brain.analyze_mtf(mtf_data)
+        state["tech_res"] = tech_res
+        is_fresh = tech_res.get('fresh', True)
+        if is_fresh:
+            # Sama seperti baseline: df=None -> gate ConditionBrain tertutup (tidak entry).
+            # Mengaktifkan gate (df=M15) = perubahan perilaku trading, dibahas terpisah.
+            state["cond_res"] = cond_brain.analyze(df=None)
+
+        # Data Market untuk Dashboard
+        signal_status = tech_res.get('patterns', 'None')
+        state["market"] = {
+            "symbol": settings.SYMBOL,
+            "price": state["tick"]['bid'],
+            "trend_h1": tech_res.get('H1', {}).get('trend', 'N/A'),
+            "momentum": tech_res.get('M15', {}).get('momentum', 'N/A'),
+            "adx": f"{tech_res.get('M15', {}).get('adx', 0):.2f}",
+            "pattern": signal_status
+        }
+
+        # Info feed (dibaca dari view ring buffer, tanpa bikin DataFrame)
+        feed_data = {}
+        for tf_name, bars in mtf_data.items():
+            if bars is None or bars.empty: continue
+            feed_data[tf_name] = {
+                "bars": len(bars),
+                "last_time": bars.last_time(),
+                "last_close": float(bars['close'][-1])
             }
+        state["feed"] = feed_data
 
-            # Kirim status ke JSON
-            save_status({
-                "account": account_data,
-                "positions": pos_list,
-                "market": market_data,
-                "risk_profile": {"mode": settings.TRADING_MODE},
-                "mode": "ACTIVE",
-                "timestamp": time.time()
-            })
-
-            # F. CEK HISTORY TRADING (Untuk Evaluasi)
-            now = datetime.now()
-            deals = mt5.history_deals_get(last_history_check, now)
-            
-            if deals:
-                for deal in deals:
-                    # Filter: Deal OUT (Exit) pada Symbol kita
-                    if deal.entry == mt5.DEAL_ENTRY_OUT and deal.symbol == settings.SYMBOL:
-                        logger.success(f"🏁 TRADE CLOSED: Ticket {deal.ticket} | PnL: ${deal.profit}")
-                        
-                        log_data = {
-                            "ticket": deal.position_id,
-                            "symbol": deal.symbol,
-                            "type": "BUY" if deal.type == 1 else "SELL", # Type deal exit biasanya kebalikan
-                            "volume": deal.volume,
-                            "profit": deal.profit,
-                            "reason": "Closed (MT5 Detect)"
-                        }
-                        
-                        # Simpan log
-                        log_trade_history(log_data)
-                        
-                        # Panggil Evaluator AI (Llama)
-                        market_snapshot = f"Trend {market_data['trend_h1']}, Pattern {signal_status}"
-                        orchestrator.record_trade_result(log_data, market_snapshot)
-
-            last_history_check = now
-
-            # G. LOGIKA EKSEKUSI & MANAJEMEN
-            
-            # 1. Management Posisi (Trailing & AI Exit)
-            if raw_positions:
-                for pos in raw_positions:
-                    current_p = tick['bid'] if pos.type == 0 else tick['ask']
-                    
-                    # a. Aggressive Trailing Stop (Mechanical)
-                    manage_trailing_stop_aggressive(executor, pos, current_p)
+        # G. Entry Baru (Hanya jika ada Signal Sniper dari analisa yang fresh)
+        is_sniper_signal = signal_status in ["SNIPER_BUY", "SNIPER_SELL"]
+        if not (is_sniper_signal and is_fresh):
+            return
+        if state["council"] is not None:
+            return  # Council untuk signal sebelumnya masih jalan
+
+        # Posisi & akun dari snapshot cycle ini (view yang sama dengan RiskGovernor)
+        raw_positions = broker.positions(settings.SYMBOL)
+        acc_info = broker.account()
+        # Filter Risk: Jangan open kalau max trades tercapai
+        if not acc_info or len(raw_positions) >= settings.MAX_OPEN_TRADES:
+            return
+        logger.info(f"🎯 SNIPER SIGNAL DETECTED: {signal_status}")
+        
+        # Validasi Risk Governor (Basic Lot Calc)
+        risk_eval = risk_governor.evaluate(settings.SYMBOL, 50, 0.0)
+        if not risk_eval.allowed:
+            return
+
+        read_sentiment()
+        acc_simple = {"balance": acc_info.balance, "equity": acc_info.equity}
+        
+        # Konsultasi AI Orchestrator (thread council; hasilnya diambil entry_task)
+        # Sidik jari posisi: verdict council hangus kalau posisi berubah
+        position_state = tuple(sorted(p.ticket for p in raw_positions))
+        state["council"] = {
+            "future": council_pool.submit(orchestrator.decide, tech_res, state["sentiment"],
+                                          state["cond_res"], acc_simple, position_state),
+            "lot": risk_eval.lot,
+            "bar_time": tech_res.get('bar_time', 0),
+            "position_state": position_state,
+        }
+
+    # === TASK: ENTRY (eksekusi verdict council di thread MT5) ===
+    def entry_task():
+        pending = state["council"]
+        if pending is None or not pending["future"].done():
+            return
+        state["council"] = None
+        try:
+            decision = pending["future"].result()
+        except Exception as e:
+            logger.error(f"Council Error: {e}")
+            return
+        action = decision.get("action", "HOLD")
+        if action not in ["BUY", "SELL"]:
+            return
+
+        # Verdict datang beberapa detik kemudian: pastikan setup masih sama
+        raw_positions = broker.positions(settings.SYMBOL, max_age=0)
+        position_state = tuple(sorted(p.ticket for p in raw_positions))
+        if state["paused"] or len(raw_positions) >= settings.MAX_OPEN_TRADES:
+            return
+        if position_state != pending["position_state"] or state["tech_res"].get('bar_time', 0) != pending["bar_time"]:
+            logger.warning(f"⏭️ Council verdict {action} dibuang: bar / posisi sudah berubah")
+            return
+
+        # Override Logic: Gunakan SL/TP dari AI, atau fallback ke default
+        ai_sl = decision.get('sl', 0.0)
+        ai_tp = decision.get('tp', 0.0)
+
+        lot = round(pending["lot"] * decision.get("lot_factor", 1.0), 2)
+        reason = decision.get('reason', 'Sniper AI')
+
+        decided_by = decision.get('decided_by', 'COUNCIL')
+        logger.success(f"🚀 EXECUTING {action} | Lot: {lot} | [{decided_by}] {reason}")
+
+        if action == "BUY":
+            executor.buy_market(lot, ai_sl, ai_tp, reason)
+        elif action == "SELL":
+            executor.sell_market(lot, ai_sl, ai_tp, reason)
+        trailing.invalidate()
+
+    # === TASK: HISTORY (Untuk Evaluasi) ===
+    def history_task():
+        global last_history_check
+        if state["paused"]:
+            return
+        now = datetime.now()
+        deals = mt5.history_deals_get(last_history_check, now)
+        
+        if deals:
+            for deal in deals:
+                # Filter: Deal OUT (Exit) pada Symbol kita
+                if deal.entry == mt5.DEAL_ENTRY_OUT and deal.symbol == settings.SYMBOL:
+                    logger.success(f"🏁 TRADE CLOSED: Ticket {deal.ticket} | PnL: ${deal.profit}")
                     
-                    # b. AI Smart Exit (Decision)
-                    pos_dict = {
-                        "ticket": pos.ticket, 
-                        "type": "BUY" if pos.type==0 else "SELL", 
-                        "open_price": pos.price_open, 
-                        "profit": pos.profit, 
-                        "volume": pos.volume
+                    log_data = {
+                        "ticket": deal.position_id,
+                        "symbol": deal.symbol,
+                        "type": "BUY" if deal.type == 1 else "SELL", # Type deal exit biasanya kebalikan
+                        "volume": deal.volume,
+                        "profit": deal.profit,
+                        "reason": "Closed (MT5 Detect)"
                     }
-                    decision = orchestrator.analyze_open_position(pos_dict, tech_res, cached_sentiment)
                     
-                    if decision == "CLOSE_NOW": 
-                        executor.close_position(pos.ticket, pos.volume, pos.type, "AI Smart Exit")
-
-            # 2. Entry Baru (Hanya jika ada Signal Sniper)
-            is_sniper_signal = signal_status in ["SNIPER_BUY", "SNIPER_SELL"]
-            
-            if is_sniper_signal:
-                # Filter Risk: Jangan open kalau max trades tercapai
-                if len(raw_positions) < settings.MAX_OPEN_TRADES:
-                    logger.info(f"🎯 SNIPER SIGNAL DETECTED: {signal_status}")
+                    # Simpan log
+                    log_trade_history(log_data)
                     
-                    # Validasi Risk Governor (Basic Lot Calc)
-                    risk_eval = risk_governor.evaluate(settings.SYMBOL, 50, 0.0)
-                    
-                    if risk_eval.allowed:
-                        acc_simple = {"balance": acc_info.balance, "equity": acc_info.equity}
-                        
-                        # Konsultasi AI Orchestrator
-                        decision = orchestrator.decide(tech_res, cached_sentiment, cond_res, acc_simple)
-                        action = decision.get("action", "HOLD")
-                        
-                        if action in ["BUY", "SELL"]:
-                            # Override Logic: Gunakan SL/TP dari AI, atau fallback ke default
-                            ai_sl = decision.get('sl', 0.0)
-                            ai_tp = decision.get('tp', 0.0)
-                            
-                            lot = round(risk_eval.lot * decision.get("lot_factor", 1.0), 2)
-                            reason = decision.get('reason', 'Sniper AI')
-                            
-                            logger.success(f"🚀 EXECUTING {action} | Lot: {lot} | {reason}")
-                            
-                            if action == "BUY": 
-                                executor.buy_market(lot, ai_sl, ai_tp, reason)
-                            elif action == "SELL": 
-                                executor.sell_market(lot, ai_sl, ai_tp, reason)
-
-            # H. SLEEP (Tunggu cycle berikutnya)
-            time.sleep(settings.LOOP_SLEEP_SECONDS)
+                    # Panggil Evaluator AI (Llama) di thread evaluator, bukan thread MT5
+                    market = state["market"]
+                    market_snapshot = f"Trend {market.get('trend_h1', 'N/A')}, Pattern {market.get('pattern', 'None')}"
+                    evaluator_pool.submit(orchestrator.record_trade_result, log_data, market_snapshot)
 
-        except Exception as e:
-            logger.exception(f"Loop Error: {e}")
-            time.sleep(5) # Safety pause kalau error
+        last_history_check = now
+
+    # === TASK: TELEMETRY LLM (latency / error / circuit) untuk Dashboard ===
+    def telemetry_task():
+        if orchestrator.brain:
+            save_llm_telemetry(orchestrator.brain.llm.telemetry())
+
+    # Bar close dihitung dari jam server broker (jam lokal + offset dari tick)
+    scheduler = Scheduler(clock=lambda: time.time() + state["server_offset"])
+    if settings.TRAIL_ENGINE_ENABLED:
+        # Didaftarkan pertama: tiap putaran scheduler trailing dicek lebih dulu
+        scheduler.every("trailing", trailing.run_once, trailing.poll_interval)
+    scheduler.every("tick", tick_task, settings.SCHED_TICK_SECONDS,
+                    budget=settings.SCHED_TICK_BUDGET_SECONDS)
+    scheduler.add(ScheduledTask(
+        "signal", signal_task,
+        interval=settings.LOOP_SLEEP_SECONDS,
+        bar_seconds=settings.TIMEFRAME_MINUTES * 60,
+        bar_delay=settings.SIGNAL_BAR_CLOSE_DELAY,
+        budget=settings.SIGNAL_BUDGET_SECONDS,
+        stale_after=settings.SIGNAL_STALE_SECONDS,
+    ))
+    # Cek verdict council secepat resolusi scheduler (murah kalau tidak ada)
+    scheduler.every("entry", entry_task, settings.SCHED_RESOLUTION_SECONDS)
+    scheduler.every("history", history_task, settings.HISTORY_SYNC_SECONDS,
+                    budget=settings.HISTORY_BUDGET_SECONDS)
+    scheduler.every("telemetry", telemetry_task, settings.TELEMETRY_SECONDS)
+
+    # === EVENT LOOP ===
+    scheduler.run_forever()
 
 if __name__ == "__main__":
-    start_bot()
\ No newline at end of file
+    start_bot()
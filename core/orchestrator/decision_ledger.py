@@ -0,0 +1,47 @@
+from typing import Dict, Any, Optional, Tuple
+from loguru import logger
+
+
+class DecisionLedger:
+    """
+    DECISION LEDGER: SATU KEPUTUSAN COUNCIL PER BAR
+
+    Menyimpan verdict council (APPROVE/VETO) dengan key
+    (symbol, bar_time, signal, direction). Selama bar M15 yang sama masih
+    memberi signal yang sama dan posisi terbuka tidak berubah, verdict lama
+    dipakai ulang -> tidak ada round-trip LLM baru.
+
+    Verdict otomatis tidak berlaku kalau bar, signal, atau posisi berubah.
+    """
+
+    def __init__(self):
+        # Satu entry per symbol: {"key": ..., "positions": ..., "verdict": ...}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(symbol: str, bar_time: int, signal: str) -> Tuple:
+        direction = "BUY" if "BUY" in signal else "SELL" if "SELL" in signal else "NONE"
+        return (symbol, int(bar_time or 0), signal, direction)
+
+    def get(self, key: Tuple, position_state: Tuple) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key[0])
+        if entry and entry["key"] == key and entry["positions"] == position_state:
+            self.hits += 1
+            return dict(entry["verdict"])
+        self.misses += 1
+        return None
+
+    def put(self, key: Tuple, position_state: Tuple, verdict: Dict[str, Any]):
+        # Bar 0 = waktu bar tidak diketahui, jangan di-cache
+        if not key[1]:
+            return
+        self._entries[key[0]] = {"key": key, "positions": position_state, "verdict": dict(verdict)}
+        logger.debug(f"📒 Ledger: {key[2]} @ bar {key[1]} -> {verdict.get('action')}")
+
+    def invalidate(self, symbol: str = None):
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol, None)
@@ -0,0 +1,78 @@
+from typing import Dict, Any
+from core.config import settings
+
+
+class FallbackRules:
+    """
+    RULE-BASED FALLBACK (KALAU COUNCIL LEWAT DEADLINE)
+
+    Verdict deterministik dari field TechnicalBrain (trend H1, momentum M15,
+    RSI M15, jarak ke Order Block). Dipakai saat council AI tidak menjawab
+    dalam DECISION_BUDGET_SECONDS, supaya signal M15 tidak basi menunggu API.
+    DECISION_FALLBACK = "HOLD" (default) -> selalu HOLD; "RULES" (opt-in
+    eksplisit) -> pakai aturan ini, artinya entry live TANPA persetujuan AI.
+    """
+
+    def __init__(self):
+        self.mode = settings.DECISION_FALLBACK.upper()
+        self.rsi_buy_max = settings.FALLBACK_RSI_BUY_MAX
+        self.rsi_sell_min = settings.FALLBACK_RSI_SELL_MIN
+        self.ob_max_dist_pct = settings.FALLBACK_OB_MAX_DIST_PCT
+        self.sl_dist = settings.FALLBACK_SL_DIST
+        self.rr = settings.FALLBACK_RR
+        self.lot_factor = settings.FALLBACK_LOT_FACTOR
+
+    def evaluate(self, technical: Dict[str, Any]) -> Dict[str, Any]:
+        if self.mode != "RULES":
+            return {"action": "HOLD", "reason": "Deadline: council too slow (fallback HOLD)"}
+
+        pattern = technical.get('patterns', 'None')
+        side = "BUY" if "BUY" in pattern else "SELL" if "SELL" in pattern else None
+        if side is None:
+            return {"action": "HOLD", "reason": "Rules: no directional signal"}
+
+        h1 = technical.get('H1', {})
+        m15 = technical.get('M15', {})
+        price = float(technical.get('current_price') or 0.0)
+        trend = h1.get('trend', '')
+        momentum = m15.get('momentum', 'NEUTRAL')
+        rsi = float(m15.get('rsi', 50))
+        if price <= 0:
+            return {"action": "HOLD", "reason": "Rules: no price"}
+
+        # 1. Searah trend H1
+        want_trend = "BULLISH" if side == "BUY" else "BEARISH"
+        if want_trend not in trend:
+            return {"action": "HOLD", "reason": f"Rules: {side} against H1 trend ({trend})"}
+
+        # 2. Momentum M15 tidak boleh berlawanan
+        against = "BEARISH_ACCEL" if side == "BUY" else "BULLISH_ACCEL"
+        if momentum == against:
+            return {"action": "HOLD", "reason": f"Rules: momentum against {side} ({momentum})"}
+
+        # 3. RSI tidak ekstrem (lebih ketat dari filter TechnicalBrain)
+        if side == "BUY" and rsi >= self.rsi_buy_max:
+            return {"action": "HOLD", "reason": f"Rules: RSI too high for BUY ({rsi:.1f})"}
+        if side == "SELL" and rsi <= self.rsi_sell_min:
+            return {"action": "HOLD", "reason": f"Rules: RSI too low for SELL ({rsi:.1f})"}
+
+        # 4. SL: di balik Order Block kalau dekat, selain itu jarak tetap
+        ob = float(technical.get('bullish_ob' if side == "BUY" else 'bearish_ob') or 0.0)
+        near_ob = ob > 0 and abs(price - ob) <= price * self.ob_max_dist_pct / 100.0
+        sl_dist = self.sl_dist
+        if near_ob:
+            sl_dist = max(sl_dist, abs(price - ob) + self.sl_dist * 0.2)
+
+        if side == "BUY":
+            sl, tp = price - sl_dist, price + sl_dist * self.rr
+        else:
+            sl, tp = price + sl_dist, price - sl_dist * self.rr
+
+        anchor = f"OB {ob:.2f}" if near_ob else "fixed SL"
+        return {
+            "action": side,
+            "tp": tp,
+            "sl": sl,
+            "lot_factor": self.lot_factor,
+            "reason": f"Rules: {trend} + {momentum} + RSI {rsi:.1f} ({anchor})"
+        }
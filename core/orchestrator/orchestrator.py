@@ -1,12 +1,22 @@
 import json
 import os
+import concurrent.futures
+import time
 from datetime import datetime
 from typing import Dict, Any
 from loguru import logger
 from core.utils.control_loader import load_control
 from core.config import settings
 from ai_api.gemini_client import GeminiClient
+from ai_api.json_stream import stop_on_actions
+from ai_api.prompt_builder import PromptBuilder
 from core.brains.evaluation_brain import EvaluationBrain 
+from core.orchestrator.decision_ledger import DecisionLedger
+from core.orchestrator.fallback_rules import FallbackRules
+
+
+class DecisionDeadline(Exception):
+    """Council tidak selesai dalam DECISION_BUDGET_SECONDS."""
 
 class Orchestrator:
     """
@@ -17,6 +27,18 @@ class Orchestrator:
     2. Konsultasi AI 2 Tahap: Strategist (Qwen) -> Risk Governor (DeepSeek).
     3. Logging Percakapan AI ke Dashboard.
     4. Pengelolaan Keputusan HOLD/EXECUTE yang ketat.
+    5. Decision Ledger: Verdict council dipakai ulang selama bar, signal &
+       posisi belum berubah (tidak tanya LLM berulang-ulang untuk setup yang sama).
+    6. Speculative Council: Strategist & Risk Governor (proposal BUY & SELL)
+       ditanya paralel; verdict risk yang arahnya cocok dipakai, sisanya di-cancel.
+    7. Streaming Verdict: jawaban council di-stream; HOLD / REJECT langsung
+       dipakai begitu field "action" selesai, tanpa menunggu "reason".
+    8. Decision Deadline: council dibatasi DECISION_BUDGET_SECONDS; lewat
+       deadline -> verdict rule-based (FallbackRules) atau HOLD. Setiap verdict
+       punya field `decided_by` (GATE / FILTER / COUNCIL / COUNCIL_ERROR /
+       RULES / DEADLINE_HOLD). Hanya jawaban council yang valid masuk ledger.
+    9. Compact Prompt: prefix tetap per role + data ringkas di bawah budget token;
+       token input/output dicatat per role & per keputusan (llm.tokens).
     """
     
     def __init__(self):
@@ -26,6 +48,12 @@ class Orchestrator:
         # Inisialisasi AI Client (Jika diaktifkan)
         self.brain = GeminiClient() if self.ai_enabled else None
         self.evaluator = EvaluationBrain()
+        self.ledger = DecisionLedger()
+        self.speculative = settings.COUNCIL_SPECULATIVE
+        self.budget = settings.DECISION_BUDGET_SECONDS
+        self.fallback = FallbackRules()
+        self.prompts = PromptBuilder()
+        self.tokens = self.brain.llm.tokens if self.brain else None
         
         # Lokasi File Log Chat untuk Dashboard
         self.log_file = "data/ai_chat_log.json"
@@ -87,33 +115,50 @@ class Orchestrator:
             logger.error(f"Parse Error: {e}")
             return {}
 
-    def decide(self, technical, sentiment, condition, account_info):
+    def decide(self, technical, sentiment, condition, account_info, position_state=()):
         """
         FUNGSI UTAMA PENGAMBILAN KEPUTUSAN (THE BRAIN).
         Alur Logika:
         1. Cek Switch Manual di Dashboard (Jika STOP, maka berhenti).
         2. Cek Kondisi Market & Waktu (ConditionBrain).
-        3. Jika Lolos, Konsultasi ke AI (Strategist & Risk).
+        3. Cek Ledger: kalau bar/signal/posisi sama, pakai verdict sebelumnya.
+        4. Jika Lolos, Konsultasi ke AI (Strategist & Risk).
+        
+        `position_state` = sidik jari posisi terbuka (misal tuple ticket),
+        verdict di ledger hangus kalau nilainya berubah.
         """
         
         # 1. CEK KONTROL MANUAL (DASHBOARD SWITCH)
         control = load_control()
         if not control["trading_enabled"]: 
-            return {"action": "HOLD", "reason": "Paused by User (Dashboard)"}
+            return {"action": "HOLD", "reason": "Paused by User (Dashboard)", "decided_by": "GATE"}
         
         # 2. CEK KONDISI MARKET & WAKTU (INTEGRASI BARU)
         # Data 'condition' berasal dari ConditionBrain.analyze()
         if not condition.get("allowed", True):
             reason = condition.get("reason", "Condition Restricted")
             # Jika kondisi tidak mengizinkan (misal jam tidur), return HOLD
-            return {"action": "HOLD", "reason": reason}
+            return {"action": "HOLD", "reason": reason, "decided_by": "GATE"}
 
         # 3. KONSULTASI AI (Hanya jika jam kerja aktif & market sehat)
         if self.ai_enabled: 
-            return self._consult_duo_entry(technical, sentiment, account_info)
+            ledger_key = DecisionLedger.make_key(
+                settings.SYMBOL, technical.get('bar_time', 0), technical.get('patterns', 'None')
+            )
+            reused = self.ledger.get(ledger_key, position_state)
+            if reused is not None:
+                logger.info(f"♻️ Council verdict reused for this bar: {reused.get('action')}")
+                return reused
+            
+            verdict = self._consult_duo_entry(technical, sentiment, account_info)
+            # Verdict fallback / LLM gagal tidak dikunci per bar: cycle berikutnya
+            # council dicoba lagi (jawabannya mungkin sudah ada di semantic cache)
+            if verdict.get("decided_by") not in ("COUNCIL_ERROR", "RULES", "DEADLINE_HOLD"):
+                self.ledger.put(ledger_key, position_state, verdict)
+            return verdict
         
         # Fallback jika AI dimatikan tapi bot tetap jalan
-        return {"action": "HOLD", "reason": "AI Disabled in Settings"}
+        return {"action": "HOLD", "reason": "AI Disabled in Settings", "decided_by": "GATE"}
 
     def _consult_duo_entry(self, technical: Dict, sentiment: Dict, account_info: Dict) -> Dict:
         """
@@ -121,7 +166,7 @@ class Orchestrator:
         Tahap 1: Strategist (Qwen) -> Mencari peluang entry agresif.
         Tahap 2: Risk Governor (DeepSeek) -> Memvalidasi keamanan entry.
         """
-        if not self.brain: return {}
+        if not self.brain: return {"decided_by": "GATE"}
 
         # Ekstrak Data Teknikal
         h1 = technical.get('H1', {})
@@ -132,71 +177,45 @@ class Orchestrator:
         # EFISIENSI: Jika TechnicalBrain tidak menemukan pola (None),
         # Jangan buang-buang kuota API untuk bertanya ke AI.
         if pattern == "None":
-            return {"action": "HOLD", "reason": "No Technical Pattern"}
+            return {"action": "HOLD", "reason": "No Technical Pattern", "decided_by": "FILTER"}
 
-        # Siapkan Konteks Pasar untuk AI
-        market_context = f"""
-        ASSET: {settings.SYMBOL} | PRICE: {price}
-        SIGNAL: {pattern} (Source: TechnicalBrain Analysis)
-        
-        TREND H1: {h1.get('trend', 'UNKNOWN')}
-        MOMENTUM M15: {m15.get('momentum', 'NEUTRAL')}
-        RSI M15: {m15.get('rsi', 50)}
-        NEWS SENTIMENT: {sentiment.get('sentiment', 'Neutral')}
-        """
+        # Data ringkas untuk prompt & key semantic cache (urutan = prioritas,
+        # field paling belakang dibuang duluan kalau lewat budget token)
+        ctx = {
+            "symbol": settings.SYMBOL, "price": price, "signal": pattern,
+            "trend_h1": h1.get('trend', 'UNKNOWN'), "mom_m15": m15.get('momentum', 'NEUTRAL'),
+            "rsi_m15": m15.get('rsi', 50), "news": sentiment.get('sentiment', 'Neutral'),
+        }
 
         # --- TAHAP 1: STRATEGIST (QWEN) ---
-        prompt_strat = f"""
-        ROLE: You are a RUTHLESS SCALPER (XAUUSD Specialist).
-        
-        MARKET DATA:
-        {market_context}
-        
-        RULES:
-        1. FOLLOW TREND H1 STRICTLY. (If Bullish -> Buy Only, If Bearish -> Sell Only).
-        2. Signal '{pattern}' detected. Confirm if momentum supports it.
-        3. IGNORE weak signals against the trend.
-        4. SET TIGHT STOP LOSS (Max 30-50 pips).
-        5. TARGET Risk-Reward > 1:1.5.
-        
-        OUTPUT (JSON ONLY):
-        {{"action": "BUY/SELL/HOLD", "tp": price_target, "sl": price_stop, "reason": "Brief tactical reason"}}
-        """
-        
-        # Tanya Qwen
-        resp_strat = self.brain.ask_specific_model(settings.MODEL_QWEN, prompt_strat)
-        data_strat = self._parse_decision(resp_strat)
-        strat_action = data_strat.get("action", "HOLD").upper()
+        prompt_strat = self.prompts.build("strategist", ctx)
         
-        # Log Jawaban Strategist
-        self._save_chat("Strategist (Qwen)", data_strat.get("reason", "Thinking..."), strat_action)
+        started = time.monotonic()
+        deadline = started + self.budget if self.budget > 0 else None
+        council = self._speculative_council if self.speculative else self._sequential_council
+        tag = self.tokens.open_decision()
+        try:
+            data_strat, strat_action, data_risk = council(prompt_strat, ctx, deadline, tag)
+        except DecisionDeadline:
+            return self._close_decision(tag, self._fallback_verdict(technical, time.monotonic() - started))
+
+        # Jawaban kosong / bukan JSON (timeout, error API) bukan veto: jangan di-cache
+        if not data_strat:
+            return self._close_decision(
+                tag, {"action": "HOLD", "reason": "Strategist No Valid Answer", "decided_by": "COUNCIL_ERROR"}
+            )
 
         # Jika Strategist ragu (HOLD), langsung berhenti
         if strat_action == "HOLD": 
-            return {"action": "HOLD", "reason": "Strategist Veto (No Entry)"}
+            return self._close_decision(
+                tag, {"action": "HOLD", "reason": "Strategist Veto (No Entry)", "decided_by": "COUNCIL"}
+            )
+
+        if not data_risk:
+            return self._close_decision(
+                tag, {"action": "HOLD", "reason": "Risk Manager No Valid Answer", "decided_by": "COUNCIL_ERROR"}
+            )
 
-        # --- TAHAP 2: RISK GOVERNOR (DEEPSEEK) ---
-        prompt_risk = f"""
-        ROLE: You are a SENIOR RISK MANAGER. Verify this trade proposal.
-        
-        PROPOSAL: {strat_action} @ {price}
-        TP: {data_strat.get('tp')} | SL: {data_strat.get('sl')}
-        
-        MARKET CONTEXT:
-        {market_context}
-        
-        VERIFICATION CHECKLIST:
-        1. Is the trade aligned with H1 Trend? (Crucial)
-        2. Is the SL logical (not too wide/narrow)?
-        3. Is RSI currently extreme? (Overbought > 70 for Buy / Oversold < 30 for Sell)? If yes, REJECT immediately.
-        
-        OUTPUT (JSON ONLY):
-        {{"action": "APPROVE/REJECT", "reason": "Critique or Approval"}}
-        """
-        
-        # Tanya DeepSeek
-        resp_risk = self.brain.ask_specific_model(settings.MODEL_DEEPSEEK, prompt_risk)
-        data_risk = self._parse_decision(resp_risk)
         risk_decision = data_risk.get("action", "REJECT").upper()
         
         # Log Jawaban Risk Manager
@@ -206,16 +225,141 @@ class Orchestrator:
         # Trade dieksekusi HANYA JIKA Risk Manager menyetujui ("APPROVE")
         if "APPROVE" in risk_decision:
             self._save_chat("SYSTEM", "✅ TRADE APPROVED", "EXECUTE")
-            return {
+            return self._close_decision(tag, {
                 "action": strat_action,
                 "tp": float(data_strat.get("tp", 0.0)),
                 "sl": float(data_strat.get("sl", 0.0)),
                 "lot_factor": 1.0,
-                "reason": f"Consensus: {data_risk.get('reason')}"
-            }
+                "reason": f"Consensus: {data_risk.get('reason')}",
+                "decided_by": "COUNCIL"
+            })
         else:
             self._save_chat("SYSTEM", "🛡️ VETO BY RISK MANAGER", "HOLD")
-            return {"action": "HOLD", "reason": "Risk Manager Rejected Trade"}
+            return self._close_decision(
+                tag, {"action": "HOLD", "reason": "Risk Manager Rejected Trade", "decided_by": "COUNCIL"}
+            )
+
+    def _close_decision(self, tag: int, verdict: Dict) -> Dict:
+        """Tutup catatan token keputusan ini (laporan token per keputusan)."""
+        self.tokens.close_decision(tag, verdict.get("decided_by"))
+        return verdict
+
+    def _fallback_verdict(self, technical: Dict, elapsed: float) -> Dict:
+        """Verdict cepat & deterministik saat council lewat deadline."""
+        verdict = self.fallback.evaluate(technical)
+        verdict["decided_by"] = "RULES" if self.fallback.mode == "RULES" else "DEADLINE_HOLD"
+        logger.warning(
+            f"⏱️ Council missed {self.budget:.1f}s budget ({elapsed:.2f}s) -> "
+            f"{verdict['decided_by']}: {verdict['action']} | {verdict['reason']}"
+        )
+        self._save_chat("SYSTEM", f"⏱️ DEADLINE -> {verdict['reason']}", verdict['action'])
+        return verdict
+
+    def _risk_fields(self, action, tp, sl, ctx) -> Dict:
+        """Data Risk Governor (juga key cache). tp/sl None = mode spekulatif."""
+        if tp is None and sl is None:
+            levels = {"levels": "set_by_strategist(SL 30-50 pips, RR>1:1.5)"}
+        else:
+            levels = {"tp": tp, "sl": sl}
+        return {"proposal": action, **levels, **ctx}
+
+    def _read_strategist(self, resp_strat: str):
+        data_strat = self._parse_decision(resp_strat)
+        strat_action = data_strat.get("action", "HOLD").upper()
+        # Log Jawaban Strategist
+        self._save_chat("Strategist (Qwen)", data_strat.get("reason", "Thinking..."), strat_action)
+        return data_strat, strat_action
+
+    def _sequential_council(self, prompt_strat, ctx, deadline=None, tag=None):
+        """Mode klasik: Qwen dulu, baru DeepSeek (latency = jumlah dua call)."""
+        llm = self.brain.llm
+        # Tanya Qwen
+        resp_strat = self._wait(llm.submit_role("strategist", prompt_strat, hedge=True, context=ctx,
+                                                early_stop=stop_on_actions("HOLD"), tag=tag), deadline)
+        data_strat, strat_action = self._read_strategist(resp_strat)
+        if strat_action == "HOLD":
+            return data_strat, strat_action, {}
+
+        # --- TAHAP 2: RISK GOVERNOR (DEEPSEEK) ---
+        risk_ctx = self._risk_fields(strat_action, data_strat.get('tp'), data_strat.get('sl'), ctx)
+        # Tanya DeepSeek
+        resp_risk = self._wait(llm.submit_role("risk", self.prompts.build("risk", risk_ctx), hedge=True,
+                                               context=risk_ctx, early_stop=stop_on_actions("REJECT"),
+                                               tag=tag), deadline)
+        return data_strat, strat_action, self._parse_decision(resp_risk)
+
+    def _wait(self, future, deadline=None) -> str:
+        """
+        Tunggu hasil Future LLM (deadline per-request dijaga di dalam client).
+        deadline = batas waktu keputusan (time.monotonic); lewat -> DecisionDeadline.
+        Request yang lewat deadline TIDAK di-cancel: jawabannya tetap masuk
+        semantic cache & bisa dipakai cycle berikutnya.
+        """
+        timeout = settings.LLM_TIMEOUT_SECONDS + 1.0
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+        try:
+            return future.result(timeout)
+        except concurrent.futures.CancelledError:
+            return ""
+        except concurrent.futures.TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DecisionDeadline()
+            future.cancel()
+            return ""
+
+    def _speculative_council(self, prompt_strat, ctx, deadline=None, tag=None):
+        """
+        Mode spekulatif: Strategist + Risk review BUY & SELL jalan bareng.
+        Verdict risk yang arahnya sama dengan Strategist dipakai, sisanya di-cancel.
+        Latency ~ max(dua call), bukan jumlahnya.
+        """
+        llm = self.brain.llm
+        hold = stop_on_actions("HOLD")
+        fut_risk = {}
+
+        def on_strategist(fields):
+            # Dipanggil dari stream: begitu action terbaca, review arah lain di-cancel
+            action = str(fields.get("action", "")).strip().upper()
+            # Hanya jawaban final; template "BUY|SELL|HOLD" jangan cancel apa-apa
+            if action in ("BUY", "SELL", "HOLD"):
+                for side, fut in list(fut_risk.items()):
+                    if side != action:
+                        fut.cancel()
+            return hold(fields)
+
+        for side in ("BUY", "SELL"):
+            risk_ctx = self._risk_fields(side, None, None, ctx)
+            fut_risk[side] = llm.submit_role(
+                "risk",
+                self.prompts.build("risk", risk_ctx),
+                hedge=True,
+                context=risk_ctx,
+                early_stop=stop_on_actions("REJECT"),
+                tag=tag
+            )
+        fut_strat = llm.submit_role("strategist", prompt_strat, hedge=True, context=ctx,
+                                    early_stop=on_strategist, tag=tag)
+
+        data_strat, strat_action = self._read_strategist(self._wait(fut_strat, deadline))
+
+        # Cancel review yang tidak terpakai
+        for side, fut in fut_risk.items():
+            if side != strat_action:
+                fut.cancel()
+
+        if strat_action == "HOLD":
+            return data_strat, strat_action, {}
+
+        if strat_action not in fut_risk:
+            # Jawaban strategist di luar BUY/SELL: fallback ke review biasa
+            risk_ctx = self._risk_fields(strat_action, data_strat.get('tp'), data_strat.get('sl'), ctx)
+            resp_risk = self._wait(llm.submit_role("risk", self.prompts.build("risk", risk_ctx), hedge=True,
+                                                   context=risk_ctx, early_stop=stop_on_actions("REJECT"),
+                                                   tag=tag), deadline)
+            return data_strat, strat_action, self._parse_decision(resp_risk)
+
+        return data_strat, strat_action, self._parse_decision(self._wait(fut_risk[strat_action], deadline))
 
     def analyze_open_position(self, position_data, technical, sentiment):
         """
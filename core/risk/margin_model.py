@@ -0,0 +1,84 @@
+import math
+import threading
+from typing import Dict, Optional, Tuple
+import MetaTrader5 as mt5
+from loguru import logger
+from core.config import settings
+
+
+class MarginModel:
+    """
+    MARGIN-PER-LOT MODEL (MEMO)
+
+    Untuk symbol & leverage yang sama, margin linear terhadap volume dan
+    (untuk CFD / metal) linear terhadap harga. Jadi cukup satu
+    order_calc_margin per (symbol, order_type) untuk kalibrasi, lalu:
+        margin(volume, price) = margin_per_lot_ref * price / price_ref * volume
+    Kalibrasi ulang kalau harga bergeser > MARGIN_REPRICE_PCT dari harga
+    referensi, leverage akun berubah, atau diminta paksa (fresh=True).
+    """
+
+    def __init__(self, reprice_pct: float = None):
+        self.reprice_pct = settings.MARGIN_REPRICE_PCT if reprice_pct is None else reprice_pct
+        self._lock = threading.Lock()
+        # (symbol, order_type) -> (price_ref, margin_per_lot_ref, leverage)
+        self._calibrations: Dict[Tuple[str, int], Tuple[float, float, Optional[int]]] = {}
+        self.stats = {"hits": 0, "calibrations": 0, "failures": 0}
+
+    def per_lot(self, symbol: str, order_type: int, price: float, leverage: int = None,
+                fresh: bool = False) -> float:
+        """Margin untuk 1.0 lot di harga `price`. 0.0 kalau terminal gagal menghitung."""
+        key = (symbol, order_type)
+        with self._lock:
+            cal = self._calibrations.get(key)
+        if cal is not None and not fresh and price > 0:
+            price_ref, margin_ref, leverage_ref = cal
+            moved_pct = abs(price / price_ref - 1.0) * 100.0
+            if leverage == leverage_ref and moved_pct <= self.reprice_pct:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return margin_ref * price / price_ref
+
+        try:
+            margin = mt5.order_calc_margin(order_type, symbol, 1.0, price)
+        except Exception as e:
+            logger.error(f"⚠️ Margin Calc Error: {e}")
+            margin = None
+        with self._lock:
+            if not margin or margin <= 0 or price <= 0:
+                self.stats["failures"] += 1
+                return 0.0
+            self._calibrations[key] = (price, margin, leverage)
+            self.stats["calibrations"] += 1
+        return margin
+
+    def margin(self, symbol: str, order_type: int, volume: float, price: float,
+               leverage: int = None, fresh: bool = False) -> float:
+        return self.per_lot(symbol, order_type, price, leverage, fresh) * volume
+
+    def max_lot(self, symbol: str, order_type: int, free_margin: float, price: float, step: float,
+                leverage: int = None, buffer: float = 0.95, fresh: bool = False) -> float:
+        """Lot terbesar (kelipatan step, dibulatkan ke bawah) yang muat di buffer x free margin."""
+        per_lot = self.per_lot(symbol, order_type, price, leverage, fresh)
+        if per_lot <= 0 or step <= 0:
+            return 0.0
+        steps = math.floor((free_margin * buffer / per_lot) / step + 1e-9)
+        return round(max(0, steps) * step, 8)
+
+    def invalidate(self, symbol: str = None):
+        with self._lock:
+            for key in [k for k in self._calibrations if symbol is None or k[0] == symbol]:
+                del self._calibrations[key]
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_margin_model() -> MarginModel:
+    """Singleton MarginModel (dipakai RiskGovernor & MT5Executor)."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = MarginModel()
+        return _model
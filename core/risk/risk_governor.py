@@ -2,6 +2,8 @@ import MetaTrader5 as mt5
 from loguru import logger
 from dataclasses import dataclass
 from core.config import settings
+from core.feeder.broker_registry import get_broker_registry
+from core.risk.margin_model import get_margin_model
 
 @dataclass
 class RiskEvaluation:
@@ -24,31 +26,34 @@ class RiskGovernor:
         # Load konfigurasi dari .env
         self.risk_pct = settings.RISK_PER_TRADE_PCT
         self.max_drawdown = settings.MAX_DAILY_DRAWDOWN_PCT
+        # Akun, spec & tick dari snapshot bersama (satu view per cycle)
+        self.broker = get_broker_registry()
+        # Margin per lot di-memo (linear terhadap volume & harga)
+        self.margin_model = get_margin_model()
         logger.info(f"🛡️ RiskGovernor V5 Active | Risk Profile: {self.risk_pct}% | Max Daily Drawdown: {self.max_drawdown}%")
 
     def _get_account_info(self):
-        """Mengambil data akun terbaru dari MT5"""
-        return mt5.account_info()
+        """Mengambil data akun (snapshot cycle ini)"""
+        return self.broker.account()
 
     def _get_symbol_info(self, symbol):
-        """Mengambil spesifikasi kontrak symbol"""
-        return mt5.symbol_info(symbol)
+        """Mengambil spesifikasi kontrak symbol (cache TTL panjang)"""
+        return self.broker.spec(symbol)
 
-    def _calculate_margin_cost(self, symbol: str, volume: float, order_type: int) -> float:
+    def _calculate_margin_cost(self, symbol: str, volume: float, order_type: int, leverage: int = None) -> float:
         """
         FITUR CANGGIH: Margin Check Real-time.
-        Bertanya ke Server MT5: 'Berapa duit yang harus disetor untuk lot segini?'
+        'Berapa duit yang harus disetor untuk lot segini?'
+        UPGRADE: Dari MarginModel (satu kalibrasi ke server, lalu ekstrapolasi linear).
         """
         try:
             # Dapatkan harga market saat ini untuk estimasi akurat
-            tick = mt5.symbol_info_tick(symbol)
+            tick = self.broker.tick(symbol)
             if not tick: return 0.0
             
             price = tick.ask if order_type == mt5.ORDER_TYPE_BUY else tick.bid
             
-            # API MT5 untuk hitung margin
-            margin = mt5.order_calc_margin(order_type, symbol, volume, price)
-            return margin if margin is not None else 0.0
+            return self.margin_model.margin(symbol, order_type, volume, price, leverage)
         except Exception as e:
             logger.error(f"⚠️ Margin Calc Error: {e}")
             return 0.0
@@ -98,7 +103,8 @@ class RiskGovernor:
         # "Saya cuma punya duit sekian di Free Margin"
         
         # Hitung harga margin untuk 1 Lot standar (Buy)
-        margin_per_1_lot = self._calculate_margin_cost(symbol, 1.0, mt5.ORDER_TYPE_BUY)
+        leverage = getattr(acc, "leverage", None)
+        margin_per_1_lot = self._calculate_margin_cost(symbol, 1.0, mt5.ORDER_TYPE_BUY, leverage)
         
         max_lot_wallet = 0.0
         if margin_per_1_lot > 0:
@@ -125,7 +131,7 @@ class RiskGovernor:
 
         # --- STEP D: REALITY CHECK TERAKHIR ---
         # Cek apakah final_lot ini benar-benar cukup marginnya (Double Check)
-        final_margin_req = self._calculate_margin_cost(symbol, final_lot, mt5.ORDER_TYPE_BUY)
+        final_margin_req = self._calculate_margin_cost(symbol, final_lot, mt5.ORDER_TYPE_BUY, leverage)
         
         reason = "Risk Approved"
         
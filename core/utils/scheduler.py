@@ -0,0 +1,166 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+from core.config import settings
+
+
+class ScheduledTask:
+    """
+    Satu pekerjaan terjadwal dengan trigger sendiri:
+    - interval: jalan tiap N detik (slot yang terlewat di-skip, tidak dikejar)
+    - bar_seconds: jalan saat bar close, dihitung dari jam server broker
+    Keduanya boleh dipakai bersamaan (mana yang duluan jatuh tempo).
+    """
+
+    def __init__(self, name: str, fn: Callable[[], None], interval: float = None,
+                 bar_seconds: float = None, bar_delay: float = 0.0,
+                 budget: float = None, stale_after: float = None):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.bar_seconds = bar_seconds
+        self.bar_delay = bar_delay
+        self.budget = budget
+        self.stale_after = stale_after
+        self.next_run = None  # Interval: None = langsung jalan di putaran pertama
+        self.last_bar = None
+        self._bar_fired = False
+        self.stats = {"runs": 0, "skipped": 0, "overruns": 0, "errors": 0,
+                      "last_duration": 0.0, "max_duration": 0.0,
+                      "last_lateness": 0.0, "max_lateness": 0.0}
+        self._durations = deque(maxlen=100)
+        # Telat mulai (jatuh tempo -> jalan): ketahuan kalau task lain menahan thread
+        self._lateness = deque(maxlen=100)
+
+    def due(self, now: float, server_now: float) -> Optional[float]:
+        """Waktu lokal saat task jatuh tempo, atau None kalau belum."""
+        self._bar_fired = False
+        due = None
+        if self.bar_seconds:
+            shifted = server_now - self.bar_delay
+            bar = int(shifted // self.bar_seconds)
+            if self.last_bar is None:
+                self.last_bar = bar  # Start di tengah bar: tunggu close berikutnya
+            elif bar > self.last_bar:
+                self.last_bar = bar
+                self._bar_fired = True
+                due = now - (shifted - bar * self.bar_seconds)
+        if self.interval and not self._bar_fired:
+            if self.next_run is None:
+                due = now
+            elif now >= self.next_run:
+                due = self.next_run
+        return due
+
+    def reschedule(self, now: float):
+        if not self.interval:
+            return
+        if self.next_run is None or self._bar_fired:
+            # Baru jalan karena bar close: interval dihitung ulang dari sekarang
+            self.next_run = now + self.interval
+            return
+        # Slot berikutnya yang masih di depan; slot yang terlewat dihitung skip
+        missed = math.floor((now - self.next_run) / self.interval)
+        self.stats["skipped"] += missed
+        self.next_run += self.interval * (missed + 1)
+
+    def record(self, duration: float, lateness: float):
+        self._durations.append(duration)
+        self._lateness.append(lateness)
+        self.stats["runs"] += 1
+        self.stats["last_duration"] = round(duration, 4)
+        self.stats["max_duration"] = round(max(self.stats["max_duration"], duration), 4)
+        self.stats["last_lateness"] = round(lateness, 4)
+        self.stats["max_lateness"] = round(max(self.stats["max_lateness"], lateness), 4)
+        if self.budget and duration > self.budget:
+            self.stats["overruns"] += 1
+            logger.warning(f"⏱️ Task {self.name} overrun: {duration:.2f}s > budget {self.budget}s")
+
+    def report(self) -> Dict:
+        samples = sorted(self._durations)
+        late = sorted(self._lateness)
+        return {**self.stats,
+                "p50_duration": round(samples[len(samples) // 2], 4) if samples else None,
+                # Lateness = delay penjadwalan (100 sampel terakhir / sejak start)
+                "p95_lateness": round(late[min(len(late) - 1, int(0.95 * len(late)))], 4) if late else None,
+                "budget": self.budget}
+
+
+class Scheduler:
+    """
+    EVENT-DRIVEN SCHEDULER (SINGLE THREAD)
+
+    Pengganti loop `while True + sleep` dengan satu cadence: tiap task punya
+    trigger, budget & batas basi sendiri. Task jalan berurutan di thread
+    pemanggil (API MT5 tidak thread-safe): semua call ke terminal (order,
+    tick, posisi, trailing) harus lewat task di sini. Event yang baru ketahuan setelah
+    lewat `stale_after` detik di-skip (tidak dikerjakan telat), durasi di atas
+    `budget` dicatat sebagai overrun.
+
+    `clock` = jam server broker (epoch detik); dipakai untuk trigger bar close.
+    """
+
+    def __init__(self, clock: Callable[[], float] = None, resolution: float = None):
+        self.clock = clock or time.time
+        self.resolution = settings.SCHED_RESOLUTION_SECONDS if resolution is None else resolution
+        self.tasks: List[ScheduledTask] = []
+        self._stop = threading.Event()
+
+    def every(self, name: str, fn: Callable[[], None], seconds: float, **kwargs) -> ScheduledTask:
+        return self.add(ScheduledTask(name, fn, interval=seconds, **kwargs))
+
+    def on_bar_close(self, name: str, fn: Callable[[], None], bar_seconds: float, **kwargs) -> ScheduledTask:
+        return self.add(ScheduledTask(name, fn, bar_seconds=bar_seconds, **kwargs))
+
+    def add(self, task: ScheduledTask) -> ScheduledTask:
+        self.tasks.append(task)
+        return task
+
+    def run_pending(self) -> int:
+        """Jalankan semua task yang jatuh tempo (urutan registrasi). Return jumlah yang jalan."""
+        ran = 0
+        for task in self.tasks:
+            now = time.time()
+            due = task.due(now, self.clock())
+            if due is None:
+                continue
+            lateness = now - due
+            task.reschedule(now)
+            if task.stale_after is not None and lateness > task.stale_after:
+                task.stats["skipped"] += 1
+                logger.warning(f"⏭️ Task {task.name} skipped: {lateness:.1f}s late (stale > {task.stale_after}s)")
+                continue
+
+            started = time.perf_counter()
+            try:
+                task.fn()
+            except Exception as e:
+                task.stats["errors"] += 1
+                logger.exception(f"Task {task.name} Error: {e}")
+            task.record(time.perf_counter() - started, lateness)
+            ran += 1
+        return ran
+
+    def seconds_until_next(self) -> float:
+        """Tidur sampai interval terdekat; bar close dicek tiap `resolution`."""
+        now = time.time()
+        wait = self.resolution
+        for task in self.tasks:
+            if task.interval and task.next_run is not None:
+                wait = min(wait, task.next_run - now)
+        return max(0.0, wait)
+
+    def run_forever(self):
+        logger.info(f"🗓️ Scheduler started: {', '.join(t.name for t in self.tasks)}")
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self.seconds_until_next())
+
+    def stop(self):
+        self._stop.set()
+
+    def report(self) -> Dict[str, Dict]:
+        return {task.name: task.report() for task in self.tasks}
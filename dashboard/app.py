@@ -2,7 +2,7 @@ from flask import Flask, render_template, jsonify, request
 import json
 import os
 # Import fungsi loader dengan aman
-from dashboard.status_loader import load_status, load_history, load_journal, CONTROL_FILE
+from dashboard.status_loader import load_status, load_history, load_journal, load_llm_telemetry, CONTROL_FILE
 
 app = Flask(__name__)
 
@@ -37,6 +37,11 @@ def get_chat_api():
     except: pass
     return jsonify([])
 
+@app.route('/api/llm')
+def get_llm_api():
+    """Telemetry model LLM: latency, error rate, token, status circuit breaker"""
+    return jsonify(load_llm_telemetry())
+
 @app.route('/api/control', methods=['POST'])
 def send_command():
     """Menerima tombol Start/Stop/Panic"""
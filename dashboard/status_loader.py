@@ -9,6 +9,7 @@ HISTORY_FILE = "data/trade_history.json"
 JOURNAL_FILE = "data/journal.json"
 CHAT_FILE = "data/ai_chat_log.json"
 CONTROL_FILE = "data/control.json"
+LLM_TELEMETRY_FILE = "data/llm_telemetry.json"
 
 def _ensure_dir():
     if not os.path.exists("data"):
@@ -47,6 +48,12 @@ def load_chat_log():
         with open(CHAT_FILE, 'r') as f: return json.load(f)
     except: return []
 
+def load_llm_telemetry():
+    if not os.path.exists(LLM_TELEMETRY_FILE): return {}
+    try:
+        with open(LLM_TELEMETRY_FILE, 'r') as f: return json.load(f)
+    except: return {}
+
 # === SAVERS (SIMPAN DATA) ===
 
 def save_status(data):
@@ -60,6 +67,17 @@ def save_status(data):
     except Exception as e:
         logger.error(f"Status Save Error: {e}")
 
+def save_llm_telemetry(data):
+    """Menyimpan telemetry model LLM (latency, error, circuit) untuk Dashboard"""
+    _ensure_dir()
+    temp = f"{LLM_TELEMETRY_FILE}.tmp"
+    try:
+        with open(temp, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp, LLM_TELEMETRY_FILE)
+    except Exception as e:
+        logger.error(f"LLM Telemetry Save Error: {e}")
+
 def log_trade_history(trade_data):
     """
     PERBAIKAN UTAMA: APPEND LOGIC
@@ -0,0 +1,89 @@
+"""
+Fixture bersama untuk test:
+- jam palsu (time / perf_counter / monotonic) untuk test timing
+- modul MetaTrader5 palsu (paket asli hanya ada di Windows & butuh terminal)
+"""
+import sys
+import types
+from collections import namedtuple
+
+import pytest
+
+# Konstanta MT5 yang dipakai kode di core/
+MT5_CONSTANTS = {
+    "ORDER_TYPE_BUY": 0, "ORDER_TYPE_SELL": 1,
+    "TRADE_ACTION_DEAL": 1, "TRADE_ACTION_SLTP": 6,
+    "ORDER_TIME_GTC": 0,
+    "ORDER_FILLING_FOK": 0, "ORDER_FILLING_IOC": 1, "ORDER_FILLING_RETURN": 2,
+    "SYMBOL_FILLING_FOK": 1, "SYMBOL_FILLING_IOC": 2,
+    "TRADE_RETCODE_DONE": 10009, "DEAL_ENTRY_OUT": 1,
+    "TIMEFRAME_M1": 1, "TIMEFRAME_M15": 15, "TIMEFRAME_H1": 16385,
+}
+
+SymbolInfo = namedtuple("SymbolInfo", "name digits point volume_min volume_max volume_step "
+                                      "trade_tick_value trade_tick_size trade_contract_size "
+                                      "trade_stops_level filling_mode")
+OrderResult = namedtuple("OrderResult", "retcode order volume comment", defaults=(0, 0.0, ""))
+
+
+def make_fake_mt5() -> types.ModuleType:
+    """Modul MetaTrader5 palsu: konstanta + symbol XAUUSD (2 digit), order_send selalu DONE."""
+    mt5 = types.ModuleType("MetaTrader5")
+    mt5.__dict__.update(MT5_CONSTANTS)
+    mt5.sent = []
+    mt5.retcodes = []  # Antrian retcode order_send berikutnya (kosong = DONE)
+
+    def order_send(request):
+        mt5.sent.append(dict(request))
+        return OrderResult(mt5.retcodes.pop(0) if mt5.retcodes else mt5.TRADE_RETCODE_DONE)
+
+    mt5.order_send = order_send
+    mt5.symbol_info = lambda symbol: SymbolInfo(symbol, 2, 0.01, 0.01, 100.0, 0.01,
+                                                1.0, 0.01, 100.0, 0, 3)
+    mt5.symbol_info_tick = lambda symbol: None
+    mt5.account_info = lambda: None
+    mt5.positions_get = lambda symbol=None: ()
+    mt5.last_error = lambda: (1, "fake")
+    return mt5
+
+
+try:
+    import MetaTrader5  # noqa: F401
+except ImportError:
+    # Supaya modul core/ bisa di-import; test tetap memakai fixture fake_mt5
+    sys.modules["MetaTrader5"] = make_fake_mt5()
+
+
+class FakeClock:
+    """Satu jam untuk time(), perf_counter() & monotonic(); sleep() = maju tanpa menunggu."""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    perf_counter = time
+    monotonic = time
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    advance = sleep
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_mt5(monkeypatch):
+    """MetaTrader5 palsu yang baru per test, dipasang ke semua modul core/ yang memakainya."""
+    mt5 = make_fake_mt5()
+    for name in ("core.feeder.broker_registry", "core.feeder.mt5_feeder",
+                 "core.execution.mt5_executor", "core.risk.margin_model"):
+        module = sys.modules.get(name)
+        if module is not None:
+            monkeypatch.setattr(module, "mt5", mt5)
+    return mt5
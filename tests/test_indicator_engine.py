@@ -0,0 +1,186 @@
+"""
+Regresi IndicatorEngine vs referensi pandas_ta.
+
+Referensi di bawah = rumus pandas_ta (ema / rma / rsi / true_range / atr /
+adx / macd) yang ditulis ulang dengan pandas, termasuk non_zero_range
+(epsilon di seluruh seri kalau ada range 0). Kalau pandas_ta terpasang,
+hasilnya juga dicek langsung ke library aslinya.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.brains.indicator_engine import IndicatorEngine
+
+EPS = np.finfo(float).eps
+RTOL = 1e-9
+
+
+# --- Referensi (rumus pandas_ta) ---
+
+def ref_ema(close: pd.Series, length: int) -> pd.Series:
+    close = close.copy()
+    seed = close.iloc[:length].mean()
+    close.iloc[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def ref_rma(series: pd.Series, length: int) -> pd.Series:
+    return series.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def ref_rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    negative = close.diff(1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    up = ref_rma(positive, length)
+    dn = ref_rma(negative, length)
+    return 100 * up / (up + dn.abs())
+
+
+def non_zero_range(high: pd.Series, low: pd.Series) -> pd.Series:
+    diff = high - low
+    if diff.eq(0).any().any():
+        diff += EPS
+    return diff
+
+
+def ref_true_range(high, low, close) -> pd.Series:
+    prev_close = close.shift(1)
+    ranges = pd.concat([non_zero_range(high, low),
+                        non_zero_range(high, prev_close).abs(),
+                        non_zero_range(low, prev_close).abs()], axis=1)
+    tr = ranges.max(axis=1)
+    tr.iloc[:1] = np.nan
+    return tr
+
+
+def ref_adx(high, low, close, length: int = 14) -> pd.DataFrame:
+    atr = ref_rma(ref_true_range(high, low, close), length)
+    up = high - high.shift(1)
+    dn = low.shift(1) - low
+    pos = ((up > dn) & (up > 0)) * up
+    neg = ((dn > up) & (dn > 0)) * dn
+    pos = pos.apply(lambda x: 0 if abs(x) < EPS else x)
+    neg = neg.apply(lambda x: 0 if abs(x) < EPS else x)
+    k = 100 / atr
+    dmp = k * ref_rma(pos, length)
+    dmn = k * ref_rma(neg, length)
+    dx = 100 * (dmp - dmn).abs() / (dmp + dmn)
+    return pd.DataFrame({"adx": ref_rma(dx, length), "dmp": dmp, "dmn": dmn})
+
+
+def ref_macd(close, fast=12, slow=26, signal=9) -> pd.DataFrame:
+    macd = ref_ema(close, fast) - ref_ema(close, slow)
+    signal_line = ref_ema(macd.loc[macd.first_valid_index():], signal)
+    return pd.DataFrame({"macd": macd, "macd_signal": signal_line, "macd_hist": macd - signal_line})
+
+
+def reference(df: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame({"close": df["close"], "ema_50": ref_ema(df["close"], 50),
+                        "rsi": ref_rsi(df["close"])})
+    out = out.join(ref_adx(df["high"], df["low"], df["close"]))
+    return out.join(ref_macd(df["close"]))
+
+
+# --- Data uji ---
+
+def make_bars(n: int, seed: int = 7, flat_every: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    if flat_every:
+        # Bar flat (high == low == close sebelumnya): edge case non_zero_range
+        for i in range(flat_every, n, flat_every):
+            open_[i] = high[i] = low[i] = close[i] = close[i - 1]
+    times = 1_700_000_000 + 60 * np.arange(n)
+    return pd.DataFrame({"time": times, "open": open_, "high": high, "low": low, "close": close})
+
+
+def assert_row(snap: dict, ref_row: pd.Series):
+    for name, value in snap.items():
+        expected = ref_row[name]
+        if np.isnan(expected):
+            assert np.isnan(value), name
+        else:
+            assert value == pytest.approx(expected, rel=RTOL, abs=1e-12), name
+
+
+# --- Test ---
+
+@pytest.mark.parametrize("flat_every", [0, 17])
+def test_sync_matches_reference(flat_every):
+    bars = make_bars(300, flat_every=flat_every)
+    ref = reference(bars)
+    result = IndicatorEngine().sync(bars)
+    assert_row(result["prev"], ref.iloc[-2])
+    assert_row(result["last"], ref.iloc[-1])
+
+
+def test_flat_market_true_range_epsilon():
+    # Market diam (semua bar flat) -> ATR 0; pandas_ta tetap memberi DI 0, bukan NaN
+    bars = make_bars(80, seed=9)
+    bars.loc[:39, ["open", "high", "low", "close"]] = 2000.0
+    ref = reference(bars)
+    engine = IndicatorEngine()
+    for end in (30, 40, 80):
+        result = engine.sync(bars.iloc[:end])
+        assert_row(result["prev"], ref.iloc[end - 2])
+        assert_row(result["last"], ref.iloc[end - 1])
+
+
+def test_incremental_sync_matches_full_recompute():
+    bars = make_bars(260, seed=11, flat_every=23)
+    ref = reference(bars)
+    engine = IndicatorEngine()
+    for end in range(120, len(bars) + 1):
+        result = engine.sync(bars.iloc[:end])
+        assert_row(result["prev"], ref.iloc[end - 2])
+        assert_row(result["last"], ref.iloc[end - 1])
+
+
+def test_provisional_bar_does_not_leak_into_state():
+    bars = make_bars(200, seed=3)
+    engine = IndicatorEngine()
+    engine.sync(bars.iloc[:150])
+    # Forming bar berubah-ubah (tick) sebelum close
+    forming = bars.iloc[:151].copy()
+    for close in (1990.0, 2050.0, float(bars["close"].iloc[150])):
+        forming.loc[forming.index[-1], "close"] = close
+        engine.sync(forming)
+
+    fresh = IndicatorEngine()
+    fresh.sync(forming)
+    assert engine.bars_committed == fresh.bars_committed == 150
+    # repr: NaN di state tidak sama dengan dirinya sendiri kalau dibandingkan langsung
+    assert repr(engine._state()) == repr(fresh._state())
+
+    ref = reference(bars)
+    result = engine.sync(bars.iloc[:180])
+    assert_row(result["prev"], ref.iloc[178])
+    assert_row(result["last"], ref.iloc[179])
+
+
+def test_matches_pandas_ta_when_installed():
+    ta = pytest.importorskip("pandas_ta")
+    bars = make_bars(300, seed=5, flat_every=31)
+    result = IndicatorEngine().sync(bars)["last"]
+    adx = ta.adx(bars["high"], bars["low"], bars["close"], length=14)
+    macd = ta.macd(bars["close"], fast=12, slow=26, signal=9)
+    expected = {
+        "ema_50": ta.ema(bars["close"], length=50).iloc[-1],
+        "rsi": ta.rsi(bars["close"], length=14).iloc[-1],
+        "adx": adx["ADX_14"].iloc[-1],
+        "dmp": adx["DMP_14"].iloc[-1],
+        "dmn": adx["DMN_14"].iloc[-1],
+        "macd": macd["MACD_12_26_9"].iloc[-1],
+        "macd_signal": macd["MACDs_12_26_9"].iloc[-1],
+        "macd_hist": macd["MACDh_12_26_9"].iloc[-1],
+    }
+    for name, value in expected.items():
+        assert result[name] == pytest.approx(value, rel=RTOL), name
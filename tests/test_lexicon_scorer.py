@@ -0,0 +1,61 @@
+"""Regresi LexiconScorer: matching vectorized vs loop per token (referensi)."""
+import numpy as np
+import pytest
+
+from core.brains.lexicon_scorer import NEGATORS, LexiconScorer, _TOKEN
+
+
+def reference_matches(scorer: LexiconScorer, headlines):
+    """Loop kiri-ke-kanan: bigram menang & memakan dua token, negasi 3 token."""
+    out = []
+    for row, text in enumerate(headlines):
+        tokens = _TOKEN.findall(text.lower())
+        negate_until = -1
+        i = 0
+        while i < len(tokens):
+            tok = tokens[i]
+            if tok in NEGATORS:
+                negate_until = i + 3
+                i += 1
+                continue
+            sign = -1.0 if i <= negate_until else 1.0
+            idx = scorer.terms.get(f"{tok} {tokens[i + 1]}") if i + 1 < len(tokens) else None
+            step = 2
+            if idx is None:
+                idx, step = scorer.terms.get(tok), 1
+            if idx is not None:
+                out.append((row, idx, sign))
+            i += step
+    return out
+
+
+WORDS = ["gold", "dollar", "rises", "falls", "safe", "haven", "demand", "not", "no", "rally",
+         "rate", "cut", "cuts", "hike", "yields", "rise", "fall", "as", "despite", "strong",
+         "weaker", "stronger", "record", "high", "etf", "inflows", "without"]
+
+
+@pytest.mark.parametrize("symbol", ["XAUUSD", "BTCUSD"])
+def test_vectorized_matches_reference_loop(symbol):
+    rng = np.random.default_rng(1)
+    scorer = LexiconScorer(symbol)
+    headlines = [" ".join(rng.choice(WORDS, size=rng.integers(0, 12))) for _ in range(400)]
+    rows, cols, signs = scorer._matches(headlines)
+    assert list(zip(rows.tolist(), cols.tolist(), signs.tolist())) == reference_matches(scorer, headlines)
+
+
+def test_bigram_consumes_its_tokens():
+    scores, confidence = LexiconScorer("XAUUSD").score(["Gold slips as dollar rises"])
+    # "dollar rises" (-0.8) saja, bukan ditambah "rises" (+0.6)
+    assert scores[0] < -0.5
+    assert confidence[0] > 0.5
+
+
+def test_despite_is_not_a_negator():
+    scores, _ = LexiconScorer("XAUUSD").score(["Gold rallies despite stronger dollar"])
+    # rallies (+1.0) + stronger dollar (-0.8), tanpa dibalik
+    assert scores[0] == pytest.approx(np.tanh(0.2))
+
+
+def test_negation_window_stays_in_headline():
+    scores, _ = LexiconScorer("XAUUSD").score(["Gold not", "rally rally"])
+    assert scores[1] == pytest.approx(np.tanh(2.0))
@@ -0,0 +1,123 @@
+"""Antrian modify SL/TP MT5Executor: coalesce, rate limit, cooldown reject, no-op vs SL server."""
+import pytest
+
+from core.execution import mt5_executor
+from core.execution.mt5_executor import MT5Executor
+from core.feeder.broker_registry import BrokerRegistry
+
+TICKET = 4242
+
+
+@pytest.fixture
+def executor(fake_mt5, clock, monkeypatch):
+    monkeypatch.setattr(mt5_executor, "time", clock)
+    ex = MT5Executor("XAUUSD")
+    ex.broker = BrokerRegistry(spec_ttl=3600, state_ttl=0)
+    ex.min_interval = 1.0
+    ex.min_delta_points = 5        # 5 x point 0.01 = 0.05
+    ex.reject_cooldown = 5.0
+    return ex
+
+
+def sent_sl(fake_mt5):
+    return [req["sl"] for req in fake_mt5.sent]
+
+
+def test_requests_for_same_ticket_are_coalesced(executor, fake_mt5):
+    assert executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    assert executor.request_modify(TICKET, 1991.0, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    assert executor.request_modify(TICKET, 1992.004, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    assert executor.flush_modifications() == 1
+    # Hanya target terakhir yang dikirim, dibulatkan ke digits symbol
+    assert sent_sl(fake_mt5) == [1992.0]
+    report = executor.modify_report()
+    assert report["requested"] == 3
+    assert report["coalesced"] == 2
+    assert report["sent"] == report["done"] == 1
+    assert report["pending"] == 0
+
+
+def test_min_interval_rate_limits_per_ticket(executor, fake_mt5, clock):
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0)
+    executor.request_modify(TICKET + 1, 1990.0, 2050.0, current_sl=1980.0)
+    assert executor.flush_modifications() == 2
+
+    clock.advance(0.5)
+    executor.request_modify(TICKET, 1991.0, 2050.0)
+    assert executor.flush_modifications() == 0
+    assert executor.modify_report()["pending"] == 1
+
+    clock.advance(0.5)
+    assert executor.flush_modifications() == 1
+    assert sent_sl(fake_mt5) == [1990.0, 1990.0, 1991.0]
+
+
+def test_reject_starts_cooldown(executor, fake_mt5, clock):
+    fake_mt5.retcodes = [10016]  # Invalid stops
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0)
+    assert executor.flush_modifications() == 1
+    assert executor.modify_stats["rejected"] == 1
+
+    clock.advance(2.0)  # Lewat min_interval, tapi masih cooldown
+    executor.request_modify(TICKET, 1991.0, 2050.0, current_sl=1980.0)
+    assert executor.flush_modifications() == 0
+
+    clock.advance(3.0)
+    assert executor.flush_modifications() == 1
+    assert executor.modify_stats["done"] == 1
+    assert sent_sl(fake_mt5) == [1990.0, 1991.0]
+
+
+def test_noop_compares_against_server_confirmed_sl(executor, fake_mt5, clock):
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    executor.flush_modifications()
+    clock.advance(2.0)
+
+    # positions_get masih basi (SL lama 1980), tapi server sudah konfirmasi 1990
+    assert not executor.request_modify(TICKET, 1990.02, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    assert executor.modify_stats["dropped"] == 1
+    # Geser >= delta minimum tetap masuk antrian
+    assert executor.request_modify(TICKET, 1990.05, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    # TP berubah tetap dikirim walau SL sama
+    assert executor.request_modify(TICKET, 1990.0, 2060.0)
+
+
+def test_dropped_request_keeps_pending_target(executor, fake_mt5, clock):
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    executor.flush_modifications()
+    clock.advance(0.2)
+
+    assert executor.request_modify(TICKET, 1995.0, 2050.0)
+    # Harga balik: target kembali ke SL server -> dibuang, target 1995 tetap pending
+    assert not executor.request_modify(TICKET, 1990.01, 2050.0)
+    assert executor.modify_report()["pending"] == 1
+
+    clock.advance(1.0)
+    assert executor.flush_modifications() == 1
+    assert sent_sl(fake_mt5) == [1990.0, 1995.0]
+
+
+def test_no_change_retcode_counts_as_confirmed(executor, fake_mt5, clock):
+    fake_mt5.retcodes = [10025]
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0, current_tp=2050.0)
+    executor.flush_modifications()
+    assert executor.modify_stats["no_change"] == 1
+    assert executor.modify_stats["rejected"] == 0
+    assert executor._known[TICKET] == (1990.0, 2050.0)
+
+    # Tidak ada cooldown: ticket langsung boleh dimodify lagi setelah min_interval
+    clock.advance(1.0)
+    executor.request_modify(TICKET, 1991.0, 2050.0)
+    assert executor.flush_modifications() == 1
+
+
+def test_forget_ticket_clears_queue_state(executor, fake_mt5):
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0)
+    executor.flush_modifications()
+    executor.request_modify(TICKET, 1995.0, 2050.0)
+    executor.forget_ticket(TICKET)
+    assert executor.modify_report()["pending"] == 0
+    assert TICKET not in executor._known
+    # Ticket baru dengan nomor sama tidak mewarisi rate limit lama
+    executor.request_modify(TICKET, 1990.0, 2050.0, current_sl=1980.0)
+    assert executor.flush_modifications() == 1
@@ -0,0 +1,56 @@
+"""MT5Feeder.get_window: seed sekali, lalu cuma tail bar (juga kalau history broker pendek)."""
+import numpy as np
+import pytest
+
+from core.feeder.mt5_feeder import MT5Feeder
+from tests.test_ring_buffer import make_rates
+
+
+@pytest.fixture
+def broker_bars(fake_mt5):
+    """History broker (bar 0..n-1) + log jumlah bar yang diminta per copy_rates_from_pos."""
+    state = {"rates": make_rates(0, 120), "requests": []}
+
+    def copy_rates_from_pos(symbol, timeframe, start, count):
+        state["requests"].append(count)
+        return state["rates"][-count:]
+
+    fake_mt5.copy_rates_from_pos = copy_rates_from_pos
+    return state
+
+
+def test_short_broker_history_is_seeded_once(broker_bars):
+    feeder = MT5Feeder()
+    buf = feeder.get_window(15, bars=500)
+    assert len(buf) == 120
+
+    broker_bars["rates"] = make_rates(0, 121)
+    for _ in range(3):
+        assert feeder.get_window(15, bars=500) is buf
+
+    # Satu download penuh, sisanya cuma tail
+    assert broker_bars["requests"] == [500] + [feeder.tail_bars] * 3
+    np.testing.assert_array_equal(buf.view("time"), make_rates(0, 121)["time"])
+
+
+def test_gap_and_invalidate_trigger_full_reseed(broker_bars):
+    feeder = MT5Feeder()
+    feeder.get_window(15, bars=100)
+
+    broker_bars["rates"] = make_rates(30, 120)  # Bar baru jauh di depan cache: gap
+    buf = feeder.get_window(15, bars=100)
+    assert broker_bars["requests"] == [100, feeder.tail_bars, 100]
+    np.testing.assert_array_equal(buf.view("time"), make_rates(50, 100)["time"])
+
+    feeder.bar_cache.invalidate()
+    feeder.get_window(15, bars=100)
+    assert broker_bars["requests"][-1] == 100
+
+
+def test_larger_window_than_seeded_capacity_reseeds(broker_bars):
+    feeder = MT5Feeder()
+    feeder.get_window(15, bars=50)
+    buf = feeder.get_window(15, bars=100)
+    assert broker_bars["requests"] == [50, 100]
+    assert buf.capacity == 100
+    assert len(buf) == 100
@@ -0,0 +1,68 @@
+"""Regresi deteksi Order Block vectorized vs loop iloc lama (TechnicalBrain)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.brains.order_blocks import order_blocks_series, pick_legacy, scan_order_blocks
+
+
+def legacy_order_blocks(df: pd.DataFrame):
+    """Loop lama TechnicalBrain._detect_order_blocks (sebelum vectorize)."""
+    if df is None or len(df) < 5:
+        return 0.0, 0.0
+    bull_ob = 0.0
+    bear_ob = 0.0
+    for i in range(len(df) - 3, len(df) - 50, -1):
+        curr = df.iloc[i]
+        next_c = df.iloc[i + 1]
+        if curr['close'] < curr['open']:
+            if next_c['close'] > curr['high']:
+                bull_ob = curr['low']
+        if curr['close'] > curr['open']:
+            if next_c['close'] < curr['low']:
+                bear_ob = curr['high']
+    return bull_ob, bear_ob
+
+
+def make_bars(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    open_ = 2000 + np.cumsum(rng.normal(0, 2.0, n))
+    close = open_ + rng.normal(0, 2.0, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 0.5, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.5, n)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+
+def legacy_pick(df: pd.DataFrame):
+    scan = scan_order_blocks(df["open"], df["high"], df["low"], df["close"], 50)
+    return pick_legacy(scan)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scan_matches_legacy_loop(seed):
+    bars = make_bars(400, seed)
+    for end in range(50, len(bars) + 1, 7):
+        window = bars.iloc[:end]
+        assert legacy_pick(window) == legacy_order_blocks(window)
+
+
+def test_scan_finds_every_candidate_in_window():
+    bars = make_bars(120, seed=42)
+    scan = scan_order_blocks(bars["open"], bars["high"], bars["low"], bars["close"], 50)
+    o, h, l, c = (bars[k].to_numpy() for k in ("open", "high", "low", "close"))
+    n = len(bars)
+    window = range(n - 49, n - 2)
+    bull = [i for i in window if c[i] < o[i] and c[i + 1] > h[i]]
+    bear = [i for i in window if c[i] > o[i] and c[i + 1] < l[i]]
+    assert scan.bull_idx.tolist() == bull
+    assert scan.bear_idx.tolist() == bear
+    assert scan.bull_zone.tolist() == [l[i] for i in bull]
+    assert scan.bear_zone.tolist() == [h[i] for i in bear]
+
+
+def test_series_matches_per_bar_scan():
+    bars = make_bars(300, seed=8)
+    bull, bear = order_blocks_series(bars["open"], bars["high"], bars["low"], bars["close"], 50)
+    for t in range(len(bars)):
+        expected = legacy_pick(bars.iloc[:t + 1]) if t >= 4 else (0.0, 0.0)
+        assert (bull[t], bear[t]) == expected, t
@@ -0,0 +1,111 @@
+"""OHLCVRingBuffer: seed / merge forming bar / gap -> seed ulang, umur view."""
+import numpy as np
+import pytest
+
+from core.feeder.ring_buffer import OHLCV_FIELDS, OHLCVRingBuffer
+
+M15 = 900
+T0 = 1_700_000_100 - 1_700_000_100 % M15
+
+
+def make_rates(start: int, n: int, close0: float = 2000.0) -> np.ndarray:
+    """Structured array seperti hasil mt5.copy_rates_from_pos (bar ke-`start` dst)."""
+    rates = np.zeros(n, dtype=[(name, dtype) for name, dtype in OHLCV_FIELDS.items()])
+    idx = np.arange(start, start + n)
+    rates["time"] = T0 + M15 * idx
+    rates["close"] = close0 + idx
+    rates["open"] = rates["close"] - 0.5
+    rates["high"] = rates["close"] + 1.0
+    rates["low"] = rates["close"] - 1.0
+    rates["tick_volume"] = 100 + idx
+    return rates
+
+
+def test_seed_sorts_and_keeps_last_capacity_bars():
+    buf = OHLCVRingBuffer(capacity=50)
+    rates = make_rates(0, 80)
+    buf.seed(rates[::-1])
+    assert len(buf) == 50
+    np.testing.assert_array_equal(buf.view("time"), rates["time"][-50:])
+    assert buf.last_time() == int(rates["time"][-1])
+
+
+def test_merge_updates_forming_bar_and_appends_new_bars():
+    buf = OHLCVRingBuffer(capacity=50)
+    buf.seed(make_rates(0, 50))
+    version = buf.version
+
+    # Tail broker: dua bar terakhir (yang terakhir masih forming, close berubah) + satu bar baru
+    tail = make_rates(48, 3)
+    tail["close"][1] = 1234.5
+    assert buf.merge(tail)
+
+    full = make_rates(0, 51)
+    full["close"][49] = 1234.5
+    assert len(buf) == 50
+    assert buf.version > version
+    np.testing.assert_array_equal(buf.view("time"), full["time"][-50:])
+    np.testing.assert_array_equal(buf.view("close"), full["close"][-50:])
+
+
+def test_merge_wraps_capacity_many_times():
+    buf = OHLCVRingBuffer(capacity=20)
+    buf.seed(make_rates(0, 20))
+    for end in range(21, 201):
+        assert buf.merge(make_rates(end - 3, 3))
+    expected = make_rates(180, 20)
+    for name in OHLCV_FIELDS:
+        np.testing.assert_array_equal(buf.view(name), expected[name], err_msg=name)
+
+
+def test_gap_is_rejected_then_reseeded():
+    buf = OHLCVRingBuffer(capacity=50)
+    buf.seed(make_rates(0, 50))
+    before = buf.snapshot("time")
+
+    # Bar 50..51 hilang: tail mulai dari bar 52
+    assert not buf.merge(make_rates(52, 3))
+    np.testing.assert_array_equal(buf.view("time"), before)
+
+    buf.seed(make_rates(5, 50))
+    assert buf.merge(make_rates(53, 3))
+    np.testing.assert_array_equal(buf.view("time"), make_rates(6, 50)["time"])
+
+
+def test_merge_on_empty_buffer_asks_for_seed():
+    buf = OHLCVRingBuffer(capacity=10)
+    assert not buf.merge(make_rates(0, 3))
+    buf.seed(make_rates(0, 10))
+    buf.clear()
+    assert buf.empty
+    assert not buf.merge(make_rates(9, 2))
+
+
+def test_view_is_read_only_and_zero_copy():
+    buf = OHLCVRingBuffer(capacity=10)
+    buf.seed(make_rates(0, 10))
+    close = buf.view("close")
+    assert not close.flags.writeable
+    assert np.shares_memory(close, buf.view("close"))
+    with pytest.raises(ValueError):
+        close[0] = 0.0
+
+
+def test_view_is_overwritten_by_merge_but_snapshot_is_not():
+    buf = OHLCVRingBuffer(capacity=10)
+    buf.seed(make_rates(0, 10))
+    view = buf.view("close")
+    snap = buf.snapshot("close")
+    frame = buf.frame()
+    kept = view.copy()
+
+    tail = make_rates(9, 1)
+    tail["close"] = -1.0
+    assert buf.merge(tail)
+
+    # Forming bar ditimpa in-place: view lama ikut berubah
+    assert view[-1] == -1.0
+    np.testing.assert_array_equal(snap, kept)
+    np.testing.assert_array_equal(frame["close"].to_numpy(), kept)
+    assert buf.frame() is not frame
+    assert buf.frame()["close"].iloc[-1] == -1.0
@@ -0,0 +1,93 @@
+"""Scheduler: slot terlewat di-skip (tidak dikejar), bar close basi di-skip, overrun & lateness."""
+import pytest
+
+from core.utils import scheduler as scheduler_mod
+from core.utils.scheduler import Scheduler
+
+
+@pytest.fixture
+def sched(clock, monkeypatch):
+    monkeypatch.setattr(scheduler_mod, "time", clock)
+    # Jam server = jam lokal (offset broker tidak relevan di sini)
+    return Scheduler(clock=clock.time, resolution=1.0)
+
+
+def test_interval_runs_immediately_then_on_schedule(sched, clock):
+    calls = []
+    task = sched.every("tick", lambda: calls.append(clock.now), seconds=10)
+    assert sched.run_pending() == 1
+    clock.advance(9.9)
+    assert sched.run_pending() == 0
+    clock.advance(0.1)
+    assert sched.run_pending() == 1
+    assert len(calls) == 2
+    assert task.stats["skipped"] == 0
+    assert sched.seconds_until_next() == pytest.approx(1.0)  # dibatasi resolution
+
+
+def test_missed_slots_are_skipped_not_replayed(sched, clock):
+    calls = []
+    task = sched.every("signal", lambda: calls.append(clock.now), seconds=10)
+    sched.run_pending()
+    start = clock.now
+
+    # Thread tertahan 35 detik: slot 10, 20, 30 terlewat
+    clock.advance(35)
+    assert sched.run_pending() == 1
+    assert sched.run_pending() == 0
+    assert len(calls) == 2
+    assert task.stats["skipped"] == 2
+    assert task.stats["last_lateness"] == pytest.approx(25.0)
+    # Slot berikutnya tetap di grid awal, bukan 35 + 10
+    assert task.next_run == pytest.approx(start + 40)
+
+
+def test_bar_close_waits_for_next_close_and_skips_stale(sched, clock):
+    clock.now = 1_700_000_000 - 1_700_000_000 % 60 + 30  # Start di tengah bar M1
+    calls = []
+    task = sched.on_bar_close("entry", lambda: calls.append(clock.now), bar_seconds=60,
+                              stale_after=5.0)
+    assert sched.run_pending() == 0
+
+    clock.advance(32)  # 2 detik setelah close
+    assert sched.run_pending() == 1
+    assert task.stats["last_lateness"] == pytest.approx(2.0)
+
+    clock.advance(68)  # Close berikutnya baru ketahuan 10 detik kemudian: basi
+    assert sched.run_pending() == 0
+    assert task.stats["skipped"] == 1
+    assert len(calls) == 1
+
+    clock.advance(30)  # Masih bar yang sama: tidak di-replay
+    assert sched.run_pending() == 0
+    assert task.stats["runs"] == 1
+
+
+def test_overrun_counted_and_delays_next_task(sched, clock):
+    sched.every("history", lambda: clock.advance(2.5), seconds=5, budget=1.0)
+    fast = sched.every("fast", lambda: clock.advance(0.2), seconds=5, budget=1.0)
+    sched.run_pending()
+    clock.now = fast.next_run  # Keduanya jatuh tempo, history jalan duluan
+    sched.run_pending()
+
+    report = sched.report()
+    assert report["history"]["overruns"] == 2
+    assert report["history"]["max_duration"] == pytest.approx(2.5)
+    assert report["fast"]["overruns"] == 0
+    # Task yang terdaftar belakangan menunggu task lambat di depannya
+    assert report["fast"]["max_lateness"] == pytest.approx(2.5)
+    assert report["fast"]["p95_lateness"] == pytest.approx(2.5)
+    assert report["fast"]["p50_duration"] == pytest.approx(0.2)
+
+
+def test_errors_are_counted_and_do_not_stop_other_tasks(sched, clock):
+    def boom():
+        raise RuntimeError("terminal down")
+
+    calls = []
+    bad = sched.every("bad", boom, seconds=1)
+    sched.every("good", lambda: calls.append(clock.now), seconds=1)
+    assert sched.run_pending() == 2
+    assert bad.stats["errors"] == 1
+    assert bad.stats["runs"] == 1
+    assert len(calls) == 1
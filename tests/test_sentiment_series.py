@@ -0,0 +1,104 @@
+"""SentimentSeries vs jumlah decay brute force: item telat & history yang sudah di-trim."""
+import math
+
+import numpy as np
+import pytest
+
+from core.brains.sentiment_series import SentimentSeries
+
+HALF_LIFE = 3600.0
+PRIOR = 1.0
+
+
+def brute_force(items, timestamp):
+    rate = math.log(2) / HALF_LIFE
+    s = w = 0.0
+    for t, score in items:
+        if t <= timestamp:
+            decay = math.exp(-rate * (timestamp - t))
+            s, w = s + score * decay, w + decay
+    return s / (w + PRIOR), w
+
+
+def make_items(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    times = 1_700_000_000 + np.cumsum(rng.uniform(0, 600, n))
+    return [(float(t), float(s)) for t, s in zip(times, rng.uniform(-1, 1, n))]
+
+
+def assert_value(series, items, timestamp):
+    score, weight = series.value_at(timestamp)
+    expected_score, expected_weight = brute_force(items, timestamp)
+    assert score == pytest.approx(expected_score, rel=1e-9, abs=1e-12)
+    assert weight == pytest.approx(expected_weight, rel=1e-9, abs=1e-12)
+
+
+def test_in_order_appends_match_brute_force():
+    items = make_items(200, seed=1)
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=1000)
+    for t, score in items:
+        series.add(t, score)
+    for t in np.linspace(items[0][0] - 100, items[-1][0] + 7200, 50):
+        assert_value(series, items, t)
+
+
+def test_late_items_match_brute_force():
+    items = make_items(200, seed=2)
+    order = np.random.default_rng(3).permutation(len(items))
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=1000)
+    for k in order:
+        series.add(*items[k])
+    for t in np.linspace(items[0][0], items[-1][0] + 3600, 50):
+        assert_value(series, items, t)
+
+
+def test_trimmed_history_stays_in_aggregate():
+    items = make_items(300, seed=4)
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=50)
+    for t, score in items:
+        series.add(t, score)
+    assert len(series) <= 55
+    now = items[-1][0] + 60
+    assert_value(series, items, now)
+
+
+def test_late_item_older_than_trimmed_prefix_folds_into_base():
+    items = make_items(300, seed=5)
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=50)
+    for t, score in items[1:]:
+        series.add(t, score)
+    kept = len(series)
+
+    # Headline paling tua baru datang setelah trim: bukan reset ke nol
+    series.add(*items[0])
+    assert len(series) == kept
+    now = items[-1][0] + 60
+    assert_value(series, items, now)
+    # Di antara base & checkpoint tertua yang tersisa
+    assert_value(series, items, series._times[0] - 1e-3)
+
+
+def test_llm_share_tracks_decayed_weight_per_source():
+    items = make_items(120, seed=6)
+    sources = ["llm" if k % 3 == 0 else "local" for k in range(len(items))]
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=40)
+    for (t, score), source in zip(items, sources):
+        series.add(t, score, source)
+    # Satu headline LLM telat, lebih tua dari prefix yang sudah di-trim
+    late = (items[0][0] - 10.0, 0.5)
+    series.add(*late, "llm")
+
+    now = items[-1][0] + 60
+    llm_items = [item for item, source in zip(items, sources) if source == "llm"] + [late]
+    _, llm_weight = brute_force(llm_items, now)
+    _, weight = brute_force(items + [late], now)
+    assert series.llm_share_at(now) == pytest.approx(llm_weight / weight, rel=1e-9)
+
+
+def test_llm_share_local_only_then_mixed():
+    series = SentimentSeries("XAUUSD", HALF_LIFE, PRIOR, max_points=100)
+    assert series.llm_share_at(1_700_000_000) == 0.0
+    series.add(1_700_000_000, 0.4, "local")
+    assert series.llm_share_at(1_700_000_100) == 0.0
+    series.add(1_700_000_050, -0.4, "llm")
+    assert 0.0 < series.llm_share_at(1_700_000_100) < 1.0